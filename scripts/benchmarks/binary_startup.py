@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the startup time of pyinstaller builds of an application (e.g. 'onefile' vs 'onedir').
+
+Every executable is run several times with the same arguments, and the wall-clock time until the process exits
+is measured. The first run of every executable is reported separately, since it includes filling the OS file
+cache.
+
+Build both variants first, for example:
+
+    make binary && mv dist/linux-gnu dist/onefile
+    make binary-onedir && mv dist/linux-gnu dist/onedir
+
+Usage: python scripts/benchmarks/binary_startup.py [--runs N] EXECUTABLE [EXECUTABLE ...] [-- ARGS]
+
+    python scripts/benchmarks/binary_startup.py dist/onefile/frkl-project dist/onedir/frkl-project/frkl-project -- --help
+"""
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+
+def time_run(executable: str, args: List[str]) -> float:
+
+    start = time.perf_counter()
+    subprocess.run(
+        [executable] + args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main(argv: List[str]):
+
+    runs = 10
+    if argv and argv[0] == "--runs":
+        runs = int(argv[1])
+        argv = argv[2:]
+
+    if "--" in argv:
+        executables = argv[: argv.index("--")]
+        args = argv[argv.index("--") + 1 :]
+    else:
+        executables = argv
+        args = ["--help"]
+
+    if not executables:
+        print(__doc__)
+        sys.exit(1)
+
+    width = max(len(e) for e in executables)
+    print(
+        f"{'executable':<{width}}  {'first':>8}  {'min':>8}  {'median':>8}  {'mean':>8}"
+    )
+    for executable in executables:
+        first = time_run(executable, args)
+        times = [time_run(executable, args) for _ in range(runs)]
+        print(
+            f"{executable:<{width}}  {first:8.3f}  {min(times):8.3f}  {statistics.median(times):8.3f}  {statistics.mean(times):8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Time the startup of a frkl application in (simulated) frozen mode, without a pyinstaller build.
+
+The data files of a pyinstaller build are laid out in a temporary folder, and the generated entry point is run
+with 'sys.frozen' and 'sys._MEIPASS' pointing to that folder (see 'frkl.project_meta.frozen'). Reported are the
+wall-clock time of the whole process, and the time from the start of the bootstrap until the command finished
+(which excludes interpreter startup).
+
+With '--max-time', the script exits with an error if the median 'app' time is above the provided number of
+seconds, so it can be used to catch startup regressions in CI.
+
+Usage: python scripts/benchmarks/frozen_startup.py [--runs N] [--resources-mode MODE] [--max-time SECONDS] MAIN_MODULE [-- ARGS]
+
+    python scripts/benchmarks/frozen_startup.py frkl.project_meta -- runtime-info frkl.project_meta
+"""
+import argparse
+import sys
+import tempfile
+from typing import List
+
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.frozen import create_frozen_layout, time_frozen_startup
+from frkl.project_meta.resource_bundle import RESOURCE_MODES
+
+
+def main(argv: List[str]):
+
+    args: List[str] = ["--help"]
+    if "--" in argv:
+        args = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+
+    parser = argparse.ArgumentParser(usage=__doc__)
+    parser.add_argument("main_module")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--resources-mode", choices=RESOURCE_MODES, default="files")
+    parser.add_argument("--max-time", type=float, default=None)
+    options = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="frkl_frozen_bundle_") as bundle_dir:
+        layout = create_frozen_layout(
+            ProjectMetadata(project_main_module=options.main_module),
+            bundle_dir,
+            resources_mode=options.resources_mode,
+        )
+        result = time_frozen_startup(layout, args, runs=options.runs)
+
+    print(f"{options.main_module} {' '.join(args)} ({options.runs} runs)")
+    print(f"{'':<6}  {'first':>8}  {'min':>8}  {'median':>8}  {'mean':>8}")
+    for name in ["wall", "app"]:
+        t = result[name]
+        print(
+            f"{name:<6}  {t['first']:8.3f}  {t['min']:8.3f}  {t['median']:8.3f}  {t['mean']:8.3f}"
+        )
+
+    if options.max_time is not None and result["app"]["median"] > options.max_time:
+        print(
+            f"Startup regression: median {result['app']['median']:.3f}s > {options.max_time:.3f}s"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
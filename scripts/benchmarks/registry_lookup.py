@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark global/singleton lookup throughput of 'ProjectMetadata' under thread contention.
+
+Compares the lock-free 'Registry' with a dict that is guarded by a lock on every access.
+
+Usage: python scripts/benchmarks/registry_lookup.py [max_threads] [lookups_per_thread]
+"""
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from frkl.project_meta.registry import Registry
+
+
+def run(lookup: Callable[[str], Any], num_threads: int, lookups: int) -> float:
+
+    barrier = threading.Barrier(num_threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(lookups):
+            lookup("key_7")
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - start
+
+    return (num_threads * lookups) / duration
+
+
+def main(max_threads: int = 16, lookups: int = 200000):
+
+    registry = Registry()
+    locked_dict: Dict[str, Any] = {}
+    lock = threading.Lock()
+    for i in range(32):
+        registry.set(f"key_{i}", i)
+        locked_dict[f"key_{i}"] = i
+
+    def locked_lookup(key: str) -> Any:
+        with lock:
+            return locked_dict.get(key, None)
+
+    def writer(stop: threading.Event):
+        i = 0
+        while not stop.is_set():
+            registry.set(f"key_{i % 32}", i)
+            with lock:
+                locked_dict[f"key_{i % 32}"] = i
+            i += 1
+            time.sleep(0.001)
+
+    print(f"{'threads':>8} {'registry (lookups/s)':>22} {'locked dict (lookups/s)':>25}")
+    num_threads = 1
+    while num_threads <= max_threads:
+        stop = threading.Event()
+        w = threading.Thread(target=writer, args=(stop,))
+        w.start()
+        registry_rate = run(registry.get, num_threads, lookups)
+        locked_rate = run(locked_lookup, num_threads, lookups)
+        stop.set()
+        w.join()
+        print(f"{num_threads:>8} {registry_rate:>22,.0f} {locked_rate:>25,.0f}")
+        num_threads *= 2
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -138,6 +138,7 @@ function build_artifact () {
     local requirements_file="${6}"
     local output_dir="${7}"
     local spec_file="${8}"
+    local build_mode="${9}"
 
     local target="${output_dir}/${OSTYPE}"
 
@@ -171,7 +172,7 @@ function build_artifact () {
     cd "${project_root}"
 
     make project-info
-    make binary-config
+    make binary-config BUILD_MODE="${build_mode}"
 
     pyinstaller --clean -y --dist "${target}" --workpath "${temp_dir}" "${spec_file}"
 
@@ -194,6 +195,7 @@ function main () {
     local requirements_file="${6}"
     local output_dir="${7}"
     local spec_file="${8}"
+    local build_mode="${9}"
 
     # activate pyenv if already installed
 #    if [ -f "$HOME/.pyenv/.pyenvrc" ]; then
@@ -206,7 +208,7 @@ function main () {
 
     if [ -f /.dockerenv ] || [ "$DOCKER_BUILD" != true ]; then
 
-           build_artifact "${project_root}" "${build_dir}" "${venv_name}" "${python_version}" "${pyinstaller_version}" "${requirements_file}" "${output_dir}" "${spec_file}"
+           build_artifact "${project_root}" "${build_dir}" "${venv_name}" "${python_version}" "${pyinstaller_version}" "${requirements_file}" "${output_dir}" "${spec_file}" "${build_mode}"
 
     else
             # TODO: fix this
@@ -251,6 +253,10 @@ while [[ -n "$1" ]]; do
     shift
     VENV_NAME="${1}"
     ;;
+  --build-mode)
+    shift
+    BUILD_MODE="${1}"
+    ;;
   --)
     shift
     break
@@ -326,9 +332,19 @@ then
 fi
 OUTPUT_DIR=$(realpath "${OUTPUT_DIR}")
 
+if [ -z "${BUILD_MODE}" ]
+then
+  BUILD_MODE="onefile"
+fi
+if [ "${BUILD_MODE}" != "onefile" ] && [ "${BUILD_MODE}" != "onedir" ]
+then
+  echo "invalid build mode '${BUILD_MODE}', allowed: onefile, onedir"
+  exit 1
+fi
+
 if [ -z ${SPEC_FILE} ]
 then
-  SPEC_FILE="${THIS_DIR}/onefile.spec"
+  SPEC_FILE="${THIS_DIR}/${BUILD_MODE}.spec"
 fi
 if [ ! -f "${SPEC_FILE}" ]
 then
@@ -340,6 +356,7 @@ SPEC_FILE=$(realpath "$SPEC_FILE")
 echo "project root: ${PROJECT_ROOT}"
 echo "requirements file: ${REQUIREMENTS_FILE}"
 echo "spec file: ${SPEC_FILE}"
+echo "build mode: ${BUILD_MODE}"
 echo "output dir: ${OUTPUT_DIR}"
 echo "build dir: ${BUILD_DIR}"
 echo "venv name: ${VENV_NAME}"
@@ -353,7 +370,7 @@ echo
 set -e
 #set -x
 
-main "${PROJECT_ROOT}" "${BUILD_DIR}" "${VENV_NAME}" "${PYTHON_VERSION}" "${PYINSTALLER_VERSION}" "${REQUIREMENTS_FILE}" "${OUTPUT_DIR}" "${SPEC_FILE}"
+main "${PROJECT_ROOT}" "${BUILD_DIR}" "${VENV_NAME}" "${PYTHON_VERSION}" "${PYINSTALLER_VERSION}" "${REQUIREMENTS_FILE}" "${OUTPUT_DIR}" "${SPEC_FILE}" "${BUILD_MODE}"
 
 set +e
 #set +x
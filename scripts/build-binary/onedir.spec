@@ -0,0 +1,70 @@
+# -*- mode: python -*-
+import json
+
+from PyInstaller.building.build_main import Analysis
+
+import pp
+import os
+import sys
+
+# builds a folder that contains the executable and all its dependencies: in contrast to 'onefile.spec',
+# nothing needs to be extracted at startup, and the same files are used for every launch
+#
+# create the config with: frkl-project pyinstaller-config --build-mode onedir <main_module> .frkl/pyinstaller
+
+block_cipher = None
+
+# remove tkinter dependency ( https://github.com/pyinstaller/pyinstaller/wiki/Recipe-remove-tkinter-tcl )
+sys.modules["FixTk"] = None
+
+project_dir = os.path.abspath(os.path.join(DISTPATH, "..", ".."))
+
+with open('.frkl/project.json', encoding='utf-8') as f:
+    project_metadata = json.load(f)
+
+with open('.frkl/pyinstaller/pyinstaller_args.json', encoding='utf-8') as f:
+    analysis_args = json.load(f)
+
+build_options = {}
+if os.path.exists('.frkl/pyinstaller/pyinstaller_build.json'):
+    with open('.frkl/pyinstaller/pyinstaller_build.json', encoding='utf-8') as f:
+        build_options = json.load(f)
+
+exe_name = project_metadata["metadata"]["project"]["exe_name"]
+main_module = project_metadata["main_module"]
+
+print("---------------------------------------------------")
+print()
+print(f"app name: {exe_name}")
+print(f"main_module: {main_module}")
+print(f"build mode: onedir")
+print()
+print("analysis data:")
+pp(analysis_args)
+print()
+print("---------------------------------------------------")
+
+a = Analysis(**analysis_args)
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name=exe_name,
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=build_options.get("upx", False),
+    console=True,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=build_options.get("upx", False),
+    name=exe_name,
+)
@@ -14,12 +14,17 @@ sys.modules["FixTk"] = None
 
 project_dir = os.path.abspath(os.path.join(DISTPATH, "..", ".."))
 
-with open('.frkl/project.json') as f:
+with open('.frkl/project.json', encoding='utf-8') as f:
     project_metadata = json.load(f)
 
-with open('.frkl/pyinstaller/pyinstaller_args.json') as f:
+with open('.frkl/pyinstaller/pyinstaller_args.json', encoding='utf-8') as f:
     analysis_args = json.load(f)
 
+build_options = {}
+if os.path.exists('.frkl/pyinstaller/pyinstaller_build.json'):
+    with open('.frkl/pyinstaller/pyinstaller_build.json', encoding='utf-8') as f:
+        build_options = json.load(f)
+
 print(project_metadata)
 exe_name = project_metadata["metadata"]["project"]["exe_name"]
 main_module = project_metadata["main_module"]
@@ -52,7 +57,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=build_options.get("upx", True),
     runtime_tmpdir=None,
     console=True,
 )
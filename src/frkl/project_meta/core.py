@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import gc
 import importlib
 import json
 import logging
 import os
 import sys
+import threading
 import types
+import zipfile
+from contextlib import contextmanager
 from datetime import datetime
 from types import ModuleType
 from typing import (
@@ -14,6 +18,8 @@ from typing import (
     Callable,
     Coroutine,
     Dict,
+    Iterable,
+    Iterator,
     Mapping,
     MutableMapping,
     Optional,
@@ -23,22 +29,79 @@ from typing import (
 )
 
 from appdirs import AppDirs
-from frkl.project_meta.utils import discover_installed_modules
+from frkl.project_meta.defaults_resolver import DefaultsResolver
+from frkl.project_meta.lazy import get_startup_constants
+from frkl.project_meta.profiling import measure_memory
+from frkl.project_meta.registry import Registry
+from frkl.project_meta.resource_bundle import (
+    ProjectResources,
+    ResourceIndex,
+    find_bundle_index,
+)
+from frkl.project_meta.snapshot import load_snapshot
+from frkl.project_meta.utils import (
+    DiscoveryPolicy,
+    discover_installed_modules,
+    get_bundle_dir,
+    get_distribution_versions,
+    get_entry_points_index,
+    get_zipapp_path,
+)
+from frkl.project_meta.versions import resolve_version
 
 
-try:
-    from importlib_metadata import entry_points  # type: ignore
-except Exception:
-    from importlib.metadata import entry_points
+log = logging.getLogger("frkl")
 
+INVALIDATION_PARTS: Mapping[str, Iterable[str]] = {
+    "metadata": ["_metadata", "_runtime_details"],
+    "version": ["_version"],
+    "defaults": ["_package_defaults", "_defaults_resolver", "_resources"],
+    "dist": [
+        "_version",
+        "_runtime_details",
+        "_other_metadata_projects",
+        "_other_metadata_project_versions",
+    ],
+}
+"""The lazy attributes that need to be re-computed if a part of a projects sources/installation changes."""
+
+
+def complete_project_metadata(
+    project_metadata: Dict[str, Any], main_module: str
+) -> Dict[str, Any]:
+    """Validate the metadata of a project (content of '_frkl.json', and '_frkl' module attributes), and add default values."""
+
+    project_metadata["project_main_module"] = main_module
+
+    project_name = project_metadata.get("project", {}).get("project_name", None)
+
+    if not project_name:
+        raise Exception("Can't retrieve app details: no 'project_name' key in metadata")
+
+    if "exe_name" not in project_metadata["project"].keys():
+        project_metadata["project"]["exe_name"] = None
+
+    if "project_slug" not in project_metadata["project"].keys():
+        project_metadata["project"]["project_slug"] = (
+            project_metadata["project"]["project_name"]
+            .replace("-", "_")
+            .replace(".", "_")
+            .replace(" ", "_")
+        )
 
-log = logging.getLogger("frkl")
+    return project_metadata
 
 
 class ProjectMetadata(object):
     """Class to hold all relevant information of a frkl-Python package"""
 
-    def __init__(self, project_main_module: Union[str, types.ModuleType]):
+    def __init__(
+        self,
+        project_main_module: Union[str, types.ModuleType],
+        snapshot: Optional[Mapping[str, Any]] = None,
+        use_snapshot: bool = True,
+        other_projects: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    ):
 
         if isinstance(project_main_module, types.ModuleType):
             project_main_module = project_main_module.__name__
@@ -64,42 +127,123 @@ class ProjectMetadata(object):
         self._other_metadata_project_versions: Optional[Mapping[str, str]] = None
         """A dictionary to hold version information of main dependency packages of this application."""
 
+        self._other_metadata_project_snapshots: Optional[
+            Mapping[str, Mapping[str, Any]]
+        ] = other_projects
+        """Snapshots of the metadata of the main dependency packages (if running as pyinstaller binary, or if provided)."""
+
         self._package_defaults: Optional[Mapping[str, Any]] = None
         """Default values for this package (atribures in the '<main_module>.defaults' module)."""
 
-        self._globals: MutableMapping[str, Any] = {}
+        self._defaults_resolver: Optional[DefaultsResolver] = None
+        """Index of the default values of this package, resolved statically where possible."""
+
+        self._resources: Optional[ProjectResources] = None
+        """Index of the resource files of this package."""
+
+        self._globals: Registry = Registry()
         """Global variables for this application."""
 
-        self._singletons: MutableMapping[Type, Any] = {}
+        self._singletons: Registry = Registry()
         """Global singletons for this application."""
 
-        # if this is distributed as a frozen bundle, we read metadata from a file
-        # otherwise it will be read dynamically
-        self._check_app_metadata_file()
+        self._startup_constants: Optional[Mapping[str, Any]] = None
+        """Values baked into the generated entry point ('lazy' startup mode), set until the bundled app details are read."""
+
+        self._resolve_locks: Mapping[str, threading.RLock] = self._create_resolve_locks()
+        """Locks to make sure every lazy attribute is only resolved once, even if accessed concurrently."""
+
+        if snapshot is not None:
+            self._load_snapshot(snapshot)
+        elif hasattr(sys, "frozen") or get_zipapp_path() is not None:
+            # if this is distributed as a frozen bundle (or zipapp), we read metadata from a file, in 'lazy'
+            # startup mode only once a value is needed that wasn't baked into the entry point
+            self._startup_constants = get_startup_constants(self.main_module)
+            if self._startup_constants is None:
+                self._load_bundled_app_details()
+        elif use_snapshot:
+            # if a (still valid) snapshot was created at install time, we use that,
+            # otherwise metadata will be read dynamically
+            installed_snapshot = load_snapshot(self.main_module)
+            if installed_snapshot is not None:
+                log.debug(f"Using metadata snapshot for '{self.main_module}'.")
+                self._load_snapshot(installed_snapshot)
 
         # for k, v in globals.items():
         #     self.set_global(k, v)
 
+    @staticmethod
+    def _create_resolve_locks() -> Mapping[str, threading.RLock]:
+
+        return {
+            attr: threading.RLock()
+            for attr in [
+                "_metadata",
+                "_version",
+                "_runtime_details",
+                "_other_metadata_projects",
+                "_package_defaults",
+                "_defaults_resolver",
+                "_resources",
+                "_app_details",
+            ]
+        }
+
     @property
     def main_module(self) -> str:
         return self._project_main_module
 
+    def _load_bundled_app_details(self) -> None:
+
+        if hasattr(sys, "frozen"):
+            self._check_app_metadata_file()
+        else:
+            self._check_zipapp_metadata_file()
+
+    def _ensure_app_details(self) -> None:
+        """Read the bundled app details, if that was deferred ('lazy' startup mode)."""
+
+        if self._startup_constants is None:
+            return
+
+        with self._resolve_locks["_app_details"]:
+            if self._startup_constants is not None:
+                self._load_bundled_app_details()
+                self._startup_constants = None
+
     def _check_app_metadata_file(self) -> None:
 
         # we only use that if we are dealing with a pyinstaller binary
         if not hasattr(sys, "frozen"):
             return None
 
-        app_details_file = os.path.join(
-            sys._MEIPASS, self.main_module, "app.json"  # type: ignore
-        )
+        app_details_file = os.path.join(get_bundle_dir(), self.main_module, "app.json")
         if os.path.exists(app_details_file):
             log.debug(f"'app.json' file exists: {app_details_file}")
-            with open(app_details_file, "r") as f:
+            with open(app_details_file, "r", encoding="utf-8") as f:
                 app_details = json.load(f)
         else:
             raise Exception(f"No 'app.json' file: {app_details_file}")
 
+        self._load_app_details(app_details)
+
+    def _check_zipapp_metadata_file(self) -> None:
+
+        zipapp_path = get_zipapp_path()
+        with zipfile.ZipFile(zipapp_path) as zf:  # type: ignore
+            try:
+                app_details = json.loads(
+                    zf.read(f"{self.main_module}/app.json").decode("utf-8")
+                )
+            except KeyError:
+                raise Exception(
+                    f"No 'app.json' file for '{self.main_module}' in zipapp: {zipapp_path}"
+                )
+
+        self._load_app_details(app_details)
+
+    def _load_app_details(self, app_details: Mapping[str, Any]) -> None:
+
         self._metadata = app_details["metadata"]
         self._version = app_details["version"]
         # self._other_metadata_projects = app_details["modules_details"]
@@ -107,13 +251,199 @@ class ProjectMetadata(object):
         self._other_metadata_project_versions = app_details[
             "other_frkl_project_versions"
         ]
+        self._other_metadata_project_snapshots = app_details.get(
+            "other_frkl_projects", None
+        )
+
+    def _load_snapshot(self, snapshot: Mapping[str, Any]) -> None:
+
+        self._metadata = snapshot["metadata"]
+        self._version = snapshot["version"]
+        self._build_info = snapshot.get("build_info", None)
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Return the details needed to re-create this object without any imports or filesystem access."""
+
+        return {
+            "main_module": self.main_module,
+            "metadata": copy.deepcopy(self.metadata),
+            "version": self.version,
+        }
+
+    def to_state(self, deep: bool = True) -> Dict[str, Any]:
+        """Return the resolved state of this object, for 'from_state' (and 'frkl.project_meta.serialization.dumps_metadata').
+
+        In contrast to 'to_snapshot', this contains everything that was computed for the current runtime (runtime
+        details, build info), so it is only valid for processes of the same application.
+
+        Args:
+            deep: whether to include the state of the dependency frkl projects
+        """
+
+        state: Dict[str, Any] = {
+            "main_module": self.main_module,
+            "metadata": self.metadata,
+            "version": self.version,
+            "runtime_details": self.runtime_details,
+            "build_info": self._build_info,
+            "other_frkl_project_versions": None,
+            "other_frkl_projects": None,
+        }
+
+        if deep and (
+            not hasattr(sys, "frozen") or self._other_metadata_project_snapshots
+        ):
+            state["other_frkl_project_versions"] = self.other_frkl_project_versions
+            state["other_frkl_projects"] = {
+                name: md.to_state(deep=False)
+                for name, md in self.other_frkl_projects.items()
+            }
+
+        return state
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> "ProjectMetadata":
+        """Re-create an object from the output of 'to_state', without any imports or filesystem access."""
+
+        md = cls(project_main_module=state["main_module"], snapshot=state)
+        md._runtime_details = state["runtime_details"]
+        md._other_metadata_project_versions = state["other_frkl_project_versions"]
+        if state["other_frkl_projects"] is not None:
+            md._other_metadata_projects = {
+                name: cls.from_state(other_state)
+                for name, other_state in state["other_frkl_projects"].items()
+            }
+
+        return md
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the instance as is (no values are resolved), only the locks are left out.
+
+        Use 'frkl.project_meta.serialization.dumps_metadata' to serialize a fully resolved instance.
+        """
+
+        state = dict(self.__dict__)
+        state.pop("_resolve_locks", None)
+        return state
+
+    def __setstate__(self, state: Mapping[str, Any]) -> None:
+
+        self.__dict__.update(state)
+        self._resolve_locks = self._create_resolve_locks()
+
+    def create_startup_constants(self) -> Dict[str, Any]:
+        """Return the values that are baked into a generated entry point in 'lazy' startup mode (see 'frkl.project_meta.lazy')."""
+
+        return {
+            "main_module": self.main_module,
+            "version": self.version,
+            "exe_name": self.exe_name,
+            "project_name": self.project_name,
+        }
+
+    def invalidate(self, *parts: str) -> None:
+        """Discard resolved values, so they are re-computed the next time they are accessed.
+
+        The projects '_frkl' and 'defaults' modules are reloaded if they were imported before.
+
+        Args:
+            parts: the parts that changed, any of 'metadata', 'version', 'defaults', 'dist' (all, if none are specified)
+        """
+
+        if not parts:
+            parts = tuple(INVALIDATION_PARTS.keys())
+
+        for part in parts:
+            if part not in INVALIDATION_PARTS.keys():
+                raise Exception(
+                    f"Invalid part '{part}', allowed: {', '.join(INVALIDATION_PARTS.keys())}"
+                )
+
+            module_name = {"metadata": "_frkl", "defaults": "defaults"}.get(part, None)
+            if module_name is not None:
+                module = sys.modules.get(f"{self.main_module}.{module_name}", None)
+                if module is not None:
+                    importlib.reload(module)
+
+            for attr in INVALIDATION_PARTS[part]:
+                lock = self._resolve_locks.get(attr, None)
+                if lock is None:
+                    setattr(self, attr, None)
+                    continue
+                with lock:
+                    setattr(self, attr, None)
+
+    def warm(self, deep: bool = True, freeze: bool = False) -> "ProjectMetadata":
+        """Resolve all lazy attributes now, instead of when they are first accessed.
+
+        Meant to be called in the parent process of a pre-forking server or a 'multiprocessing' pool: forked
+        workers inherit the resolved values and can use them right away, sharing the memory pages copy-on-write.
+        Resource archives are not opened, since open file handles would be shared between processes.
+
+        Args:
+            deep: also resolve the dependency frkl projects and the distributions index, and import the 'defaults' module
+            freeze: move all objects that are tracked by the garbage collector into a permanent generation ('gc.freeze', Python >= 3.7), so garbage collections in the workers don't write to (and copy) the shared pages
+
+        Returns:
+            ProjectMetadata: this object
+        """
+
+        self.metadata
+        self.version
+        self.runtime_details
+        self.get_app_dirs()
+        try:
+            self.get_resources()
+        except Exception as e:
+            log.debug(f"Can't load resources index for '{self.main_module}': {e}")
+
+        if deep:
+            get_entry_points_index()
+            get_distribution_versions()
+            self.get_pkg_defaults()
+
+            if not hasattr(sys, "frozen") or self._other_metadata_project_snapshots:
+                for md in self.other_frkl_projects.values():
+                    md.warm(deep=False)
+                self.other_frkl_project_versions
+
+        if freeze:
+            if hasattr(gc, "freeze"):
+                gc.collect()
+                gc.freeze()
+            else:
+                log.debug("'gc.freeze' not available for this Python version.")
+
+        return self
+
+    def _resolve(self, attr: str, resolve_func: Callable[[], Any]) -> Any:
+        """Return the value of a lazy attribute, resolving it (once) if it is not set yet.
+
+        Concurrent callers wait for the first one to finish resolving, instead of doing the same work again.
+        Once resolved, the value is returned without acquiring a lock.
+        """
+
+        value = getattr(self, attr)
+        if value is not None:
+            return value
+
+        with self._resolve_locks[attr]:
+            value = getattr(self, attr)
+            if value is None:
+                with measure_memory("attribute", f"{self.main_module}:{attr[1:]}"):
+                    value = resolve_func()
+                setattr(self, attr, value)
+
+        return value
 
     @property
     def metadata(self) -> Mapping[str, Any]:
         """Method to retrieve metadata that is relevant to build a binary for this package."""
 
-        if self._metadata is not None:
-            return self._metadata
+        self._ensure_app_details()
+        return self._resolve("_metadata", self._load_metadata)
+
+    def _load_metadata(self) -> Mapping[str, Any]:
 
         if not self.main_module:
             raise Exception(
@@ -150,35 +480,20 @@ class ProjectMetadata(object):
 
             project_metadata[k] = attr
 
-        project_metadata["project_main_module"] = self._project_main_module
-
-        project_name = project_metadata.get("project", {}).get("project_name", None)
-
-        if not project_name:
-            raise Exception(
-                "Can't retrieve app details: no 'project_name' key in metadata"
-            )
-
-        if "exe_name" not in project_metadata["project"].keys():
-            project_metadata["project"]["exe_name"] = None
-
-        if "project_slug" not in project_metadata["project"].keys():
-            project_metadata["project"]["project_slug"] = (
-                project_metadata["project"]["project_name"]
-                .replace("-", "_")
-                .replace(".", "_")
-                .replace(" ", "_")
-            )
-
-        self._metadata = project_metadata
-        return self._metadata
+        return complete_project_metadata(project_metadata, self._project_main_module)
 
     @property
     def exe_name(self) -> Optional[str]:
+        constants = self._startup_constants
+        if constants is not None and "exe_name" in constants.keys():
+            return constants["exe_name"]
         return self.metadata["project"]["exe_name"]
 
     @property
     def project_name(self) -> str:
+        constants = self._startup_constants
+        if constants is not None and "project_name" in constants.keys():
+            return constants["project_name"]
         return self.metadata["project"]["project_name"]
 
     @property
@@ -192,67 +507,92 @@ class ProjectMetadata(object):
         This is mainly concerned about application artefact metadata, like build time, etc.
         """
 
-        import pkg_resources
+        self._ensure_app_details()
+        return self._resolve("_runtime_details", self._load_runtime_details)
 
-        if self._runtime_details is not None:
-            return self._runtime_details
+    def _load_runtime_details(self) -> Mapping[str, Any]:
+
+        zipapp_path = get_zipapp_path()
 
         entry_point = None
         if self.exe_name:
-            for cs in pkg_resources.iter_entry_points("console_scripts"):
-                if cs.name == self.exe_name:
+            for ep in get_entry_points_index().get("console_scripts", []):
+                if ep["name"] == self.exe_name:
+                    attr = ep["attr"]
                     entry_point = {
-                        "name": cs.name,
-                        "module": cs.module_name,
-                        "attr": cs.attrs[0],
+                        "name": ep["name"],
+                        "module": ep["module"],
+                        "attr": attr.split(".")[0] if attr else None,
                     }
                     break
 
         app_details: Dict[str, Any] = {}
 
         app_details["entry_point"] = entry_point
-        if not hasattr(sys, "frozen"):
+        if hasattr(sys, "frozen"):
+            app_details["app_type"] = "binary"
+            app_details["build_info"] = self._build_info
+
+        elif zipapp_path is not None:
+            app_details["app_type"] = "zipapp"
+            app_details["build_info"] = self._build_info
+
+        else:
             log.debug("creating app details (not frozen).")
 
             app_details["app_type"] = "python-env"
 
             app_details["build_info"] = {}
 
-        else:
-            app_details["app_type"] = "binary"
-            app_details["build_info"] = self._build_info
-
-        self._runtime_details = app_details
-        return self._runtime_details
+        return app_details
 
     @property
     def other_frkl_projects(self) -> Mapping[str, "ProjectMetadata"]:
 
-        if self._other_metadata_projects is not None:
-            return self._other_metadata_projects
+        self._ensure_app_details()
+        return self._resolve("_other_metadata_projects", self._load_other_frkl_projects)
 
-        if hasattr(sys, "frozen"):
+    def _load_other_frkl_projects(self) -> Mapping[str, "ProjectMetadata"]:
+
+        if hasattr(sys, "frozen") and self._other_metadata_project_snapshots is None:
             raise Exception(
-                "Querying dependency projects not supported for frozen applications."
+                "Querying dependency projects not supported for this frozen application: no dependency metadata in 'app.json'."
             )
 
-        modules = discover_installed_modules()
-        self._other_metadata_projects = {}
+        if self._other_metadata_project_snapshots is not None:
+            return {
+                name: ProjectMetadata(
+                    project_main_module=name,
+                    snapshot=dict(snapshot, build_info=self._build_info),
+                )
+                for name, snapshot in self._other_metadata_project_snapshots.items()
+                if name != self.main_module
+            }
+
+        policy_config = self.metadata.get("discovery_policy", None)
+        if policy_config:
+            modules = discover_installed_modules(
+                policy=DiscoveryPolicy.from_config(policy_config)
+            )
+        else:
+            modules = discover_installed_modules()
+        other_projects: Dict[str, ProjectMetadata] = {}
         for m in modules:
             if m.__name__ == self.main_module:
                 continue
 
             p = ProjectMetadata(project_main_module=m)
-            self._other_metadata_projects[p.main_module] = p
+            other_projects[p.main_module] = p
 
         log.debug(
-            f"(main) dependencies for main module '{self.main_module}': {self._other_metadata_projects}"
+            f"(main) dependencies for main module '{self.main_module}': {other_projects}"
         )
-        return self._other_metadata_projects
+        return other_projects
 
     @property
     def other_frkl_project_versions(self) -> Mapping[str, str]:
 
+        self._ensure_app_details()
         if self._other_metadata_project_versions is None:
             self._other_metadata_project_versions = {
                 p.main_module: p.version for p in self.other_frkl_projects.values()
@@ -262,8 +602,21 @@ class ProjectMetadata(object):
     @property
     def version(self):
 
-        if self._version is not None:
-            return self._version
+        constants = self._startup_constants
+        if constants is not None and "version" in constants.keys():
+            return constants["version"]
+
+        self._ensure_app_details()
+        return self._resolve("_version", self._load_version)
+
+    def _load_version(self) -> str:
+
+        # always resolve the metadata first, so the version doesn't depend on which attribute was accessed first
+        project_name = self.metadata.get("project", {}).get("project_name", None)
+
+        version = resolve_version(self.main_module, project_name=project_name)
+        if version is not None:
+            return version
 
         m = importlib.import_module(self.main_module)
         try:
@@ -272,19 +625,22 @@ class ProjectMetadata(object):
             log.debug(f"Can't add version for pkg '{self.main_module}': {e}")
             version = "n/a"
 
-        self._version = version
-        return self._version
+        return version
 
     def get_pkg_defaults(self) -> Mapping[str, Any]:
 
-        if self._package_defaults is not None:
-            return self._package_defaults
+        defaults = self._resolve("_package_defaults", self._load_pkg_defaults)
+        if defaults is None:
+            return {}
+        return defaults
+
+    def _load_pkg_defaults(self) -> Optional[Mapping[str, Any]]:
 
         try:
             defaults = importlib.import_module(".".join([self.main_module, "defaults"]))
         except (Exception) as e:
             log.warning(f"Can't retrieve defaults module for '{self.main_module}': {e}")
-            return {}
+            return None
 
         result = {}
         for k in dir(defaults):
@@ -297,9 +653,19 @@ class ProjectMetadata(object):
 
             result[k] = attr
 
-        self._package_defaults = result
+        return result
 
-        return self._package_defaults
+    def get_defaults_resolver(self) -> DefaultsResolver:
+        """Return an index of this packages default values, which avoids importing the 'defaults' module if possible."""
+
+        return self._resolve(
+            "_defaults_resolver",
+            lambda: DefaultsResolver(
+                self.main_module,
+                load_defaults=self.get_pkg_defaults,
+                static=not hasattr(sys, "frozen") and get_zipapp_path() is None,
+            ),
+        )
 
     def get_pkg_metadata_value(
         self, key: str, default: Optional[Any] = "__raise_exception__"
@@ -319,11 +685,11 @@ class ProjectMetadata(object):
     def get_app_dirs(self) -> Optional[AppDirs]:
         """Return 'AppDirs' object for this application."""
 
-        for k, v in self.get_pkg_defaults().items():
-            if isinstance(v, AppDirs):
-                return v
+        match = self.get_defaults_resolver().find_instance(AppDirs)
+        if match is None:
+            return None
 
-        return None
+        return match[1]
 
     def get_resources_folder(self) -> str:
         """Return the resources folder path for this application."""
@@ -331,22 +697,59 @@ class ProjectMetadata(object):
         # if "resources" in self.build_meta.keys():
         #     return self.build_meta["resources"]
 
-        for k in self.get_pkg_defaults().keys():
-            if k.endswith("RESOURCES_FOLDER"):
-                return self.get_pkg_defaults()[k]
+        match = self.get_defaults_resolver().find_by_suffix("RESOURCES_FOLDER")
+        if match is not None:
+            return match[1]
 
         raise Exception(f"Can't determine resources folder for '{self.project_name}'.")
 
+    def get_resources(self) -> ProjectResources:
+        """Return an index of this applications resource files.
+
+        If running as a frozen bundle, the index that was created at build time is used, otherwise the resources
+        folder is scanned once. Lookups ('exists', 'list', sizes) don't touch the filesystem after that.
+        """
+
+        return self._resolve("_resources", self._load_resources)
+
+    def _load_resources(self) -> ProjectResources:
+
+        resources_folder = self.get_resources_folder()
+
+        if hasattr(sys, "frozen"):
+            bundle_dir = get_bundle_dir()
+            index = find_bundle_index(bundle_dir)
+            if index is not None:
+                prefix = os.path.relpath(resources_folder, bundle_dir)
+                if not prefix.startswith(".."):
+                    return ProjectResources(index, prefix=prefix.replace(os.sep, "/"))
+
+        zipapp_path = get_zipapp_path()
+        if zipapp_path is not None:
+            index = ResourceIndex.load_from_zip(zipapp_path, self.main_module)
+            if index is not None:
+                prefix = os.path.relpath(resources_folder, zipapp_path)
+                return ProjectResources(index, prefix=prefix.replace(os.sep, "/"))
+
+        return ProjectResources(ResourceIndex.from_folder(resources_folder))
+
     def set_global(self, key: str, value: Any) -> None:
         """Set a global variable for this application."""
 
-        self._globals[key] = value
+        self._globals.set(key, value)
 
     def get_global(self, key: str) -> Any:
         """Retrieve a global variable for this application."""
 
         return self._globals.get(key, None)
 
+    @contextmanager
+    def globals_scope(self, **values: Any) -> Iterator[None]:
+        """Set global variables that are only visible in the current thread/asyncio task, until the scope is left."""
+
+        with self._globals.scope(values):
+            yield
+
     def register_singleton(self, obj: Any, reg_cls: Optional[Type] = None) -> None:
 
         if reg_cls is not None:
@@ -358,11 +761,10 @@ class ProjectMetadata(object):
         else:
             _reg_cls = obj.__class__
 
-        if _reg_cls in self._singletons.keys() and self._singletons[_reg_cls] != obj:
+        registered, _ = self._singletons.set_if_absent(_reg_cls, obj)
+        if registered != obj:
             raise Exception(f"Can't add singleton for class '{_reg_cls}': already set")
 
-        self._singletons[_reg_cls] = obj
-
     def get_singleton(self, cls: Type) -> Any:
 
         return self._singletons.get(cls, None)
@@ -385,16 +787,15 @@ class ProjectMetadata(object):
         result["hidden_imports"].add(f"{self.main_module}.defaults")
 
         # finding entry points
-        for entry_point_group, eps in entry_points().items():
+        for entry_point_group, eps in get_entry_points_index().items():
 
             for ep in eps:
-                if not ep.value.startswith(self.main_module):
+                if not ep["value"].startswith(self.main_module):
                     continue
 
-                result["entry_points"].setdefault(entry_point_group, {})[ep.name] = {
-                    "module": ep.module,
-                    "attr": ep.attr,
-                }
+                result["entry_points"].setdefault(entry_point_group, {})[
+                    ep["name"]
+                ] = {"module": ep["module"], "attr": ep["attr"]}
 
         mod_path = self.module_path
 
@@ -470,6 +871,9 @@ class ProjectMetadata(object):
         app_details = self.to_dict()
         build_time = datetime.utcnow()
         app_details["build_info"] = {"build_time": str(build_time)}
+        app_details["other_frkl_projects"] = {
+            name: md.to_snapshot() for name, md in self.other_frkl_projects.items()
+        }
 
         return {
             "app_details": app_details,
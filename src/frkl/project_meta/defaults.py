@@ -11,8 +11,10 @@ if not hasattr(sys, "frozen"):
     FRKL_PROJECT_META_MODULE_BASE_FOLDER = os.path.dirname(__file__)
     """Marker to indicate the base folder for the `frkl_project_meta` module."""
 else:
+    # pyinstaller sets '_MEIPASS' for both 'onefile' and 'onedir' builds, data files are
+    # bundled in a folder named after the main module
     FRKL_PROJECT_META_MODULE_BASE_FOLDER = os.path.join(
-        sys._MEIPASS, "frkl_project_meta"  # type: ignore
+        getattr(sys, "_MEIPASS", os.path.dirname(sys.executable)), "frkl.project_meta"
     )
     """Marker to indicate the base folder for the `frkl_project_meta` module."""
 
@@ -20,6 +22,20 @@ FRKL_PROJECT_META_RESOURCES_FOLDER = os.path.join(
     FRKL_PROJECT_META_MODULE_BASE_FOLDER, "resources"
 )
 
+PYINSTALLER_BUILD_MODES = ["onefile", "onedir"]
+"""How an application is bundled by pyinstaller:
+
+- 'onefile': a single executable, which extracts itself into a new temporary folder on every launch
+- 'onedir': a folder that contains the executable and all its dependencies, nothing is extracted at startup
+"""
+
+ENTRY_POINT_STARTUP_MODES = ["default", "lazy"]
+"""How a generated entry point starts the application:
+
+- 'default': the application is imported and run right away
+- 'lazy': a lazy metadata proxy is registered (see 'frkl.project_meta.lazy'), and '--help'/'--version' are answered
+  with output that was captured at build time, without importing the application
+"""
 
 PROJECT_META_DEFAULT_IGNORE_MODULES = [
     "zipp",
@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+import ast
+import inspect
+import logging
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+
+from appdirs import AppDirs
+from frkl.project_meta.utils import get_module_folder
+
+
+log = logging.getLogger("frkl")
+
+STATIC_MODULES: Mapping[str, ModuleType] = {"os": os, "sys": sys, "os.path": os.path}
+"""Modules that can be used when evaluating a 'defaults' module statically."""
+
+STATIC_NAMES: Mapping[Tuple[str, str], Any] = {
+    ("appdirs", "AppDirs"): AppDirs,
+    ("os", "path"): os.path,
+    ("os", "environ"): os.environ,
+}
+"""Objects that can be imported (via 'from x import y') when evaluating a 'defaults' module statically."""
+
+STATIC_CALLABLES: Tuple[Any, ...] = (
+    AppDirs,
+    os.path.abspath,
+    os.path.basename,
+    os.path.dirname,
+    os.path.expanduser,
+    os.path.join,
+    os.path.normpath,
+    os.path.realpath,
+    os.environ.get,
+    os.getenv,
+    hasattr,
+    str,
+)
+"""Functions without side effects, that can be called when evaluating a 'defaults' module statically.
+
+Compared by identity (bound methods by their object and function), not hashed: hashing 'os.environ.get'
+means hashing 'os.environ', which is not hashable on older Python versions.
+"""
+
+IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None), frozenset)
+
+
+def _is_static_callable(func: Any) -> bool:
+
+    for c in STATIC_CALLABLES:
+        if func is c:
+            return True
+        if (
+            inspect.ismethod(c)
+            and inspect.ismethod(func)
+            and func.__self__ is c.__self__
+            and func.__func__ is c.__func__
+        ):
+            return True
+    return False
+
+
+def _get_mutable_objects(value: Any) -> Dict[int, Any]:
+    """Return all mutable objects a value consists of (including itself), by id."""
+
+    if isinstance(value, (IMMUTABLE_TYPES, ModuleType, type)) or callable(value):
+        return {}
+
+    result: Dict[int, Any] = {}
+    if not isinstance(value, tuple):
+        result[id(value)] = value
+
+    if isinstance(value, Mapping):
+        items: Iterable[Any] = list(value.keys()) + list(value.values())
+    elif isinstance(value, (list, tuple, set)):
+        items = value
+    else:
+        items = []
+    for item in items:
+        result.update(_get_mutable_objects(item))
+    return result
+
+
+class _Unresolvable(Exception):
+    pass
+
+
+class StaticDefaultsEvaluator(object):
+    """Evaluates the module-level assignments of a 'defaults' module from its source, without executing it.
+
+    Only a small, side-effect free subset of Python is supported (literals, string operations, path
+    manipulation via 'os.path', 'AppDirs' objects, and 'if' statements that depend on those). Names whose value
+    can't be determined that way are recorded as unresolved.
+
+    Any other statement might have side effects: the names it binds, and all names whose values share a
+    mutable object with one it references (e.g. 'X.append(1)', 'CFG["k"] = 1', 'del X', 'X += [1]', or passing
+    a list to an unknown function) are recorded as unresolved as well, and those objects can't be used
+    afterwards.
+    """
+
+    def __init__(self, source: str, file_name: str):
+
+        self._source: str = source
+        self._file_name: str = file_name
+
+        self._namespace: Dict[str, Any] = {
+            "__file__": file_name,
+            "hasattr": hasattr,
+            "str": str,
+        }
+        self._unresolved: Set[str] = set()
+        # objects that might have been changed by a statement that was not evaluated, by id
+        self._tainted: Dict[int, Any] = {}
+
+    def evaluate(self) -> Tuple[Mapping[str, Any], Set[str]]:
+        """Evaluate the module.
+
+        Returns:
+            Tuple[Mapping[str, Any], Set[str]]: the resolved values, and the names that could not be resolved
+        """
+
+        tree = ast.parse(self._source, filename=self._file_name)
+        self._evaluate_statements(tree.body)
+
+        return self._namespace, self._unresolved
+
+    def _set(self, name: str, value: Any) -> None:
+
+        self._namespace[name] = value
+        self._unresolved.discard(name)
+
+    def _set_unresolved(self, names: Iterable[str]) -> None:
+
+        for name in names:
+            self._namespace.pop(name, None)
+            self._unresolved.add(name)
+
+    def _evaluate_statements(self, statements: Iterable[ast.stmt]) -> None:
+
+        for statement in statements:
+            try:
+                self._evaluate_statement(statement)
+            except Exception:
+                self._set_unresolved(self._get_affected_names(statement))
+
+    def _get_affected_names(self, statement: ast.stmt) -> Set[str]:
+        """Return the names whose value might have been changed by a statement that can't be evaluated."""
+
+        self._tainted.update(self._get_referenced_objects(statement))
+
+        names = _get_bound_names(statement)
+        for name, value in self._namespace.items():
+            if any(i in self._tainted for i in _get_mutable_objects(value)):
+                names.add(name)
+        return names
+
+    def _get_referenced_objects(self, node: ast.AST) -> Dict[int, Any]:
+        """Return the mutable objects a statement might change (everything it references, as well as the containers of assignment/'del' targets)."""
+
+        result: Dict[int, Any] = {}
+
+        def add(value: Any) -> None:
+            if inspect.ismethod(value):
+                value = value.__self__
+            result.update(_get_mutable_objects(value))
+
+        def try_add(expr: ast.expr) -> bool:
+            try:
+                add(self._evaluate_reference(expr))
+                return True
+            except Exception:
+                return False
+
+        if isinstance(node, (ast.Attribute, ast.Subscript)) and not isinstance(
+            node.ctx, ast.Load
+        ):
+            try_add(node.value)
+        elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            if node.id in self._namespace.keys():
+                add(self._namespace[node.id])
+            return result
+        elif isinstance(node, (ast.Name, ast.Attribute)) and try_add(node):
+            if isinstance(node, ast.Attribute):
+                return result
+
+        for child in ast.iter_child_nodes(node):
+            result.update(self._get_referenced_objects(child))
+        return result
+
+    def _evaluate_reference(self, node: ast.expr) -> Any:
+
+        if isinstance(node, ast.Name):
+            if node.id not in self._namespace.keys():
+                raise _Unresolvable()
+            return self._namespace[node.id]
+        return self._evaluate(node)
+
+    def _evaluate_statement(self, statement: ast.stmt) -> None:
+
+        if isinstance(statement, ast.Expr):
+            # docstrings, and other plain literals
+            ast.literal_eval(statement.value)
+            return
+
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.name in STATIC_MODULES.keys():
+                    if alias.asname:
+                        self._set(alias.asname, STATIC_MODULES[alias.name])
+                    else:
+                        base = alias.name.split(".")[0]
+                        self._set(base, STATIC_MODULES[base])
+                else:
+                    self._set_unresolved([alias.asname or alias.name.split(".")[0]])
+            return
+
+        if isinstance(statement, ast.ImportFrom):
+            for alias in statement.names:
+                key = (statement.module or "", alias.name)
+                if key in STATIC_NAMES.keys():
+                    self._set(alias.asname or alias.name, STATIC_NAMES[key])
+                else:
+                    self._set_unresolved([alias.asname or alias.name])
+            return
+
+        if isinstance(statement, ast.Assign):
+            value = self._evaluate(statement.value)
+            for target in statement.targets:
+                if not isinstance(target, ast.Name):
+                    raise _Unresolvable()
+                self._set(target.id, value)
+            return
+
+        if isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            if not isinstance(statement.target, ast.Name):
+                raise _Unresolvable()
+            self._set(statement.target.id, self._evaluate(statement.value))
+            return
+
+        if isinstance(statement, ast.If):
+            if self._evaluate(statement.test):
+                self._evaluate_statements(statement.body)
+            else:
+                self._evaluate_statements(statement.orelse)
+            return
+
+        raise _Unresolvable()
+
+    def _evaluate(self, node: ast.expr) -> Any:
+
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            items = [self._evaluate(e) for e in node.elts]
+            if isinstance(node, ast.Tuple):
+                return tuple(items)
+            elif isinstance(node, ast.Set):
+                return set(items)
+            return items
+
+        if isinstance(node, ast.Dict):
+            if any(k is None for k in node.keys):
+                raise _Unresolvable()
+            return {
+                self._evaluate(k): self._evaluate(v)  # type: ignore
+                for k, v in zip(node.keys, node.values)
+            }
+
+        if isinstance(node, ast.Name):
+            if node.id not in self._namespace.keys():
+                raise _Unresolvable()
+            return self._check_tainted(self._namespace[node.id])
+
+        if isinstance(node, ast.Attribute):
+            value = self._evaluate(node.value)
+            if node.attr.startswith("__") or not (
+                isinstance(value, (ModuleType, AppDirs)) or value is os.environ
+            ):
+                raise _Unresolvable()
+            if isinstance(value, ModuleType) and not any(
+                value is m for m in STATIC_MODULES.values()
+            ):
+                raise _Unresolvable()
+            try:
+                attr_value = getattr(value, node.attr)
+            except AttributeError:
+                raise _Unresolvable()
+            return self._check_tainted(attr_value)
+
+        if isinstance(node, ast.Call):
+            func = self._evaluate(node.func)
+            if not _is_static_callable(func):
+                raise _Unresolvable()
+            if any(isinstance(a, ast.Starred) for a in node.args) or any(
+                k.arg is None for k in node.keywords
+            ):
+                raise _Unresolvable()
+            args = [self._evaluate(a) for a in node.args]
+            kwargs: Dict[str, Any] = {
+                k.arg: self._evaluate(k.value)
+                for k in node.keywords
+                if k.arg is not None
+            }
+            return func(*args, **kwargs)
+
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left = self._evaluate(node.left)
+            right = self._evaluate(node.right)
+            if not isinstance(left, (str, int, float, list, tuple)):
+                raise _Unresolvable()
+            return left + right
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return not self._evaluate(node.operand)
+
+        if isinstance(node, ast.BoolOp):
+            values = [self._evaluate(v) for v in node.values]
+            if isinstance(node.op, ast.And):
+                return all(values)
+            return any(values)
+
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for v in node.values:
+                if isinstance(v, ast.FormattedValue):
+                    if v.conversion != -1 or v.format_spec is not None:
+                        raise _Unresolvable()
+                    parts.append(str(self._evaluate(v.value)))
+                else:
+                    parts.append(self._evaluate(v))
+            return "".join(parts)
+
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            raise _Unresolvable()
+
+    def _check_tainted(self, value: Any) -> Any:
+
+        if not self._tainted:
+            return value
+        check = value.__self__ if inspect.ismethod(value) else value
+        if any(i in self._tainted for i in _get_mutable_objects(check)):
+            raise _Unresolvable()
+        return value
+
+
+def _get_bound_names(node: ast.AST) -> Set[str]:
+    """Return all module-level names a statement binds (not descending into function or class bodies)."""
+
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return {alias.asname or alias.name.split(".")[0] for alias in node.names}
+    if isinstance(node, ast.Name):
+        return {node.id} if isinstance(node.ctx, (ast.Store, ast.Del)) else set()
+
+    names: Set[str] = set()
+    for child in ast.iter_child_nodes(node):
+        names.update(_get_bound_names(child))
+    return names
+
+
+class DefaultsResolver(object):
+    """Index of the default values of a project (the attributes of its '<main_module>.defaults' module).
+
+    Values are derived statically from the source of the 'defaults' module where possible, so the module
+    doesn't need to be executed (which often creates folders, or computes other values eagerly). Only if a
+    requested value can't be determined that way, the module is imported via *load_defaults*.
+
+    Args:
+        main_module: the main module of the project
+        load_defaults: a function that returns the (dynamically loaded) defaults for the project
+        static: whether to try to resolve values statically
+    """
+
+    def __init__(
+        self,
+        main_module: str,
+        load_defaults: Callable[[], Mapping[str, Any]],
+        static: bool = True,
+    ):
+
+        self._main_module: str = main_module
+        self._load_defaults: Callable[[], Mapping[str, Any]] = load_defaults
+        self._static: bool = static
+
+        self._static_values: Optional[Mapping[str, Any]] = None
+        self._unresolved: Optional[Set[str]] = None
+        self._lookup_cache: Dict[Any, Optional[Tuple[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state: Mapping[str, Any]) -> None:
+
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _ensure_static_values(self) -> None:
+
+        if self._static_values is not None:
+            return
+
+        with self._lock:
+            if self._static_values is not None:
+                return
+
+            values: Mapping[str, Any] = {}
+            unresolved: Set[str] = set()
+            source_file = None
+            if self._static:
+                module_folder = get_module_folder(self._main_module)
+                if module_folder is not None:
+                    source_file = os.path.join(module_folder, "defaults.py")
+
+            if source_file is not None and os.path.isfile(source_file):
+                try:
+                    with open(source_file, "r", encoding="utf-8") as f:
+                        source = f.read()
+                    values, unresolved = StaticDefaultsEvaluator(
+                        source, source_file
+                    ).evaluate()
+                except Exception as e:
+                    log.debug(f"Can't statically evaluate '{source_file}': {e}")
+                    values = {}
+                    unresolved = {"*"}
+            else:
+                unresolved = {"*"}
+
+            self._unresolved = set(
+                k for k in unresolved if k == "*" or not k.startswith("_")
+            )
+            self._static_values = {
+                k: v
+                for k, v in values.items()
+                if not k.startswith("_")
+                and not isinstance(v, (ModuleType, type))
+                and not callable(v)
+            }
+
+    @property
+    def fully_static(self) -> bool:
+        """Whether all default values could be determined without importing the 'defaults' module."""
+
+        self._ensure_static_values()
+        return not self._unresolved
+
+    def get_defaults(self) -> Mapping[str, Any]:
+        """Return all default values, only importing the 'defaults' module if necessary."""
+
+        self._ensure_static_values()
+        if not self._unresolved:
+            return self._static_values  # type: ignore
+        return self._load_defaults()
+
+    def get(self, key: str, default: Any = None) -> Any:
+
+        self._ensure_static_values()
+        if key in self._static_values.keys():  # type: ignore
+            return self._static_values[key]  # type: ignore
+        if key not in self._unresolved and "*" not in self._unresolved:  # type: ignore
+            return default
+        return self._load_defaults().get(key, default)
+
+    def _find(
+        self,
+        cache_key: Any,
+        key_match: Callable[[str], bool],
+        value_match: Optional[Callable[[Any], bool]] = None,
+    ) -> Optional[Tuple[str, Any]]:
+
+        if cache_key in self._lookup_cache.keys():
+            return self._lookup_cache[cache_key]
+
+        def match(k: str, v: Any) -> bool:
+            return key_match(k) and (value_match is None or value_match(v))
+
+        self._ensure_static_values()
+
+        result = None
+        for k in sorted(self._static_values.keys()):  # type: ignore
+            if match(k, self._static_values[k]):  # type: ignore
+                result = (k, self._static_values[k])  # type: ignore
+                break
+
+        # only if no statically resolved value matches, we need to check the real values
+        if result is None and any(
+            k == "*" or key_match(k) for k in self._unresolved  # type: ignore
+        ):
+            result = self._find_dynamic(match)
+
+        self._lookup_cache[cache_key] = result
+        return result
+
+    def _find_dynamic(
+        self, match: Callable[[str, Any], bool]
+    ) -> Optional[Tuple[str, Any]]:
+
+        defaults = self._load_defaults()
+        for k in sorted(defaults.keys()):
+            if match(k, defaults[k]):
+                return (k, defaults[k])
+        return None
+
+    def find_by_suffix(self, suffix: str) -> Optional[Tuple[str, Any]]:
+        """Return the (alphabetically) first default key/value pair where the key ends with the provided suffix.
+
+        Statically resolved values take precedence over ones that can only be determined by importing the module.
+        """
+
+        return self._find(("suffix", suffix), lambda k: k.endswith(suffix))
+
+    def find_instance(self, cls: Type) -> Optional[Tuple[str, Any]]:
+        """Return the (alphabetically) first default key/value pair where the value is an instance of the provided class.
+
+        Statically resolved values take precedence over ones that can only be determined by importing the module.
+        """
+
+        return self._find(
+            ("instance", cls), lambda k: True, lambda v: isinstance(v, cls)
+        )
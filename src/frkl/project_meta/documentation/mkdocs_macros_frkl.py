@@ -1,23 +1,280 @@
 # -*- coding: utf-8 -*-
+import ast
 import copy
+import hashlib
+import json
+import logging
 import os
+import re
+import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
-from deepdiff import DeepHash
 from frkl.project_meta.defaults import frkl_project_meta_app_dirs as project_dirs
-from pydoc_markdown.main import RenderSession
 
 
+try:
+    from importlib_metadata import distributions  # type: ignore
+except Exception:
+    from importlib.metadata import distributions  # type: ignore
+
+
+log = logging.getLogger("frkl")
+
 CACHE_DIR = os.path.join(project_dirs.user_cache_dir, "doc_gen")
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
+API_DOCS_CACHE_DIR = os.path.join(project_dirs.user_cache_dir, "api_docs")
+
+CLI_CACHE_MAX_ENTRIES = 512
+"""Maximum number of cached command outputs to keep."""
+CLI_CACHE_MAX_SIZE = 32 * 1024 * 1024
+"""Maximum combined size (in bytes) of all cached command outputs."""
+CLI_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+"""Maximum age (in seconds) of a cached command output."""
+
+CLI_PREFETCH_MAX_WORKERS = min(8, os.cpu_count() or 1)
+"""Maximum number of 'cli' macro commands that are executed concurrently before rendering."""
+CLI_COMMAND_TIMEOUT = 300
+"""Timeout (in seconds) for a single 'cli' macro command."""
+
+MACRO_EXPRESSION_REGEX = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+
 os_env_vars = copy.copy(os.environ)
 os_env_vars["CONSOLE_WIDTH"] = "100"
 
 
+def get_executable_version(executable: str) -> str:
+    """Return the version of the installed distribution that provides a console script."""
+
+    exe_name = os.path.basename(executable)
+    for dist in distributions():
+        for ep in dist.entry_points:
+            if ep.group == "console_scripts" and ep.name == exe_name:
+                return dist.version
+
+    return "n/a"
+
+
+class CliOutputCache(object):
+    """Cache for the output of commands executed by the 'cli' macro.
+
+    Entries are keyed on the command, as well as on a fingerprint of the resolved executable (path, size,
+    modification time and version of the distribution that provides it), so outdated output is never
+    served after the tool changed. Entries are evicted once they are older than *max_age* seconds, or
+    (least recently used first) once there are more than *max_entries* of them, or their combined size
+    exceeds *max_size* bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_entries: int = CLI_CACHE_MAX_ENTRIES,
+        max_size: int = CLI_CACHE_MAX_SIZE,
+        max_age: int = CLI_CACHE_MAX_AGE,
+    ):
+
+        self._cache_dir: str = cache_dir
+        self._max_entries: int = max_entries
+        self._max_size: int = max_size
+        self._max_age: int = max_age
+
+        self._fingerprints: Dict[str, str] = {}
+        self._evict_lock = threading.Lock()
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    def get_fingerprint(self, executable: str) -> str:
+
+        if executable in self._fingerprints.keys():
+            return self._fingerprints[executable]
+
+        path = shutil.which(executable)
+        if path is None:
+            fingerprint = f"not-found:{executable}"
+        else:
+            path = os.path.realpath(path)
+            stat = os.stat(path)
+            version = get_executable_version(executable)
+            fingerprint = f"{path}:{stat.st_size}:{stat.st_mtime_ns}:{version}"
+
+        self._fingerprints[executable] = fingerprint
+        return fingerprint
+
+    def get_cache_key(self, command: Iterable[str]) -> str:
+
+        cmd = [str(c) for c in command]
+        fingerprint = self.get_fingerprint(cmd[0]) if cmd else ""
+
+        data = json.dumps([cmd, fingerprint])
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get_cache_file(self, command: Iterable[str]) -> Path:
+
+        return Path(os.path.join(self._cache_dir, self.get_cache_key(command)))
+
+    def get(self, command: Iterable[str]) -> Optional[str]:
+
+        cache_file = self.get_cache_file(command)
+        try:
+            stat = cache_file.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if now - stat.st_mtime > self._max_age:
+            cache_file.unlink()
+            return None
+
+        # record the access time ourselves, since many filesystems are mounted with 'noatime'
+        os.utime(cache_file, (now, stat.st_mtime))
+        return cache_file.read_text()
+
+    def set(self, command: Iterable[str], output: str, evict: bool = True) -> None:
+
+        cache_file = self.get_cache_file(command)
+        temp_file = cache_file.with_name(
+            f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        temp_file.write_text(output)
+        os.replace(temp_file, cache_file)
+
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries, and the least recently used ones if the cache exceeds its limits."""
+
+        with self._evict_lock:
+            now = time.time()
+            entries: Dict[str, Tuple[float, int]] = {}
+            total_size = 0
+
+            for entry in os.scandir(self._cache_dir):
+                if entry.name.endswith(".tmp"):
+                    continue
+                # entries might be removed by another process (e.g. a concurrent docs build) at any time
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    if now - stat.st_mtime > self._max_age:
+                        os.unlink(entry.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                entries[entry.path] = (stat.st_atime, stat.st_size)
+                total_size += stat.st_size
+
+            if len(entries) <= self._max_entries and total_size <= self._max_size:
+                return
+
+            for path in sorted(entries.keys(), key=lambda p: entries[p][0]):
+                if len(entries) <= self._max_entries and total_size <= self._max_size:
+                    break
+                total_size -= entries.pop(path)[1]
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+
+def run_cli_command(
+    command: Iterable[str], timeout: Optional[float] = CLI_COMMAND_TIMEOUT
+) -> str:
+
+    result = subprocess.run(
+        list(command),
+        env=os_env_vars,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+        check=True,
+    )
+    return result.stdout.decode()
+
+
+def find_cli_commands(docs_dir: str) -> List[Tuple[str, ...]]:
+    """Find all 'cli' macro invocations (with literal arguments) in the markdown files of a docs folder."""
+
+    commands: List[Tuple[str, ...]] = []
+    seen: Set[Tuple[str, ...]] = set()
+
+    for md_file in sorted(Path(docs_dir).rglob("*.md")):
+
+        content = md_file.read_text()
+        for match in MACRO_EXPRESSION_REGEX.finditer(content):
+
+            if "cli" not in match.group(1):
+                continue
+
+            try:
+                tree = ast.parse(match.group(1).strip(), mode="eval")
+            except SyntaxError:
+                continue
+
+            for node in ast.walk(tree):
+                if (
+                    not isinstance(node, ast.Call)
+                    or not isinstance(node.func, ast.Name)
+                    or node.func.id != "cli"
+                ):
+                    continue
+
+                try:
+                    command = tuple(ast.literal_eval(arg) for arg in node.args)
+                except ValueError:
+                    log.debug(f"Not pre-executing non-literal 'cli' macro in: {md_file}")
+                    continue
+
+                if command and command not in seen:
+                    seen.add(command)
+                    commands.append(command)
+
+    return commands
+
+
+def prefetch_cli_commands(
+    cli_cache: CliOutputCache,
+    commands: Iterable[Tuple[str, ...]],
+    max_workers: int = CLI_PREFETCH_MAX_WORKERS,
+    timeout: Optional[float] = CLI_COMMAND_TIMEOUT,
+) -> Dict[Tuple[str, ...], BaseException]:
+    """Execute all uncached commands concurrently, and store their output in the cache.
+
+    Failed commands are not cached, they will be re-run (and their error reported) when the page that
+    contains them is rendered. The cache is only evicted once, after all commands finished.
+
+    Returns:
+        Dict[Tuple[str, ...], BaseException]: the commands that failed, with their errors
+    """
+
+    missing = [c for c in commands if cli_cache.get(c) is None]
+    if not missing:
+        return {}
+
+    def execute(command: Tuple[str, ...]) -> None:
+        output = run_cli_command(command, timeout=timeout)
+        cli_cache.set(command, output, evict=False)
+
+    failed: Dict[Tuple[str, ...], BaseException] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {c: executor.submit(execute, c) for c in missing}
+        for command, future in futures.items():
+            e = future.exception()
+            if e is not None:
+                log.warning(f"Can't pre-execute command '{' '.join(command)}': {e}")
+                failed[command] = e
+
+    cli_cache.evict()
+    return failed
+
+
 def define_env(env):
     """
     This is the hook for defining variables, macros and filters
@@ -28,6 +285,22 @@ def define_env(env):
 
     # env.variables["baz"] = "John Doe"
 
+    cli_cache = CliOutputCache(
+        cache_dir=env.variables.get("cli_cache_dir", CACHE_DIR)
+    )
+    cli_cache.evict()
+
+    docs_dir = env.conf.get("docs_dir", None)
+    if docs_dir and os.path.isdir(docs_dir):
+        prefetch_cli_commands(
+            cli_cache,
+            find_cli_commands(docs_dir),
+            max_workers=env.variables.get(
+                "cli_prefetch_max_workers", CLI_PREFETCH_MAX_WORKERS
+            ),
+            timeout=env.variables.get("cli_command_timeout", CLI_COMMAND_TIMEOUT),
+        )
+
     @env.macro
     def cli(
         *command,
@@ -36,17 +309,22 @@ def define_env(env):
         max_height: Optional[int] = None,
     ):
 
-        hashes = DeepHash(command)
-        hash_str = hashes[command]
-
-        cache_file: Path = Path(os.path.join(CACHE_DIR, str(hash_str)))
-        if cache_file.is_file():
-            stdout = cache_file.read_text()
-        else:
+        stdout = cli_cache.get(command)
+        if stdout is None:
             try:
-                result = subprocess.check_output(command, env=os_env_vars)
-                stdout = result.decode()
-                cache_file.write_text(stdout)
+                stdout = run_cli_command(
+                    command,
+                    timeout=env.variables.get(
+                        "cli_command_timeout", CLI_COMMAND_TIMEOUT
+                    ),
+                )
+                cli_cache.set(command, stdout)
+            except subprocess.TimeoutExpired as e:
+                # don't abort the whole docs build because of a single slow command
+                log.warning(
+                    f"Command '{' '.join(command)}' timed out after {e.timeout} seconds."
+                )
+                stdout = f"Command timed out after {e.timeout} seconds.\n"
             except subprocess.CalledProcessError as e:
                 print("stdout:")
                 print(e.stdout)
@@ -70,7 +348,231 @@ def define_env(env):
         return f"```{format}\n{f.read_text()}\n```"
 
 
-def build_api_docs(project_root: Optional[str] = None):
+def get_file_hash(path: str) -> str:
+
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_source_dir_listing(path: str) -> List[str]:
+    """Return the (sorted) Python files and sub-folders of a source folder."""
+
+    listing = []
+    for entry in os.scandir(path):
+        if entry.name.startswith(".") or entry.name == "__pycache__":
+            continue
+        if entry.is_dir() or entry.name.endswith(".py"):
+            listing.append(entry.name)
+
+    return sorted(listing)
+
+
+def _api_docs_sources_changed(manifest: Mapping[str, Any]) -> bool:
+
+    for path, listing in manifest["dirs"].items():
+        if not os.path.isdir(path) or get_source_dir_listing(path) != listing:
+            return True
+
+    for module_details in manifest["modules"].values():
+        path = module_details["filename"]
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return True
+        if (
+            stat.st_mtime_ns == module_details["mtime"]
+            and stat.st_size == module_details["size"]
+        ):
+            continue
+        if get_file_hash(path) != module_details["hash"]:
+            return True
+
+    return False
+
+
+INCREMENTAL_RENDERER_METHODS = ["get_resolver", "process", "render_to_string"]
+"""Renderer methods the incremental api docs generation relies on ('MarkdownRenderer' of pydoc-markdown 3.x)."""
+
+
+def _get_api_object_names(api_object: Any) -> Set[str]:
+    """Return the (unqualified) names of an api object, and of all its members."""
+
+    names = {api_object.name.split(".")[-1]}
+    for member in getattr(api_object, "members", None) or []:
+        names.update(_get_api_object_names(member))
+    return names
+
+
+def _get_docstrings(api_object: Any) -> str:
+
+    docstrings = [str(api_object.docstring or "")]
+    for member in getattr(api_object, "members", None) or []:
+        docstrings.append(_get_docstrings(member))
+    return "\n".join(docstrings)
+
+
+def _find_modules_to_render(
+    modules: Iterable[Any],
+    modules_details: Mapping[str, Mapping[str, Any]],
+    previous_modules: Mapping[str, Mapping[str, Any]],
+) -> List[str]:
+    """Return the names of the modules whose documentation has to be rendered again.
+
+    That is every module whose source changed, and every module whose docstrings mention a name (or the module
+    name) of a changed module, since those might contain cross-references. All modules are rendered again if the
+    set of modules changed, or the names defined in a changed module.
+    """
+
+    modules = list(modules)
+    all_names = [m.name for m in modules]
+    if sorted(all_names) != sorted(previous_modules.keys()):
+        return all_names
+
+    changed = [
+        m
+        for m in modules
+        if previous_modules[m.name]["hash"] != modules_details[m.name]["hash"]
+    ]
+    if not changed:
+        return []
+
+    changed_names: Set[str] = set()
+    for m in changed:
+        if modules_details[m.name]["names"] != previous_modules[m.name].get("names"):
+            return all_names
+        changed_names.add(m.name)
+        changed_names.add(m.name.split(".")[-1])
+        changed_names.update(modules_details[m.name]["names"])
+
+    names_regex = re.compile(
+        r"\b(" + "|".join(re.escape(n) for n in sorted(changed_names)) + r")\b"
+    )
+
+    to_render = []
+    for m in modules:
+        if m in changed or names_regex.search(_get_docstrings(m)):
+            to_render.append(m.name)
+    return to_render
+
+
+def render_api_docs_incremental(
+    config_file: str, pydocmd: Any, cache_dir: str = API_DOCS_CACHE_DIR
+) -> bool:
+    """Render the api documentation, re-using the output for all modules whose inputs did not change.
+
+    Requires a renderer that writes to a single file, has 'render_toc' disabled and provides the methods in
+    'INCREMENTAL_RENDERER_METHODS', otherwise all modules are rendered.
+
+    Returns:
+        bool: whether the api documentation file was (re-)written
+    """
+
+    renderer = pydocmd.renderer
+    if (
+        getattr(renderer, "render_toc", True)
+        or not getattr(renderer, "filename", None)
+        or not all(
+            callable(getattr(renderer, m, None)) for m in INCREMENTAL_RENDERER_METHODS
+        )
+    ):
+        log.debug(
+            "Incremental api docs generation not supported for this renderer config, rendering all modules."
+        )
+        modules = pydocmd.load_modules()
+        pydocmd.process(modules)
+        pydocmd.render(modules)
+        return True
+
+    config_hash = get_file_hash(config_file)
+    manifest_file = Path(
+        os.path.join(
+            cache_dir,
+            hashlib.sha256(os.path.abspath(config_file).encode()).hexdigest()
+            + ".json",
+        )
+    )
+
+    manifest: Dict[str, Any] = {}
+    if manifest_file.is_file():
+        try:
+            manifest = json.loads(manifest_file.read_text())
+        except Exception as e:
+            log.debug(f"Can't read api docs manifest '{manifest_file}': {e}")
+    if manifest.get("config_hash") != config_hash:
+        manifest = {}
+
+    if (
+        manifest
+        and os.path.isfile(renderer.filename)
+        and not _api_docs_sources_changed(manifest)
+    ):
+        log.debug("Api docs sources unchanged, not rendering.")
+        return False
+
+    previous_modules: Mapping[str, Mapping[str, Any]] = manifest.get("modules", {})
+
+    modules = pydocmd.load_modules()
+
+    modules_details: Dict[str, Dict[str, Any]] = {}
+    for m in modules:
+        filename = m.location.filename
+        stat = os.stat(filename)
+        modules_details[m.name] = {
+            "filename": filename,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": get_file_hash(filename),
+            "names": sorted(_get_api_object_names(m)),
+        }
+
+    to_render = _find_modules_to_render(modules, modules_details, previous_modules)
+    for m in modules:
+        if m.name not in to_render:
+            modules_details[m.name]["markdown"] = previous_modules[m.name]["markdown"]
+
+    log.debug(f"Rendering api docs for modules: {to_render}")
+    changed = [m for m in modules if m.name in to_render]
+    if changed:
+        # cross-references need to be resolved against all modules, not only the changed ones
+        pydocmd.process(modules)
+        resolver = renderer.get_resolver(modules)
+        renderer.process(changed, resolver)
+        for m in changed:
+            modules_details[m.name]["markdown"] = renderer.render_to_string([m])
+
+    content = "".join(modules_details[m.name]["markdown"] for m in modules)
+
+    output_file = Path(renderer.filename)
+    written = not output_file.is_file() or output_file.read_text() != content
+    if written:
+        run_hooks = getattr(pydocmd, "run_hooks", None)
+        if callable(run_hooks):
+            run_hooks("pre-render")
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(content, encoding=getattr(renderer, "encoding", None))
+        if callable(run_hooks):
+            run_hooks("post-render")
+
+    dirs = set(os.path.dirname(d["filename"]) for d in modules_details.values())
+    manifest = {
+        "config_hash": config_hash,
+        "dirs": {d: get_source_dir_listing(d) for d in sorted(dirs)},
+        "modules": modules_details,
+    }
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest_file.write_text(json.dumps(manifest))
+
+    return written
+
+
+def build_api_docs(project_root: Optional[str] = None, incremental: bool = False):
+    """Render the api documentation, as configured in the 'pydoc-markdown.yml' file of a project.
+
+    If *incremental* is set, only modules whose source changed since the last run (and the modules that might
+    cross-reference them) are rendered again, see 'render_api_docs_incremental'.
+    """
+
+    from pydoc_markdown.main import RenderSession
 
     if not project_root:
         project_root = os.getcwd()
@@ -78,4 +580,8 @@ def build_api_docs(project_root: Optional[str] = None):
     config = os.path.join(project_root, "pydoc-markdown.yml")
     session = RenderSession(config)
     pydocmd = session.load()
-    session.render(pydocmd)
+
+    if incremental:
+        render_api_docs_incremental(config, pydocmd)
+    else:
+        session.render(pydocmd)
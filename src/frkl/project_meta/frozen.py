@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Simulate a frozen (pyinstaller) application, without building it.
+
+A bundle folder is laid out the way pyinstaller would extract it, from the output of
+'PyinstallerBuildRenderer.create_analysis_args' (data files, 'app.json', resources), and the generated entry point
+script is run with 'sys.frozen' and 'sys._MEIPASS' set. Python modules are imported from the current environment,
+not from a 'PYZ' archive, so import time differs from a real build, but all the frozen-mode code paths (reading
+'app.json', the frozen base folder in 'defaults', the entry point dispatch) are exercised.
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.pyinstaller import PyinstallerBuildRenderer
+
+
+FROZEN_ENTRY_POINT_FILE_NAME = "frkl_frozen_entry_point.py"
+
+FROZEN_BOOTSTRAP = """
+import atexit, os, runpy, sys, time
+
+_start = time.perf_counter()
+_timing_file = os.environ.get("FRKL_FROZEN_TIMING_FILE", None)
+if _timing_file:
+    def _write_timing():
+        with open(_timing_file, "w") as f:
+            f.write(str(time.perf_counter() - _start))
+    atexit.register(_write_timing)
+
+sys.frozen = True
+sys._MEIPASS = sys.argv[1]
+sys.argv = sys.argv[2:]
+runpy.run_path({script!r}, run_name="__main__")
+"""
+
+
+def create_frozen_layout(
+    project_metadata: ProjectMetadata,
+    bundle_dir: str,
+    resources_mode: str = "files",
+    build_mode: str = "onedir",
+    startup_mode: str = "default",
+) -> Mapping[str, Any]:
+    """Create a folder that contains the data files of a pyinstaller build of a project, at their bundled location.
+
+    Args:
+        project_metadata: the metadata of the project
+        bundle_dir: the folder to create the layout in (acts as 'sys._MEIPASS')
+        resources_mode: how to bundle resource files (see 'frkl.project_meta.resource_bundle')
+        build_mode: the build mode to record in 'app.json'
+        startup_mode: how the generated entry point starts the application (see 'frkl.project_meta.lazy')
+
+    Returns:
+        Mapping[str, Any]: the bundle folder, the path of the entry point script, and the executable name
+    """
+
+    bundle_dir = os.path.abspath(bundle_dir)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    renderer = PyinstallerBuildRenderer(
+        project_metadata,
+        resources_mode=resources_mode,
+        build_mode=build_mode,
+        startup_mode=startup_mode,
+    )
+
+    working_dir = tempfile.mkdtemp(prefix="frkl_frozen_")
+    try:
+        analysis_args = renderer.create_analysis_args(working_dir)
+
+        for src, dest in analysis_args["datas"]:
+            target_dir = os.path.join(bundle_dir, dest)
+            os.makedirs(target_dir, exist_ok=True)
+            shutil.copy2(src, os.path.join(target_dir, os.path.basename(src)))
+
+        script = os.path.join(bundle_dir, FROZEN_ENTRY_POINT_FILE_NAME)
+        shutil.copy2(analysis_args["scripts"][0], script)
+    finally:
+        shutil.rmtree(working_dir, ignore_errors=True)
+
+    return {
+        "bundle_dir": bundle_dir,
+        "script": script,
+        "exe_name": renderer.get_exe_name(),
+        "main_module": renderer.get_main_module(),
+    }
+
+
+def run_frozen(
+    layout: Mapping[str, Any],
+    args: Iterable[str],
+    timing_file: Optional[str] = None,
+    **kwargs: Any,
+) -> subprocess.CompletedProcess:
+    """Run the entry point of a simulated frozen application in a new interpreter.
+
+    Args:
+        layout: the result of 'create_frozen_layout'
+        args: the command-line arguments for the application
+        timing_file: if provided, the time from the start of the bootstrap until the interpreter exits is written here
+        kwargs: passed to 'subprocess.run'
+    """
+
+    env = dict(kwargs.pop("env", None) or os.environ)
+    if timing_file:
+        env["FRKL_FROZEN_TIMING_FILE"] = timing_file
+
+    bootstrap = FROZEN_BOOTSTRAP.format(script=layout["script"])
+    cmd = [
+        sys.executable,
+        "-c",
+        bootstrap,
+        layout["bundle_dir"],
+        layout["exe_name"],
+    ] + list(args)
+
+    # run outside of the project folder, so modules are not accidentally imported from there
+    kwargs.setdefault("cwd", layout["bundle_dir"])
+    return subprocess.run(cmd, env=env, **kwargs)
+
+
+def time_frozen_startup(
+    layout: Mapping[str, Any], args: Iterable[str], runs: int = 10
+) -> Dict[str, Any]:
+    """Time the startup of a simulated frozen application, until the command it dispatches to has finished.
+
+    Returns:
+        Dict[str, Any]: 'wall' (whole process, including interpreter startup) and 'app' (from the start of the
+            bootstrap, excluding interpreter startup) timings, each with 'first', 'min', 'median' and 'mean'
+    """
+
+    args = list(args)
+    wall: List[float] = []
+    app: List[float] = []
+
+    with tempfile.TemporaryDirectory(prefix="frkl_frozen_timing_") as temp_dir:
+        timing_file = os.path.join(temp_dir, "timing")
+        for _ in range(runs + 1):
+            start = time.perf_counter()
+            run_frozen(
+                layout,
+                args,
+                timing_file=timing_file,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            wall.append(time.perf_counter() - start)
+            with open(timing_file, "r") as f:
+                app.append(float(f.read()))
+
+    def summary(times: List[float]) -> Dict[str, float]:
+
+        rest = times[1:] if len(times) > 1 else times
+        return {
+            "first": times[0],
+            "min": min(rest),
+            "median": statistics.median(rest),
+            "mean": statistics.mean(rest),
+        }
+
+    return {"runs": runs, "wall": summary(wall), "app": summary(app)}
@@ -1,32 +1,53 @@
 # -*- coding: utf-8 -*-
-import json
 import os
+import sys
+import typing
 from pathlib import Path
 from typing import Optional
 
 import asyncclick as click
-from frkl.project_meta.core import ProjectMetadata
-from frkl.project_meta.pyinstaller import PyinstallerBuildRenderer
+from frkl.project_meta.defaults import (
+    ENTRY_POINT_STARTUP_MODES,
+    PYINSTALLER_BUILD_MODES,
+)
+from frkl.project_meta.resource_bundle import RESOURCE_MODES
+from frkl.project_meta.serialization import dump_json
 
 
+# heavy dependencies (metadata discovery, the pyinstaller/jinja2 build toolchain) are only imported
+# within the subcommand that needs them, to keep startup (and '--help') fast
+
 click.anyio_backend = "asyncio"
 
 
 @click.group()
+@click.option(
+    "--memory-profile",
+    is_flag=True,
+    help="trace memory usage, and print the projects/distributions that allocated the most to stderr",
+)
 @click.pass_context
-def cli(ctx):
+def cli(ctx, memory_profile: bool = False):
+
+    if memory_profile:
+        from frkl.project_meta.profiling import enable_memory_profiling
+
+        profiler = enable_memory_profiling()
+
+        def print_report():
+            print(profiler.create_report(), file=sys.stderr)
 
-    pass
+        ctx.call_on_close(print_report)
 
 
 @cli.command()
 @click.argument("main_module", nargs=1)
 def update_project_metadata(main_module: str):
 
+    from frkl.project_meta.core import ProjectMetadata
+
     md_obj: ProjectMetadata = ProjectMetadata(project_main_module=main_module)
-    md_json = json.dumps(
-        md_obj.to_dict(), sort_keys=True, indent=2, separators=(",", ": ")
-    )
+    md_dict = md_obj.to_dict()
 
     base_dir = Path(".")
 
@@ -37,7 +58,170 @@ def update_project_metadata(main_module: str):
     md_file = md_dir / "project.json"
 
     print(f"Writing metadata to: {md_file.as_posix()}")
-    md_file.write_text(md_json)
+    with md_file.open("w", encoding="utf-8") as f:
+        dump_json(md_dict, f)
+
+
+@cli.command()
+@click.argument("main_module", nargs=1)
+@click.option(
+    "--interval",
+    type=float,
+    default=1.0,
+    help="how often to check for changes (in seconds)",
+)
+@click.option(
+    "--pyinstaller-config",
+    "pyinstaller_config_path",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="also keep the pyinstaller config in this folder up to date",
+)
+@click.option(
+    "--resources-mode",
+    type=click.Choice(RESOURCE_MODES),
+    default="files",
+    help="how to bundle resource files (if keeping the pyinstaller config up to date)",
+)
+@click.option(
+    "--build-mode",
+    type=click.Choice(PYINSTALLER_BUILD_MODES),
+    default="onefile",
+    help="the build mode (if keeping the pyinstaller config up to date)",
+)
+@click.option(
+    "--startup-mode",
+    type=click.Choice(ENTRY_POINT_STARTUP_MODES),
+    default="default",
+    help="the startup mode (if keeping the pyinstaller config up to date)",
+)
+@click.pass_context
+def watch(
+    ctx,
+    main_module: str,
+    interval: float,
+    pyinstaller_config_path: Optional[str],
+    resources_mode: str = "files",
+    build_mode: str = "onefile",
+    startup_mode: str = "default",
+):
+    """Keep '.frkl/project.json' up to date while the project sources change."""
+
+    from frkl.project_meta.watch import ProjectWatcher
+
+    watcher = ProjectWatcher(
+        main_module=main_module,
+        pyinstaller_config_path=pyinstaller_config_path,
+        interval=interval,
+        resources_mode=resources_mode,
+        build_mode=build_mode,
+        startup_mode=startup_mode,
+    )
+
+    def report(changed, written):
+        if changed:
+            print(f"Changed: {', '.join(sorted(changed))}")
+        for path in written:
+            print(f"Updated: {path}")
+
+    print(f"Watching '{main_module}' for changes (press Ctrl-C to stop)...")
+    try:
+        watcher.watch(callback=report)
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.argument("main_modules", nargs=-1)
+@click.option(
+    "--file",
+    "-f",
+    "workspace_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="a workspace file (JSON), listing the projects of the workspace",
+)
+@click.option(
+    "--pyinstaller/--no-pyinstaller",
+    default=False,
+    help="also create the pyinstaller config for every project",
+)
+@click.option(
+    "--resources-mode",
+    type=click.Choice(RESOURCE_MODES),
+    default="files",
+    help="how to bundle resource files (if creating pyinstaller configs)",
+)
+@click.option(
+    "--workers", type=int, default=None, help="the number of worker processes"
+)
+@click.pass_context
+def workspace(
+    ctx,
+    main_modules,
+    workspace_file: Optional[str],
+    pyinstaller: bool,
+    resources_mode: str,
+    workers: Optional[int],
+):
+    """Update the metadata (and pyinstaller config) of several projects at once."""
+
+    from frkl.project_meta.workspace import (
+        WorkspaceProject,
+        generate_workspace,
+        load_workspace_file,
+    )
+
+    projects = []
+    if workspace_file:
+        projects.extend(load_workspace_file(workspace_file))
+    projects.extend(WorkspaceProject(main_module=m) for m in main_modules)
+
+    if not projects:
+        raise click.UsageError("No projects specified.")
+
+    result = generate_workspace(
+        projects,
+        pyinstaller=pyinstaller,
+        resources_mode=resources_mode,
+        max_workers=workers,
+    )
+
+    width = max(
+        [len("shared discovery")] + [len(p["main_module"]) for p in result["projects"]]
+    )
+    print(f"{'shared discovery':<{width}}  {result['shared_duration']:7.2f}s")
+    for p in result["projects"]:
+        if p["error"]:
+            status = f"error: {p['error']}"
+        elif p["written"]:
+            status = f"updated {len(p['written'])} file(s)"
+        else:
+            status = "unchanged"
+        print(f"{p['main_module']:<{width}}  {p['duration']:7.2f}s  {status}")
+    print(f"{'total':<{width}}  {result['duration']:7.2f}s")
+
+    if any(p["error"] for p in result["projects"]):
+        ctx.exit(1)
+
+
+@cli.command()
+@click.argument("paths", nargs=-1, required=True)
+@click.option(
+    "--workers", type=int, default=None, help="the number of worker processes"
+)
+@click.pass_context
+def scan(ctx, paths, workers: Optional[int]):
+    """Read the metadata of all frkl projects in other environments (virtualenv roots, or 'site-packages' folders), without running their interpreters."""
+
+    from frkl.project_meta.scanner import scan_environments
+
+    results = scan_environments(paths, max_workers=workers)
+    dump_json(results, sys.stdout)
+    print()
+
+    if any(r["error"] for r in results):
+        ctx.exit(1)
 
 
 @cli.command()
@@ -45,12 +229,25 @@ def update_project_metadata(main_module: str):
 @click.pass_context
 def metadata(ctx, main_module: str):
 
+    from frkl.project_meta.core import ProjectMetadata
+
     md_obj: ProjectMetadata = ProjectMetadata(project_main_module=main_module)
 
-    md_json = json.dumps(
-        md_obj.to_dict(), sort_keys=True, indent=2, separators=(",", ": ")
-    )
-    print(md_json)
+    dump_json(md_obj.to_dict(), sys.stdout)
+    print()
+
+
+@cli.command()
+@click.argument("main_module", nargs=1)
+@click.argument("path", nargs=1, required=False)
+@click.pass_context
+def snapshot(ctx, main_module: str, path: Optional[str] = None):
+    """Write a metadata snapshot for an installed project, to speed up metadata loading at runtime."""
+
+    from frkl.project_meta.snapshot import write_snapshot
+
+    snapshot_file = write_snapshot(main_module=main_module, path=path)
+    print(f"Wrote metadata snapshot to: {snapshot_file}")
 
 
 @cli.command()
@@ -58,36 +255,123 @@ def metadata(ctx, main_module: str):
 @click.pass_context
 def runtime_info(ctx, main_module: str):
 
+    from frkl.project_meta.core import ProjectMetadata
+
     md_obj: ProjectMetadata = ProjectMetadata(project_main_module=main_module)
 
-    md_json = json.dumps(
-        md_obj.runtime_details, sort_keys=True, indent=2, separators=(",", ": ")
-    )
-    print(md_json)
+    dump_json(md_obj.runtime_details, sys.stdout)
+    print()
 
 
 @cli.command()
 @click.argument("main_module", nargs=1)
 @click.argument("path", nargs=1, required=False)
+@click.option(
+    "--resources-mode",
+    type=click.Choice(RESOURCE_MODES),
+    default="files",
+    help="how to bundle resource files: as is, deduplicated, or in a single compressed archive",
+)
+@click.option(
+    "--build-mode",
+    type=click.Choice(PYINSTALLER_BUILD_MODES),
+    default="onefile",
+    help="build a single executable, or a folder (faster startup, nothing to extract)",
+)
+@click.option(
+    "--startup-mode",
+    type=click.Choice(ENTRY_POINT_STARTUP_MODES),
+    default="default",
+    help="'lazy': defer loading metadata, and answer '--help'/'--version' with output captured at build time",
+)
 @click.pass_context
-def pyinstaller_config(ctx, main_module: str, path: Optional[str] = None):
+def pyinstaller_config(
+    ctx,
+    main_module: str,
+    path: Optional[str] = None,
+    resources_mode: str = "files",
+    build_mode: str = "onefile",
+    startup_mode: str = "default",
+):
+
+    from frkl.project_meta.core import ProjectMetadata
+    from frkl.project_meta.pyinstaller import PyinstallerBuildRenderer
 
     if not path:
         path = os.getcwd()
 
     md_obj: ProjectMetadata = ProjectMetadata(project_main_module=main_module)
-    renderer = PyinstallerBuildRenderer(md_obj)
-    analysis_args = renderer.create_analysis_args(path)
-
-    md_json = json.dumps(
-        analysis_args, sort_keys=True, indent=2, separators=(",", ": ")
+    renderer = PyinstallerBuildRenderer(
+        md_obj,
+        resources_mode=resources_mode,
+        build_mode=build_mode,
+        startup_mode=startup_mode,
     )
+    analysis_args = renderer.create_analysis_args(path)
 
     analysis_args_file = os.path.join(path, "pyinstaller_args.json")
 
     print(f"Writing pyinstaller config to: {analysis_args_file}")
-    with open(analysis_args_file, "w") as f:
-        f.write(md_json)
+    with open(analysis_args_file, "w", encoding="utf-8") as f:
+        dump_json(analysis_args, f)
+
+    build_options_file = os.path.join(path, "pyinstaller_build.json")
+    with open(build_options_file, "w", encoding="utf-8") as f:
+        dump_json(renderer.create_build_options(), f)
+
+
+@cli.command()
+@click.argument("main_module", nargs=1)
+@click.argument("target", nargs=1)
+@click.option(
+    "--include-sources",
+    is_flag=True,
+    help="also add the Python source files, not only the compiled bytecode",
+)
+@click.option(
+    "--python",
+    default="/usr/bin/env python3",
+    help="the interpreter to use in the shebang line of the archive",
+)
+@click.option(
+    "--startup-mode",
+    type=click.Choice(ENTRY_POINT_STARTUP_MODES),
+    default="default",
+    help="'lazy': defer loading metadata, and answer '--help'/'--version' with output captured at build time",
+)
+@click.option(
+    "--extra",
+    "-e",
+    multiple=True,
+    help="include the requirements of this extra of the project(s) (e.g. 'cli'), can be used multiple times",
+)
+@click.pass_context
+def zipapp(
+    ctx,
+    main_module: str,
+    target: str,
+    include_sources: bool = False,
+    python: str = "/usr/bin/env python3",
+    startup_mode: str = "default",
+    extra: typing.Tuple[str, ...] = (),
+):
+    """Build a zipapp: a single archive that runs with the current Python version, without extracting anything."""
+
+    from frkl.project_meta.zipapp import build_zipapp
+
+    result = build_zipapp(
+        main_module=main_module,
+        target=target,
+        include_sources=include_sources,
+        interpreter=python,
+        extras=extra,
+        startup_mode=startup_mode,
+    )
+    print(f"Wrote zipapp ({result['files']} files) to: {result['target']}")
+    if result["skipped"]:
+        print(
+            f"Not included (binary extension modules): {', '.join(result['skipped'])}"
+        )
 
 
 if __name__ == "__main__":
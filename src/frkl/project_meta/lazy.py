@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Deferred metadata loading, for fast application startup.
+
+A generated entry point (in 'lazy' startup mode) registers a 'LazyProjectMetadata' proxy for the application before
+anything else is imported. The proxy answers a few fields from constants that were baked into the entry point at
+build time, and only creates the actual 'ProjectMetadata' object (which, in a frozen app, reads 'app.json') when any
+other field is accessed. This module must stay cheap to import: 'frkl.project_meta.core' is only imported then.
+
+'ProjectMetadata' objects that are created directly (e.g. by an applications own 'get_project_metadata' function)
+for a registered project behave the same way: they serve the baked fields, and only read 'app.json' once another
+field is accessed.
+"""
+import threading
+import typing
+from typing import Any, Dict, Mapping, Optional
+
+
+if typing.TYPE_CHECKING:
+    from frkl.project_meta.core import ProjectMetadata
+
+BAKED_METADATA_FIELDS = ["main_module", "version", "exe_name", "project_name"]
+"""Fields that are baked into the generated entry point, and served by the proxy without loading anything."""
+
+_lazy_metadata: Dict[str, "LazyProjectMetadata"] = {}
+_lazy_metadata_lock = threading.Lock()
+
+
+class LazyProjectMetadata(object):
+    """A stand-in for a 'ProjectMetadata' object, which is only created when it is first needed.
+
+    Args:
+        main_module: the main module of the project
+        constants: values for (some of) the fields in 'BAKED_METADATA_FIELDS'
+    """
+
+    def __init__(
+        self, main_module: str, constants: Optional[Mapping[str, Any]] = None
+    ):
+
+        if constants is None:
+            constants = {}
+
+        self._main_module: str = main_module
+        self._constants: Dict[str, Any] = {
+            k: v for k, v in constants.items() if k in BAKED_METADATA_FIELDS
+        }
+        self._constants["main_module"] = main_module
+        self._project_metadata: Optional["ProjectMetadata"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the actual 'ProjectMetadata' object was created already."""
+
+        return self._project_metadata is not None
+
+    def get_project_metadata(self) -> "ProjectMetadata":
+        """Return the actual 'ProjectMetadata' object, creating it if necessary."""
+
+        if self._project_metadata is None:
+            with self._lock:
+                if self._project_metadata is None:
+                    from frkl.project_meta.core import ProjectMetadata
+
+                    self._project_metadata = ProjectMetadata(
+                        project_main_module=self._main_module
+                    )
+
+        return self._project_metadata
+
+    def __getattr__(self, name: str) -> Any:
+
+        # only called for attributes that are not set on the proxy itself
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        constants = self.__dict__.get("_constants", {})
+        if name in constants.keys():
+            return constants[name]
+
+        return getattr(self.get_project_metadata(), name)
+
+    def __repr__(self):
+
+        return f"LazyProjectMetadata(main_module='{self._main_module}', loaded={self.is_loaded})"
+
+
+def register_lazy_metadata(
+    main_module: str, constants: Optional[Mapping[str, Any]] = None
+) -> LazyProjectMetadata:
+    """Register a lazy metadata proxy for a project (called from generated entry points)."""
+
+    with _lazy_metadata_lock:
+        proxy = _lazy_metadata.get(main_module, None)
+        if proxy is None:
+            proxy = LazyProjectMetadata(main_module, constants=constants)
+            _lazy_metadata[main_module] = proxy
+
+    return proxy
+
+
+def get_lazy_metadata(main_module: str) -> Optional[LazyProjectMetadata]:
+    """Return the lazy metadata proxy that was registered for a project, if any."""
+
+    return _lazy_metadata.get(main_module, None)
+
+
+def get_startup_constants(main_module: str) -> Optional[Mapping[str, Any]]:
+    """Return the constants that were baked into the generated entry point for a project, if it registered any."""
+
+    proxy = _lazy_metadata.get(main_module, None)
+    if proxy is None:
+        return None
+    return proxy._constants
+
+
+def get_project_metadata(main_module: str) -> Any:
+    """Return the registered lazy metadata proxy for a project, or a new 'ProjectMetadata' object if there is none.
+
+    Meant to be used by applications in their own (cached) 'get_project_metadata' function, if they don't want to
+    import 'frkl.project_meta.core' at startup. Note that the proxy is not a 'ProjectMetadata' instance.
+    """
+
+    proxy = _lazy_metadata.get(main_module, None)
+    if proxy is not None:
+        return proxy
+
+    from frkl.project_meta.core import ProjectMetadata
+
+    return ProjectMetadata(project_main_module=main_module)
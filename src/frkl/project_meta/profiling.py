@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Attribute memory usage (via 'tracemalloc') and imported modules to the steps of metadata collection.
+
+Profiling is disabled by default. Once enabled (e.g. via the '--memory-profile' flag of 'frkl-project'), every
+probed distribution in 'discover_installed_modules', and every lazy 'ProjectMetadata' attribute that is resolved,
+is recorded along with the memory that was allocated (and not freed again), and the modules that were imported
+while doing so.
+"""
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+TRACEMALLOC_FRAMES = 1
+"""Number of frames 'tracemalloc' stores per allocation, more frames make tracing slower."""
+
+_memory_profiler: Optional["MemoryProfiler"] = None
+
+
+class MemoryProfiler(object):
+    """Collects the memory usage and imports of named steps, grouped by category ('distribution', 'attribute').
+
+    Nested steps are each recorded in full, so the numbers of different categories overlap.
+    """
+
+    def __init__(self):
+
+        self._records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._started_tracing: bool = False
+
+    def start(self) -> None:
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def measure(self, category: str, name: str) -> Iterator[None]:
+        """Record the memory allocated and the modules imported within this context."""
+
+        modules_before = set(sys.modules.keys())
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            memory = tracemalloc.get_traced_memory()[0] - memory_before
+            new_modules = sorted(set(sys.modules.keys()) - modules_before)
+
+            with self._lock:
+                self._records.append(
+                    {
+                        "category": category,
+                        "name": name,
+                        "memory": memory,
+                        "new_modules": new_modules,
+                        "duration": duration,
+                    }
+                )
+
+    def get_records(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+
+        with self._lock:
+            return [
+                dict(r)
+                for r in self._records
+                if category is None or r["category"] == category
+            ]
+
+    def get_top(
+        self, num: int = 10, category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the records that allocated the most memory."""
+
+        records = self.get_records(category=category)
+        return sorted(records, key=lambda r: r["memory"], reverse=True)[:num]
+
+    def create_report(self, num: int = 10) -> str:
+        """Return a human readable summary of the top offenders of every category."""
+
+        lines = []
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(
+            f"traced memory: {_format_size(current)} (peak: {_format_size(peak)}), modules loaded: {len(sys.modules)}"
+        )
+
+        categories = sorted(set(r["category"] for r in self.get_records()))
+        for category in categories:
+            top = self.get_top(num=num, category=category)
+            width = max(len(r["name"]) for r in top)
+            lines.append("")
+            lines.append(f"top {len(top)} by memory ({category}):")
+            for r in top:
+                modules = ", ".join(r["new_modules"][:3])
+                if len(r["new_modules"]) > 3:
+                    modules = f"{modules}, ..."
+                lines.append(
+                    f"  {r['name']:<{width}}  {_format_size(r['memory']):>10}  {r['duration']:7.3f}s  {len(r['new_modules']):4} modules  {modules}".rstrip()
+                )
+
+        return "\n".join(lines)
+
+
+def _format_size(size: int) -> str:
+
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size = size / 1024  # type: ignore
+    return f"{size:.1f} GiB"
+
+
+def enable_memory_profiling() -> MemoryProfiler:
+    """Start tracing memory allocations, and record all steps of metadata collection from now on."""
+
+    global _memory_profiler
+
+    if _memory_profiler is None:
+        _memory_profiler = MemoryProfiler()
+        _memory_profiler.start()
+    return _memory_profiler
+
+
+def disable_memory_profiling() -> None:
+
+    global _memory_profiler
+
+    if _memory_profiler is not None:
+        _memory_profiler.stop()
+        _memory_profiler = None
+
+
+def get_memory_profiler() -> Optional[MemoryProfiler]:
+
+    return _memory_profiler
+
+
+@contextmanager
+def measure_memory(
+    category: str, name: str, profiler: Optional[MemoryProfiler] = None
+) -> Iterator[None]:
+    """Record a step with the provided (or the global) profiler, does nothing if profiling is not enabled."""
+
+    if profiler is None:
+        profiler = _memory_profiler
+    if profiler is None:
+        yield
+        return
+
+    with profiler.measure(category, name):
+        yield
@@ -3,20 +3,56 @@ import importlib
 import json
 import logging
 import os
+import shutil
+import subprocess
+import sys
 import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 import jinja2
 from frkl.project_meta.core import ProjectMetadata
-from frkl.project_meta.defaults import FRKL_PROJECT_META_RESOURCES_FOLDER
-from jinja2 import Environment
+from frkl.project_meta.defaults import (
+    ENTRY_POINT_STARTUP_MODES,
+    FRKL_PROJECT_META_RESOURCES_FOLDER,
+    PYINSTALLER_BUILD_MODES,
+    frkl_project_meta_app_dirs,
+)
+from frkl.project_meta.resource_bundle import RESOURCE_MODES, create_resource_bundle
+from frkl.project_meta.serialization import dump_json, to_json
+from frkl.project_meta.utils import write_file_if_changed
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 
 log = logging.getLogger("frkl.project_meta")
 
 DEFAULT_EXCLUDE_DIRS = [".git", ".tox", ".cache", ".mypy_cache"]
 
+TEMPLATE_CACHE_SIZE = 128
+"""Maximum number of compiled string templates to keep in memory."""
+TEMPLATE_BYTECODE_CACHE_DIR = os.path.join(
+    frkl_project_meta_app_dirs.user_cache_dir, "templates"
+)
+
+BAKED_OUTPUT_ARGS = [["--help"], ["--version"]]
+"""Arguments for which the output of a console script is captured at build time, in 'lazy' startup mode."""
+
+PYINSTALLER_ARGS_FILE_NAME = "pyinstaller_args.json"
+PYINSTALLER_BUILD_FILE_NAME = "pyinstaller_build.json"
+
+CAPTURE_OUTPUT_SCRIPT = """
+import sys
+sys.argv[0] = {script_name!r}
+from {module} import {attr} as cli
+cli(_anyio_backend="asyncio")
+"""
+
+_template_env: Optional[Environment] = None
+_template_env_lock = threading.Lock()
+_compiled_templates: "OrderedDict[str, jinja2.Template]" = OrderedDict()
+
 
 # -----------------------------------------------------------
 # helper methods
@@ -71,6 +107,54 @@ if ep_packages:
     return hooks, hiddenimports
 
 
+def get_template_env() -> Environment:
+    """Return the (shared) jinja environment, which can also load the templates bundled with this package."""
+
+    global _template_env
+
+    if _template_env is None:
+        with _template_env_lock:
+            if _template_env is None:
+                _template_env = Environment(
+                    loader=FileSystemLoader(FRKL_PROJECT_META_RESOURCES_FOLDER)
+                )
+
+    return _template_env
+
+
+def enable_template_bytecode_cache(cache_dir: Optional[str] = None) -> None:
+    """Cache the compiled bytecode of bundled templates on disk, so they are not parsed again in later runs."""
+
+    if cache_dir is None:
+        cache_dir = TEMPLATE_BYTECODE_CACHE_DIR
+
+    os.makedirs(cache_dir, exist_ok=True)
+    env = get_template_env()
+    env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    # templates that were already loaded would otherwise never be written to the new cache
+    if env.cache is not None:
+        env.cache.clear()
+
+
+def get_string_template(template_string: str) -> jinja2.Template:
+    """Return the compiled template for a template string, compiling it only if it is not cached yet."""
+
+    with _template_env_lock:
+        template = _compiled_templates.get(template_string, None)
+        if template is not None:
+            _compiled_templates.move_to_end(template_string)
+            return template
+
+    template = get_template_env().from_string(template_string)
+
+    with _template_env_lock:
+        _compiled_templates[template_string] = template
+        while len(_compiled_templates) > TEMPLATE_CACHE_SIZE:
+            _compiled_templates.popitem(last=False)
+
+    return template
+
+
 def process_string_template(
     template_string: str, replacement_dict: Optional[Mapping[str, Any]] = None
 ):
@@ -87,15 +171,13 @@ def process_string_template(
     else:
         sub_dict = dict(replacement_dict)
 
-    env = Environment()
-
     if isinstance(template_string, jinja2.runtime.Undefined):
         return ""
 
     # add some keywords, to make sure we don't get any weird internal result objects
     sub_dict.setdefault("namespace", None)
 
-    result = env.from_string(template_string).render(sub_dict)
+    result = get_string_template(template_string).render(sub_dict)
 
     if isinstance(result, jinja2.runtime.Undefined):
         result = ""
@@ -140,18 +222,76 @@ def get_datas(
     return datas
 
 
-def create_entry_point_from_template(
+def capture_cli_outputs(
+    script_name: str,
+    entry_point: Mapping[str, str],
+    args_list: Optional[Iterable[List[str]]] = None,
+) -> Dict[str, str]:
+    """Run a console script with some arguments (e.g. '--help'), and return the output of every successful run.
+
+    Args:
+        script_name: the name of the console script
+        entry_point: the module and attribute of the console script
+        args_list: the arguments to run the script with (defaults to 'BAKED_OUTPUT_ARGS')
+
+    Returns:
+        Dict[str, str]: the output, keyed by the (space-separated) arguments
+    """
+
+    if args_list is None:
+        args_list = BAKED_OUTPUT_ARGS
+
+    script = CAPTURE_OUTPUT_SCRIPT.format(
+        script_name=script_name, module=entry_point["module"], attr=entry_point["attr"]
+    )
+    # the output would otherwise depend on the terminal of the build
+    env = dict(os.environ, COLUMNS="80")
+
+    outputs = {}
+    for args in args_list:
+        result = subprocess.run(
+            [sys.executable, "-c", script] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        if result.returncode != 0:
+            log.debug(f"Not baking output of '{script_name} {' '.join(args)}': failed.")
+            continue
+        outputs[" ".join(args)] = result.stdout.decode("utf-8")
+
+    return outputs
+
+
+def render_entry_point(
     main_module: str,
-    working_dir: str,
     entry_points: Mapping[str, Mapping[str, Mapping[str, str]]],
-):
+    template_name: str = "entry_point.py.j2",
+    startup_mode: str = "default",
+    startup_constants: Optional[Mapping[str, Any]] = None,
+    **template_vars: Any,
+) -> str:
+    """Render the script that dispatches to the console script entry point that matches the executable name.
+
+    Args:
+        main_module: the main module of the application
+        entry_points: all entry points of the application, by group
+        template_name: the name of the template
+        startup_mode: one of 'default', 'lazy' (see 'ENTRY_POINT_STARTUP_MODES')
+        startup_constants: the metadata values to bake into the script in 'lazy' mode (see 'ProjectMetadata.create_startup_constants')
+        template_vars: additional template variables
+    """
 
     if not entry_points:
         raise Exception("No entry_points provided.")
+    if startup_mode not in ENTRY_POINT_STARTUP_MODES:
+        raise Exception(
+            f"Invalid startup mode '{startup_mode}', allowed: {', '.join(ENTRY_POINT_STARTUP_MODES)}"
+        )
 
     console_scripts = {}
 
-    main_entry_points: List[Mapping[str, Any]] = []
+    main_entry_points: List[Tuple[str, Mapping[str, Any]]] = []
 
     for group, details in entry_points.items():
 
@@ -165,19 +305,44 @@ def create_entry_point_from_template(
                     log.warning(
                         f"Can't determine unique entry point for module: {main_module}, registering main application will be unpredictable"
                     )
-                main_entry_points.append(ep_details)
+                main_entry_points.append((ep_name, ep_details))
+
+    baked_outputs = {}
+    if startup_mode == "lazy":
+        baked_outputs = {
+            name: capture_cli_outputs(name, details)
+            for name, details in console_scripts.items()
+        }
+        # an executable that doesn't match any console script runs the main entry point, under its own name
+        exe_name = (startup_constants or {}).get("exe_name", None)
+        if exe_name and exe_name not in baked_outputs.keys():
+            baked_outputs[exe_name] = capture_cli_outputs(
+                exe_name, main_entry_points[0][1]
+            )
 
-    template = Path(
-        os.path.join(FRKL_PROJECT_META_RESOURCES_FOLDER, "entry_point.py.j2")
+    template = get_template_env().get_template(template_name)
+
+    return template.render(
+        scripts=console_scripts,
+        main_entry_point=main_entry_points[0][1],
+        main_module=main_module,
+        namespace=None,
+        startup_mode=startup_mode,
+        startup_constants=dict(startup_constants or {}),
+        baked_outputs=baked_outputs,
+        **template_vars,
     )
-    template_string = template.read_text()
-
-    replaced = process_string_template(
-        template_string=template_string,
-        replacement_dict={
-            "scripts": console_scripts,
-            "main_entry_point": main_entry_points[0],
-        },
+
+
+def create_entry_point_from_template(
+    main_module: str,
+    working_dir: str,
+    entry_points: Mapping[str, Mapping[str, Mapping[str, str]]],
+    **template_vars: Any,
+):
+
+    replaced = render_entry_point(
+        main_module=main_module, entry_points=entry_points, **template_vars
     )
 
     target = Path(os.path.join(working_dir, "cli.py"))
@@ -187,9 +352,40 @@ def create_entry_point_from_template(
 
 
 class PyinstallerBuildRenderer(object):
-    def __init__(self, project_metadata: ProjectMetadata):
+    """Create the configuration for a pyinstaller build of a frkl project.
+
+    Args:
+        project_metadata: the metadata of the project to build
+        resources_mode: how to bundle resource files, one of 'files' (default), 'dedup', 'archive' (see 'frkl.project_meta.resource_bundle')
+        build_mode: how to bundle the application, one of 'onefile' (default), 'onedir'
+        startup_mode: how the generated entry point starts the application, one of 'default', 'lazy' (see 'frkl.project_meta.lazy')
+    """
+
+    def __init__(
+        self,
+        project_metadata: ProjectMetadata,
+        resources_mode: str = "files",
+        build_mode: str = "onefile",
+        startup_mode: str = "default",
+    ):
+
+        if resources_mode not in RESOURCE_MODES:
+            raise Exception(
+                f"Invalid resources mode '{resources_mode}', allowed: {', '.join(RESOURCE_MODES)}"
+            )
+        if build_mode not in PYINSTALLER_BUILD_MODES:
+            raise Exception(
+                f"Invalid build mode '{build_mode}', allowed: {', '.join(PYINSTALLER_BUILD_MODES)}"
+            )
+        if startup_mode not in ENTRY_POINT_STARTUP_MODES:
+            raise Exception(
+                f"Invalid startup mode '{startup_mode}', allowed: {', '.join(ENTRY_POINT_STARTUP_MODES)}"
+            )
 
         self._project_metadata: ProjectMetadata = project_metadata
+        self._resources_mode: str = resources_mode
+        self._build_mode: str = build_mode
+        self._startup_mode: str = startup_mode
 
     def get_exe_name(self):
 
@@ -199,10 +395,23 @@ class PyinstallerBuildRenderer(object):
 
         return self._project_metadata.metadata["project_main_module"]
 
+    def create_build_options(self) -> Dict[str, Any]:
+        """Return the options for the executable, which are not part of the analysis args (used by the spec files)."""
+
+        return {
+            "build_mode": self._build_mode,
+            "exe_name": self.get_exe_name(),
+            # in 'onedir' mode, upx-compressed libraries would have to be decompressed on every launch, for no
+            # real gain in download size, since the folder is usually distributed as a compressed archive anyway
+            "upx": self._build_mode == "onefile",
+        }
+
     def create_analysis_args(self, path: str = None):
 
         package_data = self._project_metadata.create_package_data()
         app_details = package_data["app_details"]
+        app_details["build_info"]["build_mode"] = self._build_mode
+        app_details["build_info"]["startup_mode"] = self._startup_mode
 
         main_module = app_details["main_module"]
         entry_points = package_data["entry_points"]
@@ -219,7 +428,12 @@ class PyinstallerBuildRenderer(object):
             os.makedirs(path, exist_ok=True)
             working_dir = path
 
-        datas = get_datas(resources_map=package_data["resources"])
+        datas = create_resource_bundle(
+            get_datas(resources_map=package_data["resources"]),
+            main_module=main_module,
+            working_dir=working_dir,
+            mode=self._resources_mode,
+        )
 
         # ep_hooks, auto_imports = get_entry_point_imports_hook(entry_points=entry_points)
         # runtime_hooks = []
@@ -230,12 +444,16 @@ class PyinstallerBuildRenderer(object):
         #     runtime_hooks.append(path)
 
         sc = create_entry_point_from_template(
-            main_module=main_module, working_dir=working_dir, entry_points=entry_points
+            main_module=main_module,
+            working_dir=working_dir,
+            entry_points=entry_points,
+            startup_mode=self._startup_mode,
+            startup_constants=self._project_metadata.create_startup_constants(),
         )
 
         app_details_file = os.path.join(working_dir, "app.json")
-        with open(app_details_file, "w") as f:  # type: ignore
-            json.dump(app_details, f)
+        with open(app_details_file, "w", encoding="utf-8") as f:  # type: ignore
+            dump_json(app_details, f, indent=False)
         d = (app_details_file, main_module)
         datas.append(d)
 
@@ -244,7 +462,7 @@ class PyinstallerBuildRenderer(object):
             pathex=[],
             binaries=[],
             datas=datas,
-            hiddenimports=list(hidden_imports),
+            hiddenimports=sorted(hidden_imports),
             hookspath=hooks_path,
             # runtime_hooks=runtime_hooks,
             runtime_hooks=None,
@@ -258,3 +476,82 @@ class PyinstallerBuildRenderer(object):
         log.debug(f"Created analysis args: {kwargs}")
 
         return kwargs
+
+    def write_config(self, path: str) -> List[str]:
+        """Create the pyinstaller config in a folder, only (re-)writing the files whose content changed.
+
+        Everything is rendered into a temporary folder first, and then compared to the existing files. The build
+        time in 'app.json' is ignored for that comparison.
+
+        Args:
+            path: the folder to write the config to (e.g. '.frkl/pyinstaller')
+
+        Returns:
+            List[str]: the files that were written
+        """
+
+        path = os.path.abspath(os.path.expanduser(path))
+        written = []
+
+        with tempfile.TemporaryDirectory(prefix="frkl_pyinstaller_") as temp_dir:
+            analysis_args = self.create_analysis_args(temp_dir)
+
+            for root, _, files in os.walk(temp_dir):
+                for file_name in sorted(files):
+                    source = os.path.join(root, file_name)
+                    target = os.path.join(path, os.path.relpath(source, temp_dir))
+                    if _config_files_equal(source, target):
+                        continue
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(source, target)
+                    written.append(target)
+
+            analysis_args = _replace_path_prefix(analysis_args, temp_dir, path)
+
+        for file_name, content in [
+            (PYINSTALLER_ARGS_FILE_NAME, analysis_args),
+            (PYINSTALLER_BUILD_FILE_NAME, self.create_build_options()),
+        ]:
+            target = os.path.join(path, file_name)
+            if write_file_if_changed(target, to_json(content)):
+                written.append(target)
+
+        return written
+
+
+def _config_files_equal(source: str, target: str) -> bool:
+
+    if not os.path.isfile(target):
+        return False
+
+    with open(source, "rb") as f:
+        source_content = f.read()
+    with open(target, "rb") as f:
+        target_content = f.read()
+    if source_content == target_content:
+        return True
+
+    if os.path.basename(source) != "app.json":
+        return False
+
+    try:
+        source_details = json.loads(source_content)
+        target_details = json.loads(target_content)
+    except ValueError:
+        return False
+    for details in [source_details, target_details]:
+        details.get("build_info", {}).pop("build_time", None)
+    return source_details == target_details
+
+
+def _replace_path_prefix(obj: Any, prefix: str, replacement: str) -> Any:
+
+    if isinstance(obj, str):
+        if obj == prefix or obj.startswith(prefix + os.sep):
+            return replacement + obj[len(prefix) :]
+        return obj
+    if isinstance(obj, Mapping):
+        return {k: _replace_path_prefix(v, prefix, replacement) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_replace_path_prefix(v, prefix, replacement) for v in obj)
+    return obj
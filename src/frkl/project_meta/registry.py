@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+
+_registry_ids = itertools.count()
+
+_scoped_values: "ContextVar[Mapping[int, Mapping[Any, Any]]]" = ContextVar(
+    "frkl_project_meta_scoped_values", default={}
+)
+"""Values that are only visible in the current context (thread, asyncio task), keyed by registry id."""
+
+
+class Registry(object):
+    """A key/value registry that is optimized for concurrent lookups.
+
+    Reads don't acquire a lock: the registry keeps an immutable snapshot of its content, which is replaced
+    (copy-on-write) on every write, and writes are serialized. Values can also be set only for the
+    current context (thread or asyncio task) using the *scope* context manager, those take precedence
+    over the values that were set globally.
+    """
+
+    def __init__(self):
+
+        self._id: int = next(_registry_ids)
+        self._values: Mapping[Any, Any] = {}
+        self._write_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+
+        # context-scoped values are not part of the state
+        return {"values": dict(self._values)}
+
+    def __setstate__(self, state: Mapping[str, Any]) -> None:
+
+        # registry ids are only unique within a process, so the restored registry gets a new one
+        self._id = next(_registry_ids)
+        self._values = dict(state["values"])
+        self._write_lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+
+        scoped = _scoped_values.get().get(self._id, None)
+        if scoped is not None and key in scoped.keys():
+            return scoped[key]
+
+        return self._values.get(key, default)
+
+    def __contains__(self, key: Any) -> bool:
+
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key: Any, value: Any) -> None:
+
+        with self._write_lock:
+            values = dict(self._values)
+            values[key] = value
+            self._values = values
+
+    def set_if_absent(self, key: Any, value: Any) -> Tuple[Any, bool]:
+        """Set a value, unless the key is already registered.
+
+        Returns:
+            Tuple[Any, bool]: the registered value, and whether it was set in this call
+        """
+
+        current = self._values.get(key, _MISSING)
+        if current is not _MISSING:
+            return (current, False)
+
+        with self._write_lock:
+            current = self._values.get(key, _MISSING)
+            if current is not _MISSING:
+                return (current, False)
+
+            values = dict(self._values)
+            values[key] = value
+            self._values = values
+
+        return (value, True)
+
+    def remove(self, key: Any) -> None:
+
+        with self._write_lock:
+            if key not in self._values.keys():
+                return
+            values = dict(self._values)
+            values.pop(key)
+            self._values = values
+
+    def to_dict(self) -> Dict[Any, Any]:
+
+        result = dict(self._values)
+        scoped = _scoped_values.get().get(self._id, None)
+        if scoped:
+            result.update(scoped)
+        return result
+
+    @contextmanager
+    def scope(self, values: Optional[Mapping[Any, Any]] = None) -> Iterator[None]:
+        """Make values available only for the current context (thread, asyncio task), until the scope is left.
+
+        Scopes can be nested, inner values take precedence.
+        """
+
+        all_scoped = _scoped_values.get()
+        scoped = dict(all_scoped.get(self._id, {}))
+        if values:
+            scoped.update(values)
+
+        new_scoped = dict(all_scoped)
+        new_scoped[self._id] = scoped
+        token = _scoped_values.set(new_scoped)
+        try:
+            yield
+        finally:
+            _scoped_values.reset(token)
+
+
+_MISSING = object()
@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zipfile
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+log = logging.getLogger("frkl")
+
+RESOURCE_INDEX_FILE_NAME = "resources_index.json"
+RESOURCE_ARCHIVE_FILE_NAME = "resources.zip"
+RESOURCE_INDEX_FORMAT_VERSION = 1
+
+RESOURCE_MODES = ["files", "dedup", "archive"]
+"""How resources are bundled:
+
+- 'files': every file is bundled as is
+- 'dedup': files with identical content are only bundled once, duplicates are resolved via the resource index
+- 'archive': all (unique) files are packed into a single compressed archive, and accessed via the resource index
+"""
+
+UNCOMPRESSED_EXTENSIONS = [
+    ".gz",
+    ".bz2",
+    ".xz",
+    ".zip",
+    ".whl",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".woff",
+    ".woff2",
+]
+"""Files with those extensions are already compressed, and are stored in the archive as is."""
+
+MMAP_THRESHOLD = 64 * 1024
+"""Resource files that are at least this big are memory-mapped when read as a view, instead of being read into memory."""
+
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def hash_file(path: str) -> str:
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_bundle_path(src: str, dest: str) -> str:
+    """Return the path (relative to the bundle root, with '/' separators) a file will have in the bundle."""
+
+    return "/".join(
+        p for p in dest.replace(os.sep, "/").split("/") + [os.path.basename(src)] if p
+    )
+
+
+def create_resource_bundle(
+    datas: Iterable[Tuple[str, str]], main_module: str, working_dir: str, mode: str
+) -> List[Tuple[str, str]]:
+    """Content-hash the collected datas, and create the datas to bundle for the specified resources mode.
+
+    In every mode, an index file (mapping the original bundle paths to their size, content hash and the
+    location of their content) is created in the working dir and added to the result.
+
+    Args:
+        datas: a list of (source, destination folder) tuples, as returned by 'get_datas'
+        main_module: the main module of the application (index and archive are bundled in that folder)
+        working_dir: the folder to create the index/archive files in
+        mode: one of 'files', 'dedup', 'archive'
+
+    Returns:
+        List[Tuple[str, str]]: the datas to bundle
+    """
+
+    if mode not in RESOURCE_MODES:
+        raise Exception(
+            f"Invalid resources mode '{mode}', allowed: {', '.join(RESOURCE_MODES)}"
+        )
+
+    datas = list(datas)
+
+    files: Dict[str, Dict[str, Any]] = {}
+    unique: Dict[str, Tuple[str, str]] = {}
+    for src, dest in datas:
+        bundle_path = get_bundle_path(src, dest)
+        content_hash = hash_file(src)
+        if content_hash not in unique.keys():
+            unique[content_hash] = (src, dest)
+        if mode == "files":
+            path = bundle_path
+        elif mode == "dedup":
+            path = get_bundle_path(*unique[content_hash])
+        else:
+            path = content_hash
+        files[bundle_path] = {
+            "hash": content_hash,
+            "size": os.path.getsize(src),
+            "path": path,
+        }
+
+    log.debug(
+        f"Bundling {len(unique)} unique resource files (of {len(files)}), mode: {mode}"
+    )
+
+    result: List[Tuple[str, str]] = []
+    if mode == "files":
+        result.extend(datas)
+    elif mode == "dedup":
+        result.extend(unique.values())
+    else:
+        archive_file = os.path.join(working_dir, RESOURCE_ARCHIVE_FILE_NAME)
+        with zipfile.ZipFile(archive_file, "w") as archive:
+            for content_hash in sorted(unique.keys()):
+                src = unique[content_hash][0]
+                info = zipfile.ZipInfo(content_hash, date_time=_ZIP_DATE_TIME)
+                if os.path.splitext(src)[1].lower() in UNCOMPRESSED_EXTENSIONS:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                with open(src, "rb") as f:
+                    archive.writestr(info, f.read())
+        result.append((archive_file, main_module))
+
+    index = {
+        "format_version": RESOURCE_INDEX_FORMAT_VERSION,
+        "mode": mode,
+        "archive": RESOURCE_ARCHIVE_FILE_NAME if mode == "archive" else None,
+        "files": files,
+    }
+    index_file = os.path.join(working_dir, RESOURCE_INDEX_FILE_NAME)
+    with open(index_file, "w") as f:
+        json.dump(index, f, sort_keys=True)
+    result.append((index_file, main_module))
+
+    return result
+
+
+class ResourceIndex(object):
+    """Read access to bundled resources, via the index created by 'create_resource_bundle'.
+
+    The index can also be created from a folder on disk (see 'from_folder'), in which case sizes are taken
+    from a single scan of the folder, and content hashes are only computed when requested.
+
+    Args:
+        base_dir: the root folder of the bundle (e.g. 'sys._MEIPASS')
+        index: the content of the index file
+        index_dir: the folder that contains the index file (and archive)
+        container: if the bundle itself is a zip file (e.g. a zipapp), the path to it
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        index: Mapping[str, Any],
+        index_dir: str,
+        container: Optional[str] = None,
+    ):
+
+        if index.get("format_version", None) != RESOURCE_INDEX_FORMAT_VERSION:
+            raise Exception("Unsupported resource index format.")
+
+        self._base_dir: str = base_dir
+        self._index_dir: str = index_dir
+        self._mode: str = index["mode"]
+        self._files: Mapping[str, Mapping[str, Any]] = index["files"]
+        self._archive_name: Optional[str] = index.get("archive", None)
+        self._container: Optional[str] = container
+
+        if self._container is not None and self._mode == "archive":
+            raise Exception("Resources in 'archive' mode can't be read from a zip file.")
+
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._archive_map: Optional[mmap.mmap] = None
+        self._archive_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+
+        # the archive is opened (and mapped) again when needed
+        state = dict(self.__dict__)
+        for attr in ["_archive", "_archive_map", "_archive_lock"]:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state: Mapping[str, Any]) -> None:
+
+        self.__dict__.update(state)
+        self._archive = None
+        self._archive_map = None
+        self._archive_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, base_dir: str, main_module: str) -> Optional["ResourceIndex"]:
+        """Load the resource index of an application bundle, returns 'None' if the bundle doesn't have one."""
+
+        index_dir = os.path.join(base_dir, main_module)
+        index_file = os.path.join(index_dir, RESOURCE_INDEX_FILE_NAME)
+        if not os.path.isfile(index_file):
+            return None
+
+        with open(index_file, "r") as f:
+            index = json.load(f)
+
+        return cls(base_dir=base_dir, index=index, index_dir=index_dir)
+
+    @classmethod
+    def load_from_zip(cls, zip_path: str, main_module: str) -> Optional["ResourceIndex"]:
+        """Load the resource index of an application that is bundled as a zip file (e.g. a zipapp)."""
+
+        with zipfile.ZipFile(zip_path) as zf:
+            try:
+                index = json.loads(
+                    zf.read(f"{main_module}/{RESOURCE_INDEX_FILE_NAME}").decode("utf-8")
+                )
+            except KeyError:
+                return None
+
+        return cls(base_dir=zip_path, index=index, index_dir=zip_path, container=zip_path)
+
+    @classmethod
+    def from_folder(cls, folder: str) -> "ResourceIndex":
+        """Create an index for all files in a folder, with bundle paths relative to that folder."""
+
+        files: Dict[str, Dict[str, Any]] = {}
+        for root, dirnames, filenames in os.walk(folder):
+            dirnames.sort()
+            rel_root = os.path.relpath(root, folder)
+            for filename in sorted(filenames):
+                full_path = os.path.join(root, filename)
+                bundle_path = get_bundle_path(
+                    filename, "" if rel_root == "." else rel_root
+                )
+                files[bundle_path] = {
+                    "hash": None,
+                    "size": os.path.getsize(full_path),
+                    "path": bundle_path,
+                }
+
+        index = {
+            "format_version": RESOURCE_INDEX_FORMAT_VERSION,
+            "mode": "files",
+            "archive": None,
+            "files": files,
+        }
+        return cls(base_dir=folder, index=index, index_dir=folder)
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def files(self) -> Mapping[str, Mapping[str, Any]]:
+        return self._files
+
+    @property
+    def _reads_from_zip(self) -> bool:
+
+        return self._mode == "archive" or self._container is not None
+
+    def _get_archive_path(self) -> str:
+
+        if self._container is not None:
+            return self._container
+        return os.path.join(self._index_dir, self._archive_name)  # type: ignore
+
+    def _get_archive(self) -> zipfile.ZipFile:
+
+        if self._archive is None:
+            with self._archive_lock:
+                if self._archive is None:
+                    self._archive = zipfile.ZipFile(self._get_archive_path())
+        return self._archive
+
+    def _get_details(self, path: str) -> Mapping[str, Any]:
+
+        details = self._files.get(path, None)
+        if details is None:
+            raise FileNotFoundError(f"No bundled resource: {path}")
+        return details
+
+    def get_size(self, path: str) -> int:
+
+        return self._get_details(path)["size"]
+
+    def get_hash(self, path: str) -> str:
+        """Return the sha256 hash of the content of a resource."""
+
+        details = self._get_details(path)
+        if details["hash"] is None:
+            details["hash"] = hash_file(self.resolve(path))  # type: ignore
+        return details["hash"]
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Return the path of the file that holds the content of a bundled resource.
+
+        Returns 'None' if the resource is not bundled as a file of its own (because it is packed in a zip file).
+        """
+
+        details = self._get_details(path)
+
+        if self._reads_from_zip:
+            return None
+
+        return os.path.join(self._base_dir, *details["path"].split("/"))
+
+    def read_bytes(self, path: str) -> bytes:
+
+        details = self._get_details(path)
+
+        if self._reads_from_zip:
+            return self._get_archive().read(details["path"])
+
+        with open(self.resolve(path), "rb") as f:  # type: ignore
+            return f.read()
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+
+        return self.read_bytes(path).decode(encoding)
+
+    def read_view(self, path: str) -> memoryview:
+        """Return a read-only view on the content of a resource.
+
+        Files that are bigger than 'MMAP_THRESHOLD' are memory-mapped instead of read, this includes resources
+        that are stored uncompressed in the archive. The view keeps the mapping alive, so callers should
+        'release()' it once they are done with it.
+        """
+
+        details = self._get_details(path)
+        if details["size"] < MMAP_THRESHOLD:
+            return memoryview(self.read_bytes(path))
+
+        if not self._reads_from_zip:
+            with open(self.resolve(path), "rb") as f:  # type: ignore
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+        info = self._get_archive().getinfo(details["path"])
+        if info.compress_type != zipfile.ZIP_STORED:
+            return memoryview(self.read_bytes(path))
+
+        archive_map = self._get_archive_map()
+        offset = info.header_offset
+        name_length, extra_length = struct.unpack(
+            "<HH", archive_map[offset + 26 : offset + _ZIP_LOCAL_HEADER_SIZE]
+        )
+        start = offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length
+        return memoryview(archive_map)[start : start + info.file_size]
+
+    def _get_archive_map(self) -> mmap.mmap:
+
+        if self._archive_map is None:
+            with self._archive_lock:
+                if self._archive_map is None:
+                    with open(self._get_archive_path(), "rb") as f:
+                        self._archive_map = mmap.mmap(
+                            f.fileno(), 0, access=mmap.ACCESS_READ
+                        )
+        return self._archive_map
+
+
+@lru_cache(maxsize=None)
+def find_bundle_index(base_dir: str) -> Optional[ResourceIndex]:
+    """Find and load the resource index of an application bundle.
+
+    The index lives in the folder of the applications main module, which is not necessarily the project
+    that is looking for its resources, so all top-level folders of the bundle are checked (once).
+    """
+
+    try:
+        children = sorted(os.listdir(base_dir))
+    except OSError:
+        return None
+
+    for child in children:
+        if os.path.isfile(os.path.join(base_dir, child, RESOURCE_INDEX_FILE_NAME)):
+            return ResourceIndex.load(base_dir, child)
+
+    return None
+
+
+class ProjectResources(object):
+    """Access to the resource files of a single project, backed by a resource index.
+
+    All lookups ('exists', 'list', sizes and hashes) are answered from the index, without touching the
+    filesystem.
+
+    Args:
+        index: the resource index that contains the projects resources
+        prefix: the folder (bundle path) of the projects resources in the index, '' for the index root
+    """
+
+    def __init__(self, index: ResourceIndex, prefix: str = ""):
+
+        self._index: ResourceIndex = index
+        self._prefix: str = f"{prefix.strip('/')}/" if prefix.strip("/") else ""
+
+        self._files: Dict[str, str] = {}
+        self._folders: Dict[str, List[str]] = {"": []}
+        for bundle_path in sorted(index.files.keys()):
+            if not bundle_path.startswith(self._prefix):
+                continue
+            path = bundle_path[len(self._prefix) :]
+            self._files[path] = bundle_path
+            self._add_to_folder(path)
+
+    def _add_to_folder(self, path: str) -> None:
+
+        parent, _, name = path.rpartition("/")
+        if parent not in self._folders.keys():
+            self._folders[parent] = []
+            self._add_to_folder(parent)
+        self._folders[parent].append(name)
+
+    def _get_bundle_path(self, path: str) -> str:
+
+        bundle_path = self._files.get(path.strip("/"), None)
+        if bundle_path is None:
+            raise FileNotFoundError(f"No resource: {path}")
+        return bundle_path
+
+    @property
+    def paths(self) -> Iterable[str]:
+        """All resource files of the project, relative to the resources folder."""
+
+        return self._files.keys()
+
+    def exists(self, path: str) -> bool:
+
+        return path.strip("/") in self._files.keys()
+
+    def is_folder(self, path: str) -> bool:
+
+        return path.strip("/") in self._folders.keys()
+
+    def list(self, folder: str = "") -> List[str]:
+        """List the names of the files and sub-folders of a resources folder."""
+
+        names = self._folders.get(folder.strip("/"), None)
+        if names is None:
+            raise FileNotFoundError(f"No resource folder: {folder}")
+        return list(names)
+
+    def get_size(self, path: str) -> int:
+
+        return self._index.get_size(self._get_bundle_path(path))
+
+    def get_hash(self, path: str) -> str:
+
+        return self._index.get_hash(self._get_bundle_path(path))
+
+    def get_path(self, path: str) -> Optional[str]:
+        """Return the path of the file that holds the resource, or 'None' if it is packed in an archive."""
+
+        return self._index.resolve(self._get_bundle_path(path))
+
+    def read_bytes(self, path: str) -> bytes:
+
+        return self._index.read_bytes(self._get_bundle_path(path))
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+
+        return self._index.read_text(self._get_bundle_path(path), encoding=encoding)
+
+    def read_view(self, path: str) -> memoryview:
+        """Return a read-only view on the content of a resource, memory-mapped for large files."""
+
+        return self._index.read_view(self._get_bundle_path(path))
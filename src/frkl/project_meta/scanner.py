@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""Find the frkl projects installed in other Python environments, without running their interpreters.
+
+Everything is read from the files of an environments 'site-packages' folder: distribution metadata and entry points
+from '*.dist-info' folders, project metadata from '_frkl.json', and the attributes of the '_frkl' module by
+evaluating its source statically (see 'frkl.project_meta.defaults_resolver'). No code of the scanned environment
+is ever imported or executed.
+"""
+import ast
+import glob
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+from frkl.project_meta.core import complete_project_metadata
+from frkl.project_meta.defaults_resolver import StaticDefaultsEvaluator
+from frkl.project_meta.utils import (
+    DiscoveryPolicy,
+    get_default_discovery_policy,
+    normalize_name,
+    parse_entry_point_value,
+)
+
+
+try:
+    from importlib_metadata import distributions  # type: ignore
+except Exception:
+    from importlib.metadata import distributions  # type: ignore
+
+
+log = logging.getLogger("frkl")
+
+_SAFE_NAME_REGEX = re.compile(r"[^A-Za-z0-9.]+")
+
+
+def find_site_packages(path: str) -> str:
+    """Return the 'site-packages' folder of an environment (e.g. a virtualenv root), or the path itself if it doesn't contain one."""
+
+    path = os.path.abspath(os.path.expanduser(path))
+
+    for pattern in ["lib/python*/site-packages", "Lib/site-packages"]:
+        matches = sorted(glob.glob(os.path.join(path, pattern)))
+        if matches:
+            return matches[-1]
+
+    return path
+
+
+def _read_editable_mapping(finder_file: str) -> Mapping[str, str]:
+    """Read the top-level package locations from a setuptools editable finder module, without importing it."""
+
+    with open(finder_file, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=finder_file)
+
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "MAPPING"
+        ):
+            return ast.literal_eval(node.value)
+
+    return {}
+
+
+def get_package_search_paths(site_packages: str) -> Dict[str, Any]:
+    """Return the folders packages of an environment can be imported from, as configured in its 'site-packages' folder.
+
+    Returns:
+        Dict[str, Any]: folders ('paths', from '.pth' files) and top-level package locations of editable installs ('mapping')
+    """
+
+    paths = [site_packages]
+    mapping: Dict[str, str] = {}
+
+    for pth_file in sorted(glob.glob(os.path.join(site_packages, "*.pth"))):
+        try:
+            with open(pth_file, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            log.debug(f"Can't read '{pth_file}': {e}")
+            continue
+
+        for line in lines:
+            line = line.strip()
+            # 'import' lines would be executed by the 'site' module, we don't do that
+            if not line or line.startswith("#") or line.startswith("import"):
+                continue
+            folder = os.path.normpath(os.path.join(site_packages, line))
+            if os.path.isdir(folder) and folder not in paths:
+                paths.append(folder)
+
+    for finder_file in sorted(
+        glob.glob(os.path.join(site_packages, "__editable___*_finder.py"))
+    ):
+        try:
+            mapping.update(_read_editable_mapping(finder_file))
+        except Exception as e:
+            log.debug(f"Can't read editable finder '{finder_file}': {e}")
+
+    return {"paths": paths, "mapping": mapping}
+
+
+def _find_package_folder(
+    main_module: str, search_paths: Mapping[str, Any]
+) -> Optional[str]:
+
+    tokens = main_module.split(".")
+
+    package_folder = search_paths["mapping"].get(tokens[0], None)
+    if package_folder is not None:
+        folder = os.path.join(package_folder, *tokens[1:])
+        if os.path.isdir(folder):
+            return folder
+
+    for path in search_paths["paths"]:
+        folder = os.path.join(path, *tokens)
+        if os.path.isdir(folder):
+            return folder
+
+    return None
+
+
+def read_frkl_metadata(main_module: str, package_folder: str) -> Dict[str, Any]:
+    """Read the metadata of a frkl project from its package folder, without importing anything.
+
+    Returns:
+        Dict[str, Any]: the metadata (like 'ProjectMetadata.metadata'), and the names of '_frkl' module attributes that could not be determined statically ('unresolved')
+    """
+
+    frkl_folder = os.path.join(package_folder, "_frkl")
+    with open(os.path.join(frkl_folder, "_frkl.json"), "r") as f:
+        project_metadata = json.load(f)
+
+    unresolved: List[str] = []
+    init_file = os.path.join(frkl_folder, "__init__.py")
+    if os.path.isfile(init_file):
+        with open(init_file, "r", encoding="utf-8") as f:
+            source = f.read()
+        values, unresolved_names = StaticDefaultsEvaluator(
+            source, init_file
+        ).evaluate()
+        for k, v in values.items():
+            if k.startswith("_") or isinstance(v, (ModuleType, type)) or callable(v):
+                continue
+            project_metadata[k] = v
+        # imported names (modules, classes, typing helpers) are not part of the metadata
+        imported: Set[str] = set()
+        for node in ast.parse(source, filename=init_file).body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                imported.update((a.asname or a.name).split(".")[0] for a in node.names)
+        unresolved = sorted(
+            n for n in unresolved_names if not n.startswith("_") and n not in imported
+        )
+
+    return {
+        "metadata": complete_project_metadata(project_metadata, main_module),
+        "unresolved": unresolved,
+    }
+
+
+def scan_site_packages(
+    site_packages: str, policy: Optional[DiscoveryPolicy] = None
+) -> Dict[str, Any]:
+    """Find all frkl projects in a 'site-packages' folder, and read their metadata.
+
+    Like 'frkl.project_meta.utils.discover_installed_modules', the main module of a project is derived from the
+    name of its distribution, and it has to contain a '_frkl' sub-package.
+
+    Args:
+        site_packages: the 'site-packages' folder (or the root of a virtualenv)
+        policy: which distributions to consider (defaults to the default discovery policy)
+
+    Returns:
+        Dict[str, Any]: the scanned folder ('site_packages'), and a record for every frkl project ('projects'), keyed by main module
+    """
+
+    if policy is None:
+        policy = get_default_discovery_policy()
+
+    site_packages = find_site_packages(site_packages)
+    if not os.path.isdir(site_packages):
+        raise Exception(f"Not a folder: {site_packages}")
+
+    search_paths = get_package_search_paths(site_packages)
+
+    projects: Dict[str, Dict[str, Any]] = {}
+    seen = set()
+    for dist in distributions(path=[site_packages]):
+        dist_name = dist.metadata["Name"] or ""
+        if normalize_name(dist_name) in seen:
+            continue
+        seen.add(normalize_name(dist_name))
+
+        pkg_name = _SAFE_NAME_REGEX.sub("-", dist_name).lower()
+        if policy.explain(pkg_name) is not None:
+            continue
+
+        main_module = pkg_name.replace("-", "_")
+        package_folder = _find_package_folder(main_module, search_paths)
+        if package_folder is None or not os.path.isfile(
+            os.path.join(package_folder, "_frkl", "_frkl.json")
+        ):
+            continue
+
+        record: Dict[str, Any] = {
+            "main_module": main_module,
+            "package_folder": package_folder,
+            "distribution": {"name": dist_name, "version": dist.version},
+            "error": None,
+        }
+        try:
+            record.update(read_frkl_metadata(main_module, package_folder))
+        except Exception as e:
+            log.debug(f"Can't read metadata of '{main_module}'", exc_info=True)
+            record["error"] = str(e)
+            projects[main_module] = record
+            continue
+
+        version = dist.version
+        version_file = os.path.join(package_folder, "version.txt")
+        if not version and os.path.isfile(version_file):
+            with open(version_file, "r", encoding="utf-8") as f:
+                version = f.read().strip()
+        record["version"] = version or "n/a"
+
+        entry_point = None
+        exe_name = record["metadata"]["project"]["exe_name"]
+        for ep in dist.entry_points:
+            if ep.group == "console_scripts" and ep.name == exe_name:
+                module, attr = parse_entry_point_value(ep.value)
+                entry_point = {
+                    "name": ep.name,
+                    "module": module,
+                    "attr": attr.split(".")[0] if attr else None,
+                }
+                break
+        record["runtime_details"] = {
+            "entry_point": entry_point,
+            "app_type": "python-env",
+            "build_info": {},
+        }
+
+        projects[main_module] = record
+
+    versions = {
+        name: p["version"] for name, p in projects.items() if p["error"] is None
+    }
+    for name, p in projects.items():
+        p["other_frkl_project_versions"] = {
+            k: v for k, v in versions.items() if k != name
+        }
+
+    return {"site_packages": site_packages, "projects": projects}
+
+
+def _scan_environment(path: str) -> Dict[str, Any]:
+
+    start = time.perf_counter()
+    try:
+        result = scan_site_packages(path)
+        result["error"] = None
+    except Exception as e:
+        log.debug(f"Can't scan environment '{path}'", exc_info=True)
+        result = {"site_packages": path, "projects": {}, "error": str(e)}
+
+    result["path"] = path
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+def scan_environments(
+    paths: Iterable[str], max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Scan the frkl projects of several environments in parallel (see 'scan_site_packages').
+
+    Args:
+        paths: 'site-packages' folders, or virtualenv roots
+        max_workers: the maximum number of worker processes (defaults to the number of CPUs)
+
+    Returns:
+        List[Dict[str, Any]]: the result for every environment, in the order of the provided paths
+    """
+
+    paths = list(paths)
+    if len(paths) == 1:
+        return [_scan_environment(paths[0])]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_scan_environment, paths))
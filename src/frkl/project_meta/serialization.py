@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import json
+import marshal
+import struct
+import sys
+import typing
+from types import ModuleType
+from typing import Any, Callable, Iterable, Mapping, Optional, TextIO, Union
+
+
+if typing.TYPE_CHECKING:
+    from frkl.project_meta.core import ProjectMetadata
+
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover
+    orjson = None
+    JSON_BACKEND = "json"
+
+STREAM_THRESHOLD = 1000
+"""Lists/sets with more items than this are written item by item, instead of being serialized in one go."""
+
+INDENT = "  "
+
+BINARY_MAGIC = b"FKPM"
+BINARY_FORMAT_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sBBB")
+"""Magic, format version, and the major/minor version of the Python interpreter that wrote the data."""
+
+
+def _default(obj: Any) -> Any:
+
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+
+    raise TypeError(f"Object of type '{type(obj).__name__}' is not JSON serializable")
+
+
+def _dumps_json(obj: Any, indent: bool) -> str:
+
+    if indent:
+        return json.dumps(
+            obj,
+            sort_keys=True,
+            indent=2,
+            separators=(",", ": "),
+            ensure_ascii=False,
+            default=_default,
+        )
+    else:
+        return json.dumps(
+            obj,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=_default,
+        )
+
+
+def _dumps_orjson(obj: Any, indent: bool) -> str:
+
+    assert orjson is not None
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_default, option=option).decode()
+
+
+_dumps: Callable[[Any, bool], str] = (
+    _dumps_orjson if JSON_BACKEND == "orjson" else _dumps_json
+)
+
+
+def to_json(obj: Any, indent: bool = True) -> str:
+    """Serialize an object to a JSON string, using the fastest available backend.
+
+    Keys are sorted, and sets are serialized as sorted lists, so the output is deterministic. Non-ASCII characters
+    are not escaped (with either backend), so files should be written with 'utf-8' encoding.
+    """
+
+    return _dumps(obj, indent)
+
+
+def dump_json(obj: Any, fp: TextIO, indent: bool = True) -> None:
+    """Serialize an object as JSON to a file handle.
+
+    The output is the same as the one of 'to_json' (indented or compact), but mappings and large lists/sets are
+    written item by item, so the whole document never has to be held in memory as a single string. To keep the
+    output deterministic, the items of a set are still sorted, which creates a (shallow) list copy of the set.
+    """
+
+    _write(obj, fp, 0, indent)
+
+
+def _write(obj: Any, fp: TextIO, level: int, indent: bool) -> None:
+
+    if indent:
+        newline = "\n"
+        item_indent = INDENT * (level + 1)
+        end_indent = "\n" + INDENT * level
+        key_separator = ": "
+    else:
+        newline = item_indent = end_indent = ""
+        key_separator = ":"
+
+    if isinstance(obj, Mapping) and obj:
+        fp.write("{")
+        first = True
+        for key in sorted(obj.keys(), key=str):
+            fp.write(newline if first else "," + newline)
+            first = False
+            fp.write(item_indent)
+            fp.write(_dumps(str(key), False))
+            fp.write(key_separator)
+            _write(obj[key], fp, level + 1, indent)
+        fp.write(end_indent + "}")
+
+    elif isinstance(obj, (list, tuple, set, frozenset)) and len(obj) > STREAM_THRESHOLD:
+        items: Iterable[Any] = sorted(obj) if isinstance(obj, (set, frozenset)) else obj
+        fp.write("[")
+        first = True
+        for item in items:
+            fp.write(newline if first else "," + newline)
+            first = False
+            fp.write(item_indent)
+            _write(item, fp, level + 1, indent)
+        fp.write(end_indent + "]")
+
+    else:
+        serialized = _dumps(obj, indent)
+        if level and indent and "\n" in serialized:
+            serialized = serialized.replace("\n", "\n" + INDENT * level)
+        fp.write(serialized)
+
+
+def dumps_metadata(project_metadata: "ProjectMetadata", deep: bool = True) -> bytes:
+    """Serialize the resolved state of a 'ProjectMetadata' object into a compact binary format.
+
+    The payload is encoded with 'marshal', which is fast and shares repeated strings, but only guaranteed to be
+    readable by the same Python version. It is meant to pass metadata to other processes of the same
+    application (e.g. via 'multiprocessing', or shared memory), not to store it.
+
+    Args:
+        project_metadata: the object to serialize (all its lazy attributes will be resolved)
+        deep: whether to include the state of the dependency frkl projects
+
+    Returns:
+        bytes: the serialized state
+    """
+
+    header = _BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_FORMAT_VERSION, *sys.version_info[:2]
+    )
+    try:
+        payload = marshal.dumps(project_metadata.to_state(deep=deep))
+    except ValueError as e:
+        raise Exception(
+            f"Can't serialize metadata for '{project_metadata.main_module}': {e}"
+        )
+
+    return header + payload
+
+
+def loads_metadata(data: Union[bytes, bytearray, memoryview]) -> "ProjectMetadata":
+    """Re-create a fully resolved 'ProjectMetadata' object from the output of 'dumps_metadata'.
+
+    Args:
+        data: the serialized state, any bytes-like object (e.g. the buffer of a 'multiprocessing.shared_memory.SharedMemory' block)
+    """
+
+    from frkl.project_meta.core import ProjectMetadata
+
+    view = memoryview(data)
+    if len(view) < _BINARY_HEADER.size:
+        raise Exception("Invalid serialized metadata: not enough data.")
+
+    magic, format_version, major, minor = _BINARY_HEADER.unpack_from(view)
+    if magic != BINARY_MAGIC:
+        raise Exception("Invalid serialized metadata: unknown format.")
+    if format_version != BINARY_FORMAT_VERSION:
+        raise Exception(
+            f"Unsupported serialized metadata format version: {format_version}"
+        )
+    if (major, minor) != tuple(sys.version_info[:2]):
+        raise Exception(
+            f"Serialized metadata was written by Python {major}.{minor}, can't be read by Python {sys.version_info[0]}.{sys.version_info[1]}."
+        )
+
+    state = marshal.loads(view[_BINARY_HEADER.size :])
+    return ProjectMetadata.from_state(state)
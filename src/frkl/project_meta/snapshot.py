@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+import os
+import typing
+from typing import Any, Dict, Mapping, Optional
+
+from frkl.project_meta.defaults import frkl_project_meta_app_dirs
+from frkl.project_meta.utils import get_module_folder
+
+
+if typing.TYPE_CHECKING:
+    from frkl.project_meta.core import ProjectMetadata
+
+try:
+    from importlib_metadata import PackageNotFoundError, distribution  # type: ignore
+except Exception:
+    from importlib.metadata import PackageNotFoundError, distribution  # type: ignore
+
+
+log = logging.getLogger("frkl")
+
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_CACHE_DIR = os.path.join(
+    frkl_project_meta_app_dirs.user_cache_dir, "metadata_snapshots"
+)
+
+SNAPSHOT_SOURCE_FILES = ["_frkl/_frkl.json", "_frkl/__init__.py", "version.txt"]
+"""Files (relative to the module folder) metadata and version are read from, a snapshot is only valid as long as
+they don't change (which, for editable installs, doesn't change the installed distribution)."""
+
+
+def get_snapshot_path(main_module: str) -> Optional[str]:
+    """Return the path of the snapshot file for a project, without importing the project itself.
+
+    Snapshots are stored in the user cache folder (not in the installed package, so uninstalling a
+    project doesn't leave files behind), keyed on main module and location of the installed package.
+    """
+
+    module_folder = get_module_folder(main_module)
+    if module_folder is None:
+        return None
+
+    folder_hash = hashlib.sha256(os.path.abspath(module_folder).encode()).hexdigest()
+    return os.path.join(SNAPSHOT_CACHE_DIR, f"{main_module}-{folder_hash[:16]}.json")
+
+
+def get_distribution_fingerprint(dist_name: str) -> Optional[Mapping[str, Any]]:
+    """Return the version and a hash of the 'RECORD' file of an installed distribution."""
+
+    try:
+        dist = distribution(dist_name)
+    except PackageNotFoundError:
+        return None
+
+    record = dist.read_text("RECORD")
+    record_hash = (
+        hashlib.sha256(record.encode()).hexdigest() if record is not None else None
+    )
+
+    return {"name": dist_name, "version": dist.version, "record_hash": record_hash}
+
+
+def get_sources_fingerprint(main_module: str) -> Optional[Mapping[str, Any]]:
+    """Return content hashes of the files in 'SNAPSHOT_SOURCE_FILES' of a project ('None' for missing files)."""
+
+    module_folder = get_module_folder(main_module)
+    if module_folder is None:
+        return None
+
+    result: Dict[str, Optional[str]] = {}
+    for source_file in SNAPSHOT_SOURCE_FILES:
+        path = os.path.join(module_folder, *source_file.split("/"))
+        try:
+            with open(path, "rb") as f:
+                result[source_file] = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            result[source_file] = None
+
+    return result
+
+
+def create_snapshot(project_metadata: "ProjectMetadata") -> Dict[str, Any]:
+
+    snapshot = project_metadata.to_snapshot()
+    snapshot["format_version"] = SNAPSHOT_FORMAT_VERSION
+    snapshot["distribution"] = get_distribution_fingerprint(
+        project_metadata.project_name
+    )
+    snapshot["sources"] = get_sources_fingerprint(project_metadata.main_module)
+
+    return snapshot
+
+
+def write_snapshot(main_module: str, path: Optional[str] = None) -> str:
+    """Create a snapshot of a projects metadata, and write it into the user cache folder.
+
+    This is meant to be run after the project was installed (e.g. from a build or post-install hook, or via
+    'frkl-project snapshot MAIN_MODULE'). As long as neither the installed distribution nor the metadata source
+    files change, 'ProjectMetadata' then reads metadata and version from the snapshot, instead of importing the
+    project.
+
+    Args:
+        main_module: the main module of the project
+        path: the file to write the snapshot to (defaults to the result of 'get_snapshot_path')
+
+    Returns:
+        str: the path of the snapshot file
+    """
+
+    from frkl.project_meta.core import ProjectMetadata
+
+    if path is None:
+        path = get_snapshot_path(main_module)
+        if path is None:
+            raise Exception(f"Can't determine snapshot path for module '{main_module}'.")
+
+    md = ProjectMetadata(project_main_module=main_module, use_snapshot=False)
+    snapshot = create_snapshot(md)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(snapshot, f, sort_keys=True)
+    os.replace(temp_path, path)
+
+    return path
+
+
+def load_snapshot(main_module: str) -> Optional[Mapping[str, Any]]:
+    """Load the snapshot for a project, if one exists and it is still valid for the installed distribution and metadata sources."""
+
+    path = get_snapshot_path(main_module)
+    if path is None or not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, "r") as f:
+            snapshot = json.load(f)
+    except Exception as e:
+        log.debug(f"Can't read metadata snapshot '{path}': {e}")
+        return None
+
+    if snapshot.get("format_version", None) != SNAPSHOT_FORMAT_VERSION:
+        log.debug(f"Ignoring metadata snapshot '{path}': unsupported format.")
+        return None
+
+    dist_details = snapshot.get("distribution", None)
+    if dist_details is None:
+        log.debug(f"Ignoring metadata snapshot '{path}': no distribution details.")
+        return None
+
+    if get_distribution_fingerprint(dist_details["name"]) != dist_details:
+        log.debug(
+            f"Ignoring metadata snapshot '{path}': installed distribution changed."
+        )
+        return None
+
+    if get_sources_fingerprint(main_module) != snapshot.get("sources", None):
+        log.debug(f"Ignoring metadata snapshot '{path}': metadata sources changed.")
+        return None
+
+    return snapshot
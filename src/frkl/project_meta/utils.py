@@ -1,24 +1,307 @@
 # -*- coding: utf-8 -*-
+import fnmatch
 import importlib
+import importlib.util
 import logging
+import os
+import re
+import sys
 import types
-from typing import Iterable, Optional, Set
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
 
 from frkl.project_meta.defaults import PROJECT_META_DEFAULT_IGNORE_MODULES
+from frkl.project_meta.profiling import MemoryProfiler, measure_memory
 
 
 log = logging.getLogger("frkl")
 
+_NORMALIZE_REGEX = re.compile(r"[-_.]+")
+_ENTRY_POINT_VALUE_REGEX = re.compile(
+    r"(?P<module>[\w.]+)\s*(:\s*(?P<attr>[\w.]+)\s*)?((?P<extras>\[.*\])\s*)?$"
+)
+
+_entry_points_index: Optional[Mapping[str, List[Mapping[str, Optional[str]]]]] = None
+_distribution_versions: Optional[Mapping[str, str]] = None
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a distribution name, as specified in PEP 503."""
+
+    return _NORMALIZE_REGEX.sub("-", name).lower()
+
+
+class _CompiledRules(object):
+    """A compiled list of name rules: exact names, prefixes ('name*') and glob patterns."""
+
+    def __init__(self, rules: Iterable[str]):
+
+        names: Dict[str, str] = {}
+        prefixes: Dict[str, str] = {}
+        globs: List[Tuple[Pattern, str]] = []
+        for rule in rules:
+            normalized = normalize_name(rule)
+            wildcards = [c for c in "*?[" if c in normalized]
+            if not wildcards:
+                names[normalized] = rule
+            elif wildcards == ["*"] and normalized.index("*") == len(normalized) - 1:
+                prefixes[normalized[:-1]] = rule
+            else:
+                globs.append((re.compile(fnmatch.translate(normalized)), rule))
+
+        self._names: Mapping[str, str] = names
+        self._prefixes: Mapping[str, str] = prefixes
+        self._globs: Tuple[Tuple[Pattern, str], ...] = tuple(globs)
+        self._max_prefix_length: int = max((len(p) for p in prefixes.keys()), default=0)
+
+    def __bool__(self) -> bool:
+
+        return bool(self._names or self._prefixes or self._globs)
+
+    def match(self, normalized_name: str) -> Optional[str]:
+        """Return the rule that matches a (normalized) name, or 'None' if no rule matches."""
+
+        rule = self._names.get(normalized_name, None)
+        if rule is not None:
+            return rule
+
+        for i in range(min(len(normalized_name), self._max_prefix_length), -1, -1):
+            rule = self._prefixes.get(normalized_name[:i], None)
+            if rule is not None:
+                return rule
+
+        for regex, rule in self._globs:
+            if regex.match(normalized_name):
+                return rule
+
+        return None
+
+
+class DiscoveryPolicy(object):
+    """Decides which installed distributions are probed for a '_frkl' sub-module.
+
+    Rules can be exact names, prefixes (e.g. 'types-*') or glob patterns (e.g. 'pytest-*-plugin'), all
+    names are compared in their PEP 503-normalized form. A distribution is excluded if it matches a
+    'deny' rule, or if 'allow' rules are specified and it doesn't match any of them.
+
+    Args:
+        allow: if specified, only distributions that match one of those rules are probed
+        deny: distributions that match one of those rules are never probed
+    """
+
+    def __init__(
+        self, allow: Optional[Iterable[str]] = None, deny: Optional[Iterable[str]] = None
+    ):
+
+        self._allow: _CompiledRules = _CompiledRules(allow or [])
+        self._deny: _CompiledRules = _CompiledRules(deny or [])
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "DiscoveryPolicy":
+        """Create a policy from a configuration dictionary.
+
+        Supported keys are 'allow', 'deny' (lists of rules), and 'use_default_deny' (whether to add the
+        built-in list of modules to ignore to the 'deny' rules, defaults to 'true').
+        """
+
+        deny = list(config.get("deny", []))
+        if config.get("use_default_deny", True):
+            deny.extend(PROJECT_META_DEFAULT_IGNORE_MODULES)
+
+        return cls(allow=config.get("allow", None), deny=deny)
+
+    def explain(self, name: str) -> Optional[str]:
+        """Return the reason a distribution is excluded, or 'None' if it should be probed."""
+
+        normalized = normalize_name(name)
+
+        rule = self._deny.match(normalized)
+        if rule is not None:
+            return f"deny: {rule}"
+
+        if self._allow and self._allow.match(normalized) is None:
+            return "not in allow list"
+
+        return None
+
+    def is_allowed(self, name: str) -> bool:
+
+        return self.explain(name) is None
+
+
+def get_bundle_dir() -> str:
+    """Return the folder that contains the bundled data files of a frozen application.
+
+    Pyinstaller sets 'sys._MEIPASS' to the folder a 'onefile' executable was extracted to, or to the application
+    folder for 'onedir' builds. Other freezers keep data files next to the executable.
+    """
+
+    return getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(sys.executable)))
+
+
+def get_zipapp_path() -> Optional[str]:
+    """Return the path of the archive, if the application runs as a zipapp (see 'frkl.project_meta.zipapp')."""
+
+    return getattr(sys, "_frkl_zipapp", None)
+
+
+def get_module_folder(module_name: str) -> Optional[str]:
+    """Return the folder of a package, without importing the package itself (only its parents)."""
+
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except Exception:
+        return None
+
+    if spec is None or not spec.submodule_search_locations:
+        return None
+
+    for location in spec.submodule_search_locations:
+        return location
+
+    return None
+
+
+def parse_entry_point_value(value: str) -> Tuple[str, Optional[str]]:
+    """Return the module and attribute of an entry point value ('module:attr [extras]').
+
+    'EntryPoint' objects from 'importlib.metadata' only have 'module' and 'attr' properties since Python 3.9.
+    """
+
+    match = _ENTRY_POINT_VALUE_REGEX.match(value)
+    if match is None:
+        raise Exception(f"Invalid entry point value: {value}")
+
+    return (match.group("module"), match.group("attr"))
+
+
+def _scan_distributions() -> None:
+    """Read entry points and versions of all installed distributions, in a single pass."""
+
+    global _entry_points_index, _distribution_versions
+
+    try:
+        from importlib_metadata import distributions  # type: ignore
+    except Exception:
+        from importlib.metadata import distributions  # type: ignore
+
+    index: Dict[str, List[Mapping[str, Optional[str]]]] = {}
+    versions: Dict[str, str] = {}
+    for dist in distributions():
+        dist_name = normalize_name(dist.metadata["Name"] or "")
+        # like 'entry_points()', only use the first distribution found on the path
+        if dist_name in versions.keys():
+            continue
+        versions[dist_name] = dist.version
+
+        for ep in dist.entry_points:
+            module, attr = parse_entry_point_value(ep.value)
+            index.setdefault(ep.group, []).append(
+                {"name": ep.name, "value": ep.value, "module": module, "attr": attr}
+            )
+
+    _entry_points_index = index
+    _distribution_versions = versions
+
+
+def get_entry_points_index() -> Mapping[str, List[Mapping[str, Optional[str]]]]:
+    """Return all installed entry points (name, value, module, attr), grouped by entry point group.
+
+    Installed distributions are only scanned once per process, use 'reset_distributions_index' to re-scan them
+    (or 'set_distributions_index' to provide an index that was created in a different process).
+    """
+
+    if _entry_points_index is None:
+        _scan_distributions()
+    return _entry_points_index  # type: ignore
+
+
+def set_distributions_index(
+    entry_points_index: Mapping[str, List[Mapping[str, Optional[str]]]],
+    distribution_versions: Mapping[str, str],
+) -> None:
+    """Set the entry points and distribution versions index of this process."""
+
+    global _entry_points_index, _distribution_versions
+
+    _entry_points_index = entry_points_index
+    _distribution_versions = distribution_versions
+
+
+def get_distribution_versions() -> Mapping[str, str]:
+    """Return the versions of all installed distributions, keyed by (normalized) distribution name.
+
+    Like the entry points index, this is only created once per process.
+    """
+
+    if _distribution_versions is None:
+        _scan_distributions()
+    return _distribution_versions  # type: ignore
+
+
+def reset_distributions_index() -> None:
+    """Make sure installed distributions are re-scanned the next time their entry points or versions are needed."""
+
+    global _entry_points_index, _distribution_versions
+
+    _entry_points_index = None
+    _distribution_versions = None
+
+
+def write_file_if_changed(path: str, content: str) -> bool:
+    """Write content to a file, unless the file already has exactly that content.
+
+    Returns:
+        bool: whether the file was written
+    """
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_default_discovery_policy() -> DiscoveryPolicy:
+
+    return DiscoveryPolicy(deny=PROJECT_META_DEFAULT_IGNORE_MODULES)
+
 
 def discover_installed_modules(
     ignore_modules: Optional[Iterable[str]] = None,
     only_modules: Optional[Iterable[str]] = None,
+    policy: Optional[DiscoveryPolicy] = None,
+    excluded: Optional[MutableMapping[str, str]] = None,
+    memory_profiler: Optional[MemoryProfiler] = None,
 ) -> Set[types.ModuleType]:
     """Method that tries to find all other (relevant) packages/base-modules which are contained in this application.
 
     Args:
         ignore_modules: a list of modules to ignore (to speed up parsing, defaults to in-build list)
         only_modules: if specified, only modules contained in this list are used (to speed up parsing)
+        policy: a discovery policy to decide which packages to use, if specified, 'ignore_modules' and 'only_modules' are ignored
+        excluded: if specified, the names of all excluded packages will be added, along with the rule that excluded them
+        memory_profiler: if specified (or if memory profiling is enabled globally), the memory allocated and the modules imported while probing are recorded per distribution
 
     Results:
         Set[ModuleType]: a set containing all relevant (base) modules that contain a '_frkl' sub-module.
@@ -26,8 +309,13 @@ def discover_installed_modules(
 
     import pkg_resources
 
-    if ignore_modules is None:
-        ignore_modules = PROJECT_META_DEFAULT_IGNORE_MODULES
+    if policy is None:
+        if ignore_modules is None and only_modules is None:
+            policy = get_default_discovery_policy()
+        else:
+            if ignore_modules is None:
+                ignore_modules = PROJECT_META_DEFAULT_IGNORE_MODULES
+            policy = DiscoveryPolicy(allow=only_modules, deny=ignore_modules)
 
     installed_packages = pkg_resources.working_set
 
@@ -35,21 +323,21 @@ def discover_installed_modules(
     for i in installed_packages:
         pkg_name = i.key
 
-        if pkg_name in ignore_modules:
+        reason = policy.explain(pkg_name)
+        if reason is not None:
+            if excluded is not None:
+                excluded[pkg_name] = reason
             continue
 
-        if only_modules is not None:
-            if pkg_name not in only_modules:
-                continue
-
         log.debug(f"querying package: {i}")
 
         try:
             _pkg_name = pkg_name.replace("-", "_")
             if _pkg_name in metadata_modules:
                 continue
-            importlib.import_module(f"{_pkg_name}._frkl")
-            mod = importlib.import_module(_pkg_name)
+            with measure_memory("distribution", pkg_name, profiler=memory_profiler):
+                importlib.import_module(f"{_pkg_name}._frkl")
+                mod = importlib.import_module(_pkg_name)
             metadata_modules.add(mod)
 
         except (Exception):
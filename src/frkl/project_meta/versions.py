@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import threading
+from typing import Dict, Mapping, Optional
+
+from frkl.project_meta.defaults import frkl_project_meta_app_dirs
+from frkl.project_meta.utils import (
+    get_distribution_versions,
+    get_module_folder,
+    normalize_name,
+)
+
+
+log = logging.getLogger("frkl")
+
+GIT_VERSIONS_CACHE_FILE = os.path.join(
+    frkl_project_meta_app_dirs.user_cache_dir, "git_versions.json"
+)
+"""Versions of git checkouts, keyed by repository root, along with the repository HEAD they were computed for."""
+
+_git_versions_lock = threading.Lock()
+
+
+def find_git_root(folder: str) -> Optional[str]:
+    """Return the root of the git repository that contains a folder, if any."""
+
+    folder = os.path.abspath(folder)
+    while True:
+        if os.path.exists(os.path.join(folder, ".git")):
+            return folder
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            return None
+        folder = parent
+
+
+def get_git_head(repo_root: str) -> Optional[str]:
+    """Return the commit the HEAD of a repository points to, without running 'git'."""
+
+    git_dir = os.path.join(repo_root, ".git")
+    try:
+        if os.path.isfile(git_dir):
+            # worktrees and submodules
+            with open(git_dir, "r") as f:
+                git_dir = os.path.join(repo_root, f.read().strip()[len("gitdir: ") :])
+
+        with open(os.path.join(git_dir, "HEAD"), "r") as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            return head
+
+        ref = head[len("ref: ") :]
+        for base in [git_dir, _get_common_git_dir(git_dir)]:
+            ref_file = os.path.join(base, *ref.split("/"))
+            if os.path.isfile(ref_file):
+                with open(ref_file, "r") as f:
+                    return f.read().strip()
+
+            packed_refs = os.path.join(base, "packed-refs")
+            if os.path.isfile(packed_refs):
+                with open(packed_refs, "r") as f:
+                    for line in f:
+                        parts = line.strip().split(" ")
+                        if len(parts) == 2 and parts[1] == ref:
+                            return parts[0]
+    except OSError as e:
+        log.debug(f"Can't read git HEAD of '{repo_root}': {e}")
+
+    return None
+
+
+def _get_common_git_dir(git_dir: str) -> str:
+
+    common_dir_file = os.path.join(git_dir, "commondir")
+    if not os.path.isfile(common_dir_file):
+        return git_dir
+    with open(common_dir_file, "r") as f:
+        return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+
+
+def _load_git_versions_cache() -> Dict[str, Mapping[str, str]]:
+
+    try:
+        with open(GIT_VERSIONS_CACHE_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def get_git_version(repo_root: str) -> Optional[str]:
+    """Return the version of a git checkout, as computed by 'setuptools_scm'.
+
+    Versions are cached, keyed by the repository HEAD, so 'setuptools_scm' is only run again after a new
+    commit was checked out. Changes to the working tree (which 'setuptools_scm' reflects in a local version
+    suffix) don't invalidate the cache.
+    """
+
+    head = get_git_head(repo_root)
+    if head is None:
+        return None
+
+    cache = _load_git_versions_cache()
+    cached = cache.get(repo_root, None)
+    if cached is not None and cached.get("head", None) == head:
+        return cached["version"]
+
+    try:
+        from setuptools_scm import get_version as get_scm_version  # type: ignore
+    except ImportError:
+        return None
+
+    try:
+        version = get_scm_version(root=repo_root)
+    except Exception as e:
+        log.debug(f"Can't compute version of git checkout '{repo_root}': {e}")
+        return None
+
+    with _git_versions_lock:
+        cache = _load_git_versions_cache()
+        cache[repo_root] = {"head": head, "version": version}
+        try:
+            os.makedirs(os.path.dirname(GIT_VERSIONS_CACHE_FILE), exist_ok=True)
+            temp_path = f"{GIT_VERSIONS_CACHE_FILE}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(cache, f, sort_keys=True)
+            os.replace(temp_path, GIT_VERSIONS_CACHE_FILE)
+        except OSError as e:
+            log.debug(f"Can't write git versions cache: {e}")
+
+    return version
+
+
+def resolve_version(
+    main_module: str, project_name: Optional[str] = None
+) -> Optional[str]:
+    """Determine the version of a project, without importing any of its modules.
+
+    The version is looked up in the metadata of the installed distribution first, then in a 'version.txt' file
+    in the package folder, and last (if the package is part of a git checkout) computed via 'setuptools_scm'.
+
+    Args:
+        main_module: the main module of the project
+        project_name: the name of the projects distribution, if it differs from the main module name
+
+    Returns:
+        Optional[str]: the version, or 'None' if it can't be determined that way
+    """
+
+    versions = get_distribution_versions()
+    for name in [project_name, main_module]:
+        if name and normalize_name(name) in versions.keys():
+            return versions[normalize_name(name)]
+
+    module_folder = get_module_folder(main_module)
+    if module_folder is None:
+        return None
+
+    version_file = os.path.join(module_folder, "version.txt")
+    if os.path.isfile(version_file):
+        with open(version_file, "r", encoding="utf-8") as f:
+            version = f.read().strip()
+        if version:
+            return version
+
+    # packages in a virtualenv that lives within a git checkout are not part of that checkout
+    path_parts = os.path.abspath(module_folder).split(os.sep)
+    if "site-packages" in path_parts or "dist-packages" in path_parts:
+        return None
+
+    repo_root = find_git_root(module_folder)
+    if repo_root is not None:
+        return get_git_version(repo_root)
+
+    return None
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import site
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.serialization import to_json
+from frkl.project_meta.utils import (
+    get_module_folder,
+    reset_distributions_index,
+    write_file_if_changed,
+)
+from frkl.project_meta.versions import find_git_root
+
+
+try:
+    from importlib_metadata import PackageNotFoundError, distribution  # type: ignore
+except Exception:
+    from importlib.metadata import PackageNotFoundError, distribution  # type: ignore
+
+try:
+    import inotify_simple  # type: ignore
+except ImportError:  # pragma: no cover
+    inotify_simple = None
+
+
+log = logging.getLogger("frkl")
+
+DEFAULT_POLL_INTERVAL = 1.0
+"""How often (in seconds) to check watched files for changes."""
+
+FileState = Tuple[int, int]
+
+
+def get_file_state(path: str) -> Optional[FileState]:
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _refresh_distributions() -> None:
+    """Make sure installed distributions are re-scanned, after packages were (un-)installed."""
+
+    import importlib
+
+    importlib.invalidate_caches()
+    reset_distributions_index()
+
+    pkg_resources = sys.modules.get("pkg_resources", None)
+    if pkg_resources is not None:
+        try:
+            pkg_resources._initialize_master_working_set()  # type: ignore
+        except Exception as e:
+            log.debug(f"Can't refresh pkg_resources working set: {e}")
+
+
+class ProjectWatcher(object):
+    """Keeps the generated metadata files of a project up to date, while its sources change.
+
+    The files that are relevant for the different parts of the metadata (see 'INVALIDATION_PARTS') are
+    checked for changes. If any changed, only the affected parts are re-computed, and the output files are
+    only re-written if their content actually changes. On Linux, if 'inotify_simple' is installed, changes are
+    picked up as soon as they happen, otherwise files are polled.
+
+    Args:
+        main_module: the main module of the project
+        metadata_file: the file to write the project metadata to
+        pyinstaller_config_path: if specified, the folder to (re-)create the pyinstaller config in
+        interval: the poll interval (in seconds)
+        resources_mode: how to bundle resource files in the pyinstaller config (see 'frkl.project_meta.resource_bundle')
+        build_mode: the build mode of the pyinstaller config (see 'PYINSTALLER_BUILD_MODES')
+        startup_mode: the startup mode of the pyinstaller entry point (see 'ENTRY_POINT_STARTUP_MODES')
+    """
+
+    def __init__(
+        self,
+        main_module: str,
+        metadata_file: str = os.path.join(".frkl", "project.json"),
+        pyinstaller_config_path: Optional[str] = None,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        resources_mode: str = "files",
+        build_mode: str = "onefile",
+        startup_mode: str = "default",
+    ):
+
+        self._main_module: str = main_module
+        self._metadata_file: str = metadata_file
+        self._pyinstaller_config_path: Optional[str] = pyinstaller_config_path
+        self._interval: float = interval
+        self._resources_mode: str = resources_mode
+        self._build_mode: str = build_mode
+        self._startup_mode: str = startup_mode
+
+        self._project_metadata: ProjectMetadata = ProjectMetadata(
+            project_main_module=main_module, use_snapshot=False
+        )
+        self._state: Dict[str, Dict[str, Optional[FileState]]] = {}
+        self._watch_paths: Optional[Mapping[str, List[str]]] = None
+
+    @property
+    def project_metadata(self) -> ProjectMetadata:
+        return self._project_metadata
+
+    def get_watch_paths(self) -> Mapping[str, List[str]]:
+        """Return the files/folders to watch, grouped by the part of the metadata they affect.
+
+        The paths are computed once, and only again after the projects metadata or installation changed.
+        """
+
+        if self._watch_paths is None:
+            self._watch_paths = self._find_watch_paths()
+        return self._watch_paths
+
+    def _find_watch_paths(self) -> Mapping[str, List[str]]:
+
+        module_folder = get_module_folder(self._main_module)
+        if module_folder is None:
+            raise Exception(f"Can't find folder for module '{self._main_module}'.")
+
+        frkl_folder = os.path.join(module_folder, "_frkl")
+        metadata_paths = [frkl_folder]
+        if os.path.isdir(frkl_folder):
+            metadata_paths.extend(
+                os.path.join(frkl_folder, f)
+                for f in sorted(os.listdir(frkl_folder))
+                if not f.startswith(".") and f != "__pycache__"
+            )
+
+        # (un-)installing packages changes the site-packages folders, updating the
+        # project itself changes its dist-info files
+        dist_paths = sorted(
+            set(p for p in site.getsitepackages() + [site.getusersitepackages()])
+        )
+        dist_info = None
+        try:
+            dist = distribution(self._project_metadata.project_name)
+            for f in dist.files or []:
+                if f.name == "METADATA" and f.parent.name.endswith(".dist-info"):
+                    dist_info = str(dist.locate_file(f.parent))
+                    break
+        except PackageNotFoundError:
+            pass
+        if dist_info is not None:
+            dist_paths.extend(
+                os.path.join(dist_info, f)
+                for f in ["METADATA", "RECORD", "entry_points.txt"]
+            )
+
+        # the files the version is resolved from (see 'frkl.project_meta.versions.resolve_version'):
+        # for installed distributions that's only their metadata, 'version.txt' is ignored
+        if dist_info is not None:
+            version_paths = [os.path.join(dist_info, "METADATA")]
+        else:
+            version_paths = [os.path.join(module_folder, "version.txt")]
+            repo_root = find_git_root(module_folder)
+            if repo_root is not None:
+                version_paths.extend(
+                    os.path.join(repo_root, ".git", *p.split("/"))
+                    for p in ["HEAD", "logs/HEAD"]
+                )
+
+        return {
+            "metadata": metadata_paths,
+            "version": version_paths,
+            "defaults": [os.path.join(module_folder, "defaults.py")],
+            "dist": dist_paths,
+        }
+
+    def _read_state(self) -> Dict[str, Dict[str, Optional[FileState]]]:
+
+        return {
+            part: {path: get_file_state(path) for path in paths}
+            for part, paths in self.get_watch_paths().items()
+        }
+
+    def check_changes(self) -> Set[str]:
+        """Return the parts of the metadata whose files changed since the last check."""
+
+        state = self._read_state()
+        changed = set(
+            part for part in state.keys() if state[part] != self._state.get(part)
+        )
+        self._state = state
+        return changed
+
+    def update(self, parts: Optional[Iterable[str]] = None) -> List[str]:
+        """Re-compute the changed parts of the metadata, and write the output files if their content changed.
+
+        Args:
+            parts: the parts that changed (all, if not specified)
+
+        Returns:
+            List[str]: the files that were written
+        """
+
+        if parts is not None:
+            parts = list(parts)
+            if not parts:
+                return []
+            if "dist" in parts:
+                _refresh_distributions()
+            self._project_metadata.invalidate(*parts)
+
+        # the project name (and with it the distribution), or the installation might have changed
+        watch_paths = self._watch_paths
+        if parts is None or "metadata" in parts or "dist" in parts:
+            self._watch_paths = None
+
+        written = []
+        md_content = to_json(self._project_metadata.to_dict())
+        if write_file_if_changed(self._metadata_file, md_content):
+            written.append(self._metadata_file)
+
+        if self._pyinstaller_config_path is not None:
+            from frkl.project_meta.pyinstaller import PyinstallerBuildRenderer
+
+            renderer = PyinstallerBuildRenderer(
+                self._project_metadata,
+                resources_mode=self._resources_mode,
+                build_mode=self._build_mode,
+                startup_mode=self._startup_mode,
+            )
+            written.extend(renderer.write_config(self._pyinstaller_config_path))
+
+        if watch_paths is not None:
+            # start tracking newly watched paths, so they are not reported as changed in the next check
+            for part, paths in self.get_watch_paths().items():
+                if part in self._state.keys() and paths != watch_paths.get(part):
+                    self._state[part] = {path: get_file_state(path) for path in paths}
+
+        return written
+
+    def _get_wait_func(self) -> Callable[[], Any]:
+
+        if inotify_simple is None:
+            return lambda: time.sleep(self._interval)
+
+        inotify = inotify_simple.INotify()
+        flags = inotify_simple.flags
+        mask = (
+            flags.CREATE
+            | flags.DELETE
+            | flags.MODIFY
+            | flags.CLOSE_WRITE
+            | flags.MOVED_TO
+            | flags.MOVED_FROM
+            | flags.ATTRIB
+        )
+        folders = set()
+        for paths in self.get_watch_paths().values():
+            for path in paths:
+                folders.add(path if os.path.isdir(path) else os.path.dirname(path))
+        for folder in sorted(folders):
+            try:
+                inotify.add_watch(folder, mask)
+            except OSError as e:
+                log.debug(f"Can't watch folder '{folder}': {e}")
+
+        # events only wake us up early, which files actually changed is determined by comparing their state
+        return lambda: inotify.read(timeout=int(self._interval * 1000), read_delay=50)
+
+    def watch(
+        self, callback: Optional[Callable[[Set[str], List[str]], Any]] = None
+    ) -> None:
+        """Watch the project, and update the output files whenever relevant files change (until interrupted).
+
+        Args:
+            callback: a function that is called with the changed parts and the written files after every update
+        """
+
+        self.check_changes()
+        written = self.update()
+        if callback is not None:
+            callback(set(), written)
+
+        wait = self._get_wait_func()
+        while True:
+            wait()
+            changed = self.check_changes()
+            if not changed:
+                continue
+
+            try:
+                written = self.update(changed)
+            except Exception as e:
+                # most likely a file that is currently being edited, we'll try again after the next change
+                log.warning(f"Can't update metadata for '{self._main_module}': {e}")
+                continue
+
+            if callback is not None:
+                callback(changed, written)
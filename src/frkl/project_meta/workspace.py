@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from frkl.project_meta.serialization import to_json
+from frkl.project_meta.utils import (
+    get_distribution_versions,
+    get_entry_points_index,
+    get_module_folder,
+    set_distributions_index,
+    write_file_if_changed,
+)
+
+
+log = logging.getLogger("frkl")
+
+PROJECT_ROOT_MARKERS = ["setup.cfg", "setup.py", "pyproject.toml"]
+"""Files that mark the root folder of a project."""
+
+
+def find_project_root(main_module: str) -> str:
+    """Return the root folder of the (source) project that contains a module.
+
+    Falls back to the current working directory if the module is not part of a project checkout (e.g. because
+    it is installed in site-packages).
+    """
+
+    module_folder = get_module_folder(main_module)
+    if module_folder is not None:
+        folder = os.path.abspath(module_folder)
+        while True:
+            if any(
+                os.path.isfile(os.path.join(folder, m)) for m in PROJECT_ROOT_MARKERS
+            ):
+                return folder
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                break
+            folder = parent
+
+    return os.getcwd()
+
+
+class WorkspaceProject(object):
+    """A project in a workspace.
+
+    Args:
+        main_module: the main module of the project
+        path: the folder to write the projects outputs to (defaults to the projects root folder)
+    """
+
+    def __init__(self, main_module: str, path: Optional[str] = None):
+
+        if path is None:
+            path = find_project_root(main_module)
+
+        self.main_module: str = main_module
+        self.path: str = path
+
+    def __repr__(self):
+
+        return f"WorkspaceProject(main_module='{self.main_module}', path='{self.path}')"
+
+
+def load_workspace_file(path: str) -> List[WorkspaceProject]:
+    """Read the projects of a workspace from a JSON file.
+
+    The file contains a 'projects' list, whose items are either the name of a main module, or a dict with the
+    keys 'main_module' and (optional) 'path' (relative to the folder of the workspace file).
+    """
+
+    with open(path, "r") as f:
+        workspace = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    result = []
+    for item in workspace.get("projects", []):
+        if isinstance(item, str):
+            item = {"main_module": item}
+        project_path = item.get("path", None)
+        if project_path is not None:
+            project_path = os.path.join(base_dir, project_path)
+        result.append(
+            WorkspaceProject(main_module=item["main_module"], path=project_path)
+        )
+
+    return result
+
+
+def _init_worker(
+    entry_points_index: Mapping[str, List[Mapping[str, Optional[str]]]],
+    distribution_versions: Mapping[str, str],
+) -> None:
+
+    set_distributions_index(entry_points_index, distribution_versions)
+
+
+def _generate_project_outputs(
+    project: WorkspaceProject,
+    other_projects: Optional[Mapping[str, Mapping[str, Any]]],
+    pyinstaller: bool,
+    resources_mode: str,
+) -> Dict[str, Any]:
+
+    from frkl.project_meta.core import ProjectMetadata
+
+    start = time.perf_counter()
+    result: Dict[str, Any] = {
+        "main_module": project.main_module,
+        "path": project.path,
+        "written": [],
+        "error": None,
+    }
+
+    try:
+        md = ProjectMetadata(
+            project_main_module=project.main_module, other_projects=other_projects
+        )
+        if other_projects is not None and md.metadata.get("discovery_policy", None):
+            # the shared discovery used the default policy, so we need to do our own
+            md = ProjectMetadata(project_main_module=project.main_module)
+
+        md_file = os.path.join(project.path, ".frkl", "project.json")
+        if write_file_if_changed(md_file, to_json(md.to_dict())):
+            result["written"].append(md_file)
+
+        if pyinstaller:
+            from frkl.project_meta.pyinstaller import PyinstallerBuildRenderer
+
+            # where the 'binary-config' Makefile target, and the spec files expect it
+            config_path = os.path.join(project.path, ".frkl", "pyinstaller")
+            renderer = PyinstallerBuildRenderer(md, resources_mode=resources_mode)
+            result["written"].extend(renderer.write_config(config_path))
+    except Exception as e:
+        log.debug(
+            f"Can't generate outputs for '{project.main_module}'", exc_info=True
+        )
+        result["error"] = str(e)
+
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+def get_shared_project_snapshots() -> Dict[str, Mapping[str, Any]]:
+    """Discover all installed frkl projects (using the default discovery policy), and return their snapshots."""
+
+    from frkl.project_meta.core import ProjectMetadata
+    from frkl.project_meta.utils import discover_installed_modules
+
+    return {
+        m.__name__: ProjectMetadata(project_main_module=m).to_snapshot()
+        for m in sorted(discover_installed_modules(), key=lambda m: m.__name__)
+    }
+
+
+def generate_workspace(
+    projects: Iterable[WorkspaceProject],
+    pyinstaller: bool = False,
+    resources_mode: str = "files",
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Generate the metadata (and optionally pyinstaller) outputs of several projects at once.
+
+    Discovery of installed frkl projects and the scan of installed distributions is done once, and shared with
+    the worker processes that generate the outputs of the single projects in parallel. Projects that configure
+    their own 'discovery_policy' still do their own discovery.
+
+    Args:
+        projects: the projects of the workspace
+        pyinstaller: whether to also create the pyinstaller config for every project (in '<path>/.frkl/pyinstaller')
+        resources_mode: how to bundle resource files (see 'frkl.project_meta.resource_bundle')
+        max_workers: the maximum number of worker processes (defaults to the number of CPUs)
+
+    Returns:
+        Dict[str, Any]: the duration of the shared work ('shared_duration'), and per-project results ('projects')
+    """
+
+    projects = list(projects)
+
+    start = time.perf_counter()
+    entry_points_index = get_entry_points_index()
+    distribution_versions = get_distribution_versions()
+    other_projects = get_shared_project_snapshots()
+    shared_duration = time.perf_counter() - start
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(entry_points_index, distribution_versions),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _generate_project_outputs,
+                project,
+                other_projects,
+                pyinstaller,
+                resources_mode,
+            )
+            for project in projects
+        ]
+        results = [f.result() for f in futures]
+
+    return {
+        "shared_duration": shared_duration,
+        "duration": time.perf_counter() - start,
+        "projects": results,
+    }
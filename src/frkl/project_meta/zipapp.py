@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""Build a frkl application as a zipapp: a single archive that is run by an existing Python interpreter.
+
+Compared to a pyinstaller build, creating the archive is fast, and nothing needs to be extracted at startup. The
+archive contains the entry point dispatcher (as '__main__.py'), pre-compiled bytecode of the application and its
+(pure Python) dependencies, 'app.json' and the resource files of all frkl projects. Since the bytecode is
+specific to the Python version that created it, the archive can only be run with that Python version.
+"""
+import importlib.machinery
+import importlib.util
+import json
+import logging
+import os
+import py_compile
+import stat
+import sys
+import tempfile
+import zipfile
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.pyinstaller import get_datas, render_entry_point
+from frkl.project_meta.resource_bundle import (
+    RESOURCE_INDEX_FILE_NAME,
+    RESOURCE_INDEX_FORMAT_VERSION,
+    UNCOMPRESSED_EXTENSIONS,
+    hash_file,
+)
+from frkl.project_meta.serialization import to_json
+from frkl.project_meta.utils import normalize_name
+
+
+try:
+    from importlib_metadata import PackageNotFoundError, distribution  # type: ignore
+except Exception:
+    from importlib.metadata import PackageNotFoundError, distribution  # type: ignore
+
+
+log = logging.getLogger("frkl")
+
+DEFAULT_INTERPRETER = "/usr/bin/env python3"
+
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def get_required_distributions(
+    project_names: Iterable[str], extras: Optional[Iterable[str]] = None
+) -> List[str]:
+    """Return the names of the installed distributions of the provided projects, and all their (recursive) requirements.
+
+    Requirements that are not installed are skipped (with a warning), installed versions are not checked
+    against the requirement specifiers.
+
+    Args:
+        project_names: the names of the project distributions
+        extras: the extras of the projects to include (e.g. 'cli')
+    """
+
+    import pkg_resources
+
+    if extras is None:
+        extras = []
+
+    requirements = []
+    for name in project_names:
+        requirements.append(
+            pkg_resources.Requirement.parse(f"{name}[{','.join(extras)}]")
+        )
+
+    result: Dict[str, str] = {}
+    while requirements:
+        req = requirements.pop(0)
+        if req.key in result.keys():
+            continue
+        try:
+            dist = pkg_resources.get_distribution(req.key)
+        except pkg_resources.DistributionNotFound:
+            log.warning(f"Not including '{req}' in zipapp: not installed.")
+            continue
+        result[req.key] = dist.project_name
+
+        dist_extras = [e for e in req.extras if e in dist.extras]
+        requirements.extend(dist.requires(extras=dist_extras))
+
+    return sorted(result.values(), key=normalize_name)
+
+
+def _get_package_folders(dist: Any) -> List[Tuple[str, str]]:
+    """Return the top-level package folders of a distribution that doesn't list them in its 'RECORD' (editable installs).
+
+    Returns:
+        List[Tuple[str, str]]: tuples of folder and the path of the folder within the archive
+    """
+
+    top_level = dist.read_text("top_level.txt")
+    if not top_level:
+        return []
+
+    result = []
+    for name in top_level.split():
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            continue
+        if spec.submodule_search_locations:
+            for location in spec.submodule_search_locations:
+                result.append((location, name))
+        elif spec.origin:
+            result.append((spec.origin, os.path.basename(spec.origin)))
+    return result
+
+
+class ZipappBuilder(object):
+    """Build a zipapp for a frkl application.
+
+    Args:
+        project_metadata: the metadata of the project to build
+        include_sources: whether to also add the Python source files (for tracebacks with source lines)
+        interpreter: the interpreter for the shebang line of the archive
+        extras: the extras of the project(s) to include the requirements of (e.g. 'cli')
+        startup_mode: how the entry point starts the application, one of 'default', 'lazy' (see 'frkl.project_meta.lazy')
+    """
+
+    def __init__(
+        self,
+        project_metadata: ProjectMetadata,
+        include_sources: bool = False,
+        interpreter: str = DEFAULT_INTERPRETER,
+        extras: Optional[Iterable[str]] = None,
+        startup_mode: str = "default",
+    ):
+
+        if extras is None:
+            extras = []
+
+        self._project_metadata: ProjectMetadata = project_metadata
+        self._include_sources: bool = include_sources
+        self._interpreter: str = interpreter
+        self._extras: List[str] = list(extras)
+        self._startup_mode: str = startup_mode
+
+    def build(self, target: str) -> Mapping[str, Any]:
+        """Build the zipapp.
+
+        Args:
+            target: the path of the archive to create
+
+        Returns:
+            Mapping[str, Any]: details about the build: number of files, and modules that had to be skipped
+        """
+
+        package_data = self._project_metadata.create_package_data()
+        app_details = package_data["app_details"]
+        main_module = app_details["main_module"]
+
+        app_details["build_info"]["build_mode"] = "zipapp"
+        app_details["build_info"]["startup_mode"] = self._startup_mode
+        app_details["build_info"]["python_version"] = ".".join(
+            str(v) for v in sys.version_info[:3]
+        )
+
+        project_names = [self._project_metadata.project_name] + [
+            md.project_name
+            for md in self._project_metadata.other_frkl_projects.values()
+        ]
+
+        startup_constants = self._project_metadata.create_startup_constants()
+
+        self._members: Set[str] = set()
+        self._skipped: List[str] = []
+
+        target = os.path.abspath(os.path.expanduser(target))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_target = f"{target}.{os.getpid()}.tmp"
+
+        with tempfile.TemporaryDirectory(prefix="frkl_zipapp_") as temp_dir:
+            self._temp_dir = temp_dir
+            with open(temp_target, "wb") as f:
+                f.write(f"#!{self._interpreter}\n".encode("utf-8"))
+                with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+
+                    main_script = render_entry_point(
+                        main_module=main_module,
+                        entry_points=package_data["entry_points"],
+                        template_name="zipapp_main.py.j2",
+                        startup_mode=self._startup_mode,
+                        startup_constants=startup_constants,
+                        python_version=sys.version_info[:2],
+                    )
+                    self._write_str(zf, "__main__.py", main_script)
+
+                    for dist_name in get_required_distributions(
+                        project_names, extras=self._extras
+                    ):
+                        self._add_distribution(zf, dist_name)
+
+                    self._add_resources(zf, main_module, package_data["resources"])
+                    self._write_str(
+                        zf, f"{main_module}/app.json", to_json(app_details, indent=False)
+                    )
+
+        os.replace(temp_target, target)
+        mode = os.stat(target).st_mode
+        os.chmod(target, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+        if self._skipped:
+            log.warning(
+                f"Binary extension modules can't be imported from a zipapp, not included: {', '.join(self._skipped)}"
+            )
+
+        return {
+            "target": target,
+            "files": len(self._members),
+            "skipped": list(self._skipped),
+        }
+
+    def _write_str(self, zf: zipfile.ZipFile, member: str, content: str) -> None:
+
+        if member in self._members:
+            return
+        self._members.add(member)
+        zf.writestr(zipfile.ZipInfo(member, date_time=_ZIP_DATE_TIME), content)
+
+    def _write_file(self, zf: zipfile.ZipFile, member: str, path: str) -> None:
+
+        if member in self._members:
+            return
+        self._members.add(member)
+
+        info = zipfile.ZipInfo(member, date_time=_ZIP_DATE_TIME)
+        if os.path.splitext(path)[1].lower() in UNCOMPRESSED_EXTENSIONS:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        with open(path, "rb") as f:
+            zf.writestr(info, f.read())
+
+    def _add_module_file(self, zf: zipfile.ZipFile, member: str, path: str) -> None:
+
+        if "__pycache__" in member.split("/") or member.endswith((".pyc", ".pyo")):
+            return
+
+        if any(member.endswith(s) for s in importlib.machinery.EXTENSION_SUFFIXES):
+            self._skipped.append(member)
+            return
+
+        if not member.endswith(".py"):
+            self._write_file(zf, member, path)
+            return
+
+        # zipimport uses a '.pyc' file that is stored next to (or instead of) the '.py' file, unchecked
+        # hash-based pycs are used as is, even if the source file is present
+        pyc_file = os.path.join(self._temp_dir, "module.pyc")
+        compile_args: Dict[str, Any] = {}
+        if hasattr(py_compile, "PycInvalidationMode"):
+            compile_args[
+                "invalidation_mode"
+            ] = py_compile.PycInvalidationMode.UNCHECKED_HASH
+        # else: Python < 3.7, only timestamp-based pycs are supported
+        try:
+            py_compile.compile(
+                path, cfile=pyc_file, dfile=member, doraise=True, **compile_args
+            )
+        except py_compile.PyCompileError as e:
+            log.debug(f"Can't compile '{path}', adding source only: {e}")
+            self._write_file(zf, member, path)
+            return
+
+        self._write_file(zf, f"{member}c", pyc_file)
+        if self._include_sources:
+            self._write_file(zf, member, path)
+
+    def _add_distribution(self, zf: zipfile.ZipFile, dist_name: str) -> None:
+
+        try:
+            dist = distribution(dist_name)
+        except PackageNotFoundError:
+            log.debug(f"Not including '{dist_name}' in zipapp: no distribution metadata.")
+            return
+
+        has_modules = False
+        for f in dist.files or []:
+            member = f.as_posix()
+            if member.startswith("../") or member.endswith(".pth"):
+                continue
+            if member.endswith(".py"):
+                has_modules = True
+            self._add_module_file(zf, member, str(f.locate()))
+
+        if has_modules:
+            return
+
+        # editable installs only list their metadata files
+        for folder, base_member in _get_package_folders(dist):
+            if os.path.isfile(folder):
+                self._add_module_file(zf, base_member, folder)
+                continue
+            for root, dirnames, filenames in os.walk(folder):
+                dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+                rel_root = os.path.relpath(root, folder)
+                for filename in sorted(filenames):
+                    parts = [base_member] if rel_root == "." else [base_member, rel_root]
+                    member = "/".join(parts + [filename]).replace(os.sep, "/")
+                    self._add_module_file(zf, member, os.path.join(root, filename))
+
+    def _add_resources(
+        self,
+        zf: zipfile.ZipFile,
+        main_module: str,
+        resources_map: Mapping[str, List[str]],
+    ) -> None:
+        """Add the resource files of all frkl projects, at their location within the package, and a resource index."""
+
+        files: Dict[str, Dict[str, Any]] = {}
+        for src, dest in get_datas(resources_map=resources_map):
+            package, _, rel_dir = dest.replace(os.sep, "/").partition("/")
+            parts = package.split(".") + [p for p in rel_dir.split("/") if p]
+            member = "/".join(parts + [os.path.basename(src)])
+
+            self._write_file(zf, member, src)
+            files[member] = {
+                "hash": hash_file(src),
+                "size": os.path.getsize(src),
+                "path": member,
+            }
+
+        index = {
+            "format_version": RESOURCE_INDEX_FORMAT_VERSION,
+            "mode": "files",
+            "archive": None,
+            "files": files,
+        }
+        self._write_str(
+            zf,
+            f"{main_module}/{RESOURCE_INDEX_FILE_NAME}",
+            json.dumps(index, sort_keys=True),
+        )
+
+
+def build_zipapp(
+    main_module: str,
+    target: str,
+    include_sources: bool = False,
+    interpreter: str = DEFAULT_INTERPRETER,
+    extras: Optional[Iterable[str]] = None,
+    startup_mode: str = "default",
+    project_metadata: Optional[ProjectMetadata] = None,
+) -> Mapping[str, Any]:
+
+    if project_metadata is None:
+        project_metadata = ProjectMetadata(project_main_module=main_module)
+
+    builder = ZipappBuilder(
+        project_metadata,
+        include_sources=include_sources,
+        interpreter=interpreter,
+        extras=extras,
+        startup_mode=startup_mode,
+    )
+    return builder.build(target)
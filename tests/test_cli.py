@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.interfaces.cli` module."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+LOADED_MODULES_SCRIPT = """
+import atexit, json, sys
+
+def dump_modules():
+    print(json.dumps(sorted(sys.modules.keys())))
+
+atexit.register(dump_modules)
+
+from frkl.project_meta.interfaces.cli import cli
+
+sys.argv = ["frkl-project"] + sys.argv[1:]
+cli()
+"""
+
+HEAVY_MODULES = ["jinja2", "frkl.project_meta.pyinstaller", "frkl.project_meta.core"]
+
+
+def get_loaded_modules(*args: str):
+
+    result = subprocess.run(
+        [sys.executable, "-c", LOADED_MODULES_SCRIPT, *args],
+        stdout=subprocess.PIPE,
+        check=False,
+    )
+    return set(json.loads(result.stdout.decode().strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize(
+    "args,expected_not_loaded",
+    [
+        (["--help"], HEAVY_MODULES),
+        (["pyinstaller-config", "--help"], HEAVY_MODULES),
+        (
+            ["runtime-info", "frkl.project_meta"],
+            ["jinja2", "frkl.project_meta.pyinstaller"],
+        ),
+        (["metadata", "frkl.project_meta"], ["jinja2", "frkl.project_meta.pyinstaller"]),
+    ],
+)
+def test_cli_lazy_imports(args, expected_not_loaded):
+
+    modules = get_loaded_modules(*args)
+
+    assert "frkl.project_meta.interfaces.cli" in modules
+    if args[0] in ["runtime-info", "metadata"]:
+        assert "frkl.project_meta.core" in modules
+    for module in expected_not_loaded:
+        assert module not in modules
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.core` module."""
+
+import asyncio
+import gc
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from frkl.project_meta.core import ProjectMetadata
+
+
+class CountingProjectMetadata(ProjectMetadata):
+    def __init__(self, *args, **kwargs):
+
+        self.calls: Counter = Counter()
+        self._calls_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _count(self, name: str):
+
+        with self._calls_lock:
+            self.calls[name] += 1
+        time.sleep(0.05)
+
+    def _load_metadata(self):
+        self._count("metadata")
+        return super()._load_metadata()
+
+    def _load_version(self):
+        self._count("version")
+        return super()._load_version()
+
+    def _load_runtime_details(self):
+        self._count("runtime_details")
+        return super()._load_runtime_details()
+
+    def _load_other_frkl_projects(self):
+        self._count("other_frkl_projects")
+        return {}
+
+    def _load_pkg_defaults(self):
+        self._count("get_pkg_defaults")
+        return super()._load_pkg_defaults()
+
+
+def test_lazy_properties_resolved_once():
+
+    md = CountingProjectMetadata("frkl.project_meta")
+    num_threads = 32
+    barrier = threading.Barrier(num_threads)
+    errors = []
+
+    def access():
+        try:
+            barrier.wait()
+            md.metadata
+            md.version
+            md.runtime_details
+            md.other_frkl_projects
+            md.get_pkg_defaults()
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=access) for _ in range(num_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert md.calls == {
+        "metadata": 1,
+        "version": 1,
+        "runtime_details": 1,
+        "other_frkl_projects": 1,
+        "get_pkg_defaults": 1,
+    }
+    assert md.project_name == "frkl.project-meta"
+
+
+def test_globals_scope():
+
+    md = ProjectMetadata("frkl.project_meta")
+    md.set_global("a", 1)
+
+    async def task(value):
+        with md.globals_scope(a=value):
+            await asyncio.sleep(0.01)
+            return md.get_global("a")
+
+    async def main():
+        return await asyncio.gather(task(2), task(3))
+
+    assert asyncio.run(main()) == [2, 3]
+    assert md.get_global("a") == 1
+
+
+def test_register_singleton_concurrently():
+
+    md = ProjectMetadata("frkl.project_meta")
+    objs = [object() for _ in range(16)]
+    barrier = threading.Barrier(len(objs))
+    failed = []
+
+    def register(obj):
+        barrier.wait()
+        try:
+            md.register_singleton(obj, reg_cls=object)
+        except Exception:
+            failed.append(obj)
+
+    threads = [threading.Thread(target=register, args=(o,)) for o in objs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(failed) == len(objs) - 1
+    assert md.get_singleton(object) not in failed
+    with pytest.raises(Exception):
+        md.register_singleton(failed[0], reg_cls=object)
+
+
+def test_frozen_other_frkl_projects(tmp_path, monkeypatch):
+
+    dep = ProjectMetadata("frkl.project_meta")
+    app_details = {
+        "metadata": {"project": {"project_name": "app", "exe_name": None}},
+        "version": "1.0.0",
+        "build_info": {"build_time": "now"},
+        "other_frkl_project_versions": {"frkl.project_meta": dep.version},
+        "other_frkl_projects": {"frkl.project_meta": dep.to_snapshot()},
+    }
+    app_dir = tmp_path / "app"
+    app_dir.mkdir()
+    (app_dir / "app.json").write_text(json.dumps(app_details))
+
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "_MEIPASS", str(tmp_path), raising=False)
+
+    md = ProjectMetadata("app")
+    other = md.other_frkl_projects["frkl.project_meta"]
+
+    assert other.project_name == "frkl.project-meta"
+    assert other.version == dep.version
+    assert other.runtime_details["build_info"] == {"build_time": "now"}
+
+
+def test_warm():
+
+    md = CountingProjectMetadata("frkl.project_meta")
+    try:
+        assert md.warm(deep=True, freeze=True) is md
+    finally:
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+    for name in [
+        "metadata",
+        "version",
+        "runtime_details",
+        "other_frkl_projects",
+        "get_pkg_defaults",
+    ]:
+        assert md.calls[name] == 1
+    assert md._resources is not None
+    assert md._defaults_resolver is not None
+
+    md.warm()
+    md.to_dict()
+    assert all(c == 1 for c in md.calls.values())
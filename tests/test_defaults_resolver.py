@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.defaults_resolver` module."""
+
+import os
+import sys
+
+import pytest
+from appdirs import AppDirs
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.defaults_resolver import StaticDefaultsEvaluator
+
+
+DEFAULTS_SOURCE = '''
+import os
+import sys
+
+from appdirs import AppDirs
+
+static_pkg_app_dirs = AppDirs("static_pkg", "frkl")
+
+if not hasattr(sys, "frozen"):
+    STATIC_PKG_MODULE_BASE_FOLDER = os.path.dirname(__file__)
+else:
+    STATIC_PKG_MODULE_BASE_FOLDER = os.path.join(sys._MEIPASS, "static_pkg")
+
+STATIC_PKG_RESOURCES_FOLDER = os.path.join(STATIC_PKG_MODULE_BASE_FOLDER, "resources")
+STATIC_PKG_CACHE_DIR = os.path.join(static_pkg_app_dirs.user_cache_dir, "cache")
+
+EXECUTED = object()
+'''
+
+
+def test_static_defaults(tmp_path, monkeypatch):
+
+    pkg = tmp_path / "static_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "defaults.py").write_text(DEFAULTS_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    md = ProjectMetadata("static_pkg")
+    resolver = md.get_defaults_resolver()
+
+    assert md.get_resources_folder() == os.path.join(str(pkg), "resources")
+    assert isinstance(md.get_app_dirs(), AppDirs)
+    assert resolver.get("STATIC_PKG_CACHE_DIR").endswith("cache")
+    assert not resolver.fully_static
+    assert "static_pkg.defaults" not in sys.modules
+
+    assert resolver.get("EXECUTED") is not None
+    assert "static_pkg.defaults" in sys.modules
+    monkeypatch.delitem(sys.modules, "static_pkg.defaults")
+
+
+@pytest.mark.parametrize(
+    "source, unresolved",
+    [
+        ('X = []\nX.append("a")', {"X"}),
+        ("CFG = {}\nCFG['k'] = 1", {"CFG"}),
+        ("from appdirs import AppDirs\nD = AppDirs('a', 'b')\nD.appname = 'c'", {"D"}),
+        ("X = 1\ndel X", {"X"}),
+        ("X = [1]\nX += [2]", {"X"}),
+        ("X = []\nY = {'k': X}\nZ = Y['k']\nX.append(1)", {"X", "Y", "Z"}),
+        ("X = []\nY = [X]\nY[0].append(1)", {"X", "Y"}),
+        ("X = []\nY = unknown(X)", {"X", "Y"}),
+        ("X = []\nX.append(1)\nY = X", {"X", "Y"}),
+        (
+            "import os\nos.environ['HOME'] = 'x'\nHOME = os.environ.get('HOME')",
+            {"HOME"},
+        ),
+    ],
+)
+def test_static_defaults_mutations(source, unresolved):
+
+    source = f'"""Docstring."""\nimport os\nA = "a"\nos.makedirs\n{source}\nB = A + "b"\n'
+    values, unresolved_names = StaticDefaultsEvaluator(source, "defaults.py").evaluate()
+
+    assert unresolved_names == unresolved
+    assert not unresolved.intersection(values.keys())
+    assert values["B"] == "ab"
+
+
+def test_static_defaults_environ():
+
+    source = "import os\nHOME = os.environ.get('HOME', 'n/a')\n"
+    values, unresolved = StaticDefaultsEvaluator(source, "defaults.py").evaluate()
+
+    assert not unresolved
+    assert values["HOME"] == os.environ.get("HOME", "n/a")
+
+
+def test_static_defaults_fallback(tmp_path, monkeypatch):
+
+    pkg = tmp_path / "mutating_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "defaults.py").write_text('NAMES = []\nNAMES.append("a")\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    resolver = ProjectMetadata("mutating_pkg").get_defaults_resolver()
+
+    assert not resolver.fully_static
+    assert resolver.get_defaults()["NAMES"] == ["a"]
+    monkeypatch.delitem(sys.modules, "mutating_pkg.defaults")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.documentation` package."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from frkl.project_meta.documentation.mkdocs_macros_frkl import (
+    CliOutputCache,
+    define_env,
+    find_cli_commands,
+    prefetch_cli_commands,
+    render_api_docs_incremental,
+)
+
+
+def test_cli_cache_roundtrip(tmp_path):
+
+    cache = CliOutputCache(cache_dir=str(tmp_path))
+    command = ("frkl-project", "--help")
+
+    assert cache.get(command) is None
+    cache.set(command, "usage")
+    assert cache.get(command) == "usage"
+    assert cache.get(("frkl-project", "--version")) is None
+
+
+def test_cli_cache_key_includes_executable_fingerprint(tmp_path):
+
+    cache = CliOutputCache(cache_dir=str(tmp_path))
+    command = ("frkl-project", "--help")
+
+    key = cache.get_cache_key(command)
+    cache._fingerprints["frkl-project"] = "changed"
+    assert cache.get_cache_key(command) != key
+
+
+def test_cli_cache_eviction(tmp_path):
+
+    cache = CliOutputCache(cache_dir=str(tmp_path), max_entries=2, max_age=60)
+
+    for i in range(3):
+        cache.set(("echo", str(i)), str(i))
+        past = time.time() - 10 + i
+        os.utime(cache.get_cache_file(("echo", str(i))), (past, past))
+    cache.evict()
+
+    assert cache.get(("echo", "0")) is None
+    assert cache.get(("echo", "2")) == "2"
+
+    old = time.time() - 120
+    os.utime(cache.get_cache_file(("echo", "2")), (old, old))
+    assert cache.get(("echo", "2")) is None
+
+
+def test_prefetch_cli_commands(tmp_path):
+
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "usage.md").write_text(
+        '# Usage\n\n{{ cli("echo", "hello", max_height=200) }}\n\n'
+        '{{ cli("echo", "hello") }}\n{{ cli(some_variable) }}\n'
+    )
+
+    commands = find_cli_commands(str(docs_dir))
+    assert commands == [("echo", "hello")]
+
+    cache = CliOutputCache(cache_dir=str(tmp_path / "cache"))
+    failed = prefetch_cli_commands(cache, commands + [("false",)])
+
+    assert cache.get(("echo", "hello")) == "hello\n"
+    assert list(failed.keys()) == [("false",)]
+
+
+def test_cli_cache_concurrent_eviction(tmp_path):
+
+    cache = CliOutputCache(cache_dir=str(tmp_path), max_entries=3)
+
+    def store(i):
+        cache.set(("echo", str(i)), str(i))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(store, range(64)))
+
+    assert len(os.listdir(str(tmp_path))) == 3
+
+
+class MacroEnv(object):
+    def __init__(self, variables):
+
+        self.conf = {}
+        self.variables = variables
+        self.macros = {}
+
+    def macro(self, func):
+
+        self.macros[func.__name__] = func
+        return func
+
+
+def test_cli_macro_timeout(tmp_path):
+
+    env = MacroEnv(
+        {"cli_command_timeout": 0.1, "cli_cache_dir": str(tmp_path)}
+    )
+    define_env(env)
+
+    output = env.macros["cli"]("sleep", "5")
+    assert "timed out" in output
+    assert env.macros["cli"]("echo", "hello").endswith("hello\n\n```\n")
+
+
+class ApiObject(object):
+    def __init__(self, name, docstring="", members=None, filename=None):
+
+        self.name = name
+        self.docstring = docstring
+        self.members = members or []
+        self.location = type("Location", (object,), {"filename": filename})
+
+
+class StubRenderer(object):
+    def __init__(self, filename):
+
+        self.filename = filename
+        self.render_toc = False
+        self.encoding = "utf-8"
+        self.rendered = []
+
+    def get_resolver(self, modules):
+
+        return {m.name for m in modules}
+
+    def process(self, modules, resolver):
+
+        assert resolver is not None
+
+    def render_to_string(self, modules):
+
+        self.rendered.extend(m.name for m in modules)
+        return "".join(f"# {m.name}\n{m.docstring}\n" for m in modules)
+
+
+class StubSession(object):
+    def __init__(self, renderer, sources):
+
+        self.renderer = renderer
+        self.sources = sources
+
+    def load_modules(self):
+
+        modules = []
+        for name, (path, members) in sorted(self.sources.items()):
+            with open(path, "r") as f:
+                docstring = f.read()
+            modules.append(
+                ApiObject(
+                    name,
+                    docstring=docstring,
+                    members=[ApiObject(m) for m in members],
+                    filename=path,
+                )
+            )
+        return modules
+
+    def process(self, modules):
+
+        pass
+
+
+def test_render_api_docs_incremental(tmp_path):
+
+    config_file = tmp_path / "pydoc-markdown.yml"
+    config_file.write_text("renderer: markdown")
+
+    def write_module(name, content):
+        path = tmp_path / "src" / f"{name}.py"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(content)
+        return str(path)
+
+    sources = {
+        "pkg.a": (write_module("a", "Uses Bar."), ["foo"]),
+        "pkg.b": (write_module("b", "Defines Bar."), ["Bar"]),
+        "pkg.c": (write_module("c", "Unrelated."), ["baz"]),
+    }
+    renderer = StubRenderer(str(tmp_path / "api.md"))
+    session = StubSession(renderer, sources)
+
+    def render():
+        renderer.rendered = []
+        return render_api_docs_incremental(
+            str(config_file), session, cache_dir=str(tmp_path / "cache")
+        )
+
+    assert render()
+    assert renderer.rendered == ["pkg.a", "pkg.b", "pkg.c"]
+    assert not render()
+    assert renderer.rendered == []
+
+    # modules that mention a name of a changed module are rendered again
+    write_module("b", "Defines Bar, differently.")
+    assert render()
+    assert renderer.rendered == ["pkg.a", "pkg.b"]
+    assert "differently" in (tmp_path / "api.md").read_text()
+
+    write_module("c", "Still unrelated.")
+    assert render()
+    assert renderer.rendered == ["pkg.c"]
+
+    # everything is rendered again if the names of a changed module change
+    sources["pkg.c"] = (write_module("c", "Unrelated again."), ["baz", "Qux"])
+    assert render()
+    assert renderer.rendered == ["pkg.a", "pkg.b", "pkg.c"]
+
+    # ... or if the set of modules changes
+    sources["pkg.d"] = (write_module("d", "New."), [])
+    assert render()
+    assert renderer.rendered == ["pkg.a", "pkg.b", "pkg.c", "pkg.d"]
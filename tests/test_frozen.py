@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.frozen` module."""
+
+import json
+import os
+import subprocess
+
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.frozen import (
+    create_frozen_layout,
+    run_frozen,
+    time_frozen_startup,
+)
+
+
+def test_frozen_startup(tmp_path):
+
+    layout = create_frozen_layout(
+        ProjectMetadata(project_main_module="frkl.project_meta"), str(tmp_path)
+    )
+    assert os.path.isfile(
+        os.path.join(str(tmp_path), "frkl.project_meta", "app.json")
+    )
+
+    result = run_frozen(
+        layout,
+        ["runtime-info", "frkl.project_meta"],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    runtime_details = json.loads(result.stdout)
+    assert runtime_details["app_type"] == "binary"
+    assert runtime_details["build_info"]["build_mode"] == "onedir"
+
+    timings = time_frozen_startup(layout, ["--help"], runs=1)
+    assert timings["runs"] == 1
+    assert 0 < timings["app"]["median"] <= timings["wall"]["median"]
+
+
+def test_lazy_startup(tmp_path):
+
+    md = ProjectMetadata(project_main_module="frkl.project_meta")
+    default_layout = create_frozen_layout(md, str(tmp_path / "default"))
+    lazy_layout = create_frozen_layout(
+        md, str(tmp_path / "lazy"), startup_mode="lazy"
+    )
+
+    with open(lazy_layout["script"], "r") as f:
+        script = f.read()
+    assert "register_lazy_metadata" in script
+    assert f"'{lazy_layout['exe_name']}': {{'--help': 'Usage:" in script
+
+    outputs = [
+        run_frozen(layout, ["--help"], stdout=subprocess.PIPE, check=True).stdout
+        for layout in [default_layout, lazy_layout]
+    ]
+    assert outputs[0] == outputs[1]
+
+    result = run_frozen(
+        lazy_layout,
+        ["runtime-info", "frkl.project_meta"],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    assert json.loads(result.stdout)["build_info"]["startup_mode"] == "lazy"
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.lazy` module."""
+
+import json
+import sys
+
+from frkl.project_meta import lazy
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.lazy import (
+    LazyProjectMetadata,
+    get_project_metadata,
+    register_lazy_metadata,
+)
+
+
+def test_lazy_project_metadata():
+
+    proxy = LazyProjectMetadata(
+        "frkl.project_meta",
+        constants={"version": "1.2.3", "exe_name": "frkl-project", "other": "x"},
+    )
+
+    assert proxy.version == "1.2.3"
+    assert proxy.exe_name == "frkl-project"
+    assert proxy.main_module == "frkl.project_meta"
+    assert not proxy.is_loaded
+
+    assert proxy.project_slug == "frkl_project_meta"
+    assert proxy.is_loaded
+    assert isinstance(proxy.get_project_metadata(), ProjectMetadata)
+    # baked values still take precedence
+    assert proxy.version == "1.2.3"
+
+
+def test_register_lazy_metadata(monkeypatch):
+
+    monkeypatch.setattr(lazy, "_lazy_metadata", {})
+
+    assert isinstance(get_project_metadata("frkl.project_meta"), ProjectMetadata)
+
+    proxy = register_lazy_metadata("frkl.project_meta", {"version": "1.2.3"})
+    assert register_lazy_metadata("frkl.project_meta") is proxy
+    assert get_project_metadata("frkl.project_meta") is proxy
+    assert not proxy.is_loaded
+
+
+def test_deferred_app_details(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(lazy, "_lazy_metadata", {})
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "_MEIPASS", str(tmp_path), raising=False)
+
+    register_lazy_metadata("app", {"version": "1.0.0", "exe_name": "app"})
+
+    # 'app.json' is not read when the object is created, or baked fields are accessed
+    md = ProjectMetadata("app")
+    assert md.version == "1.0.0"
+    assert md.exe_name == "app"
+
+    app_details = {
+        "metadata": {"project": {"project_name": "App", "exe_name": "app"}},
+        "version": "1.0.0",
+        "build_info": {"startup_mode": "lazy"},
+        "other_frkl_project_versions": {},
+    }
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "app.json").write_text(json.dumps(app_details))
+
+    assert md.project_name == "App"
+    assert md.runtime_details["build_info"] == {"startup_mode": "lazy"}
+    assert md.version == "1.0.0"
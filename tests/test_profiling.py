@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.profiling` module."""
+
+import subprocess
+import sys
+
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.profiling import (
+    MemoryProfiler,
+    disable_memory_profiling,
+    enable_memory_profiling,
+)
+
+
+def test_memory_profiler(tmp_path, monkeypatch):
+
+    (tmp_path / "prof_module.py").write_text("DATA = [str(i) for i in range(100000)]\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = MemoryProfiler()
+    profiler.start()
+    try:
+        with profiler.measure("distribution", "prof-module"):
+            import prof_module  # noqa
+        with profiler.measure("distribution", "nothing"):
+            pass
+    finally:
+        profiler.stop()
+        sys.modules.pop("prof_module", None)
+
+    top = profiler.get_top(num=1)
+    assert top[0]["name"] == "prof-module"
+    assert top[0]["new_modules"] == ["prof_module"]
+    assert top[0]["memory"] > 1000000
+    assert "prof-module" in profiler.create_report()
+
+
+def test_project_metadata_profile():
+
+    profiler = enable_memory_profiling()
+    try:
+        md = ProjectMetadata("frkl.project_meta")
+        md.metadata
+        md.version
+    finally:
+        disable_memory_profiling()
+
+    names = [r["name"] for r in profiler.get_records(category="attribute")]
+    assert names == ["frkl.project_meta:metadata", "frkl.project_meta:version"]
+
+
+def test_memory_profile_flag():
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from frkl.project_meta.interfaces.cli import cli; cli()",
+            "--memory-profile",
+            "runtime-info",
+            "frkl.project_meta",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    assert b"traced memory" in result.stderr
+    assert b"frkl.project_meta:runtime_details" in result.stderr
+    assert b"traced memory" not in result.stdout
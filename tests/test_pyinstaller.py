@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.pyinstaller` module."""
+
+import importlib
+import json
+import os
+import sys
+
+import pytest
+from frkl.project_meta import pyinstaller
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.pyinstaller import (
+    PyinstallerBuildRenderer,
+    create_entry_point_from_template,
+    enable_template_bytecode_cache,
+    get_datas,
+    get_string_template,
+    get_template_env,
+    process_string_template,
+)
+
+
+def test_process_string_template():
+
+    assert process_string_template("Hello {{ name }}!", {"name": "x"}) == "Hello x!"
+    assert process_string_template("Hello {{ name }}!", {"name": "y"}) == "Hello y!"
+
+
+def test_string_template_cache(monkeypatch):
+
+    monkeypatch.setattr(pyinstaller, "TEMPLATE_CACHE_SIZE", 2)
+
+    template = get_string_template("{{ a }}")
+    assert get_string_template("{{ a }}") is template
+
+    get_string_template("{{ b }}")
+    get_string_template("{{ a }}")
+    get_string_template("{{ c }}")
+
+    assert "{{ a }}" in pyinstaller._compiled_templates.keys()
+    assert "{{ b }}" not in pyinstaller._compiled_templates.keys()
+
+
+def test_entry_point_template(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(get_template_env(), "bytecode_cache", None)
+    enable_template_bytecode_cache(str(tmp_path / "cache"))
+
+    entry_points = {
+        "console_scripts": {
+            "frkl-project": {
+                "module": "frkl.project_meta.interfaces.cli",
+                "attr": "cli",
+            }
+        }
+    }
+    target = create_entry_point_from_template(
+        "frkl.project_meta", str(tmp_path), entry_points
+    )
+
+    content = (tmp_path / "cli.py").read_text()
+    assert target == [(tmp_path / "cli.py").resolve().as_posix()]
+    assert "from frkl.project_meta.interfaces.cli import cli as cli" in content
+    compile(content, "cli.py", "exec")
+    assert list((tmp_path / "cache").iterdir())
+
+
+def test_build_mode(tmp_path):
+
+    md = ProjectMetadata("frkl.project_meta")
+
+    with pytest.raises(Exception):
+        PyinstallerBuildRenderer(md, build_mode="invalid")
+
+    renderer = PyinstallerBuildRenderer(md, build_mode="onedir")
+    assert renderer.create_build_options()["upx"] is False
+
+    renderer.create_analysis_args(str(tmp_path))
+    app_details = json.loads((tmp_path / "app.json").read_text())
+    assert app_details["build_info"]["build_mode"] == "onedir"
+
+
+def test_frozen_resources_folder(tmp_path, monkeypatch):
+
+    from frkl.project_meta import defaults
+
+    resources_folder = defaults.FRKL_PROJECT_META_RESOURCES_FOLDER
+    datas = get_datas({"frkl.project_meta": [resources_folder]})
+    dest = [d for s, d in datas if s.endswith("entry_point.py.j2")][0]
+
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "_MEIPASS", str(tmp_path), raising=False)
+    try:
+        importlib.reload(defaults)
+        assert defaults.FRKL_PROJECT_META_RESOURCES_FOLDER == os.path.join(
+            str(tmp_path), dest
+        )
+    finally:
+        monkeypatch.undo()
+        importlib.reload(defaults)
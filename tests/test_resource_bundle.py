@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.resource_bundle` module."""
+
+import pickle
+
+import pytest
+from frkl.project_meta.resource_bundle import (
+    MMAP_THRESHOLD,
+    ProjectResources,
+    ResourceIndex,
+    create_resource_bundle,
+)
+
+LARGE_CONTENT = bytes(range(256)) * (MMAP_THRESHOLD // 128)
+
+
+@pytest.fixture
+def datas(tmp_path):
+
+    src = tmp_path / "src"
+    for pkg in ["pkg_a", "pkg_b"]:
+        (src / pkg).mkdir(parents=True)
+        (src / pkg / "schema.json").write_text('{"shared": true}')
+        (src / pkg / f"{pkg}.txt").write_text(pkg)
+    (src / "pkg_a" / "large.gz").write_bytes(LARGE_CONTENT)
+
+    return [
+        (str(src / pkg / name), f"{pkg}/resources")
+        for pkg in ["pkg_a", "pkg_b"]
+        for name in ["schema.json", f"{pkg}.txt"]
+    ] + [(str(src / "pkg_a" / "large.gz"), "pkg_a/resources/data")]
+
+
+def create_bundle(tmp_path, datas, mode):
+
+    build_dir = tmp_path / "build"
+    build_dir.mkdir()
+
+    bundle_datas = create_resource_bundle(
+        datas, main_module="pkg_a", working_dir=str(build_dir), mode=mode
+    )
+
+    # simulate what pyinstaller does with the datas
+    bundle_dir = tmp_path / "bundle"
+    for src, dest in bundle_datas:
+        target = bundle_dir / dest
+        target.mkdir(parents=True, exist_ok=True)
+        (target / src.split("/")[-1]).write_bytes(open(src, "rb").read())
+
+    return bundle_datas, bundle_dir
+
+
+@pytest.mark.parametrize("mode", ["files", "dedup", "archive"])
+def test_resource_bundle(tmp_path, datas, mode):
+
+    bundle_datas, bundle_dir = create_bundle(tmp_path, datas, mode)
+
+    if mode == "files":
+        assert bundle_datas[:-1] == datas
+    elif mode == "dedup":
+        assert len(bundle_datas) == 5
+        assert not (bundle_dir / "pkg_b" / "resources" / "schema.json").exists()
+    else:
+        assert len(bundle_datas) == 2
+
+    index = ResourceIndex.load(str(bundle_dir), "pkg_a")
+    assert index is not None
+    assert index.read_text("pkg_b/resources/schema.json") == '{"shared": true}'
+    assert index.read_text("pkg_b/resources/pkg_b.txt") == "pkg_b"
+    with pytest.raises(FileNotFoundError):
+        index.read_bytes("pkg_b/resources/missing.txt")
+
+
+@pytest.mark.parametrize("mode", ["files", "archive"])
+def test_project_resources(tmp_path, datas, mode):
+
+    _, bundle_dir = create_bundle(tmp_path, datas, mode)
+
+    resources = ProjectResources(
+        ResourceIndex.load(str(bundle_dir), "pkg_a"), prefix="pkg_a/resources"
+    )
+    assert sorted(resources.paths) == ["data/large.gz", "pkg_a.txt", "schema.json"]
+    assert resources.exists("data/large.gz")
+    assert not resources.exists("pkg_b.txt")
+    assert resources.is_folder("data")
+    assert resources.list() == ["data", "pkg_a.txt", "schema.json"]
+    assert resources.list("data") == ["large.gz"]
+    assert resources.get_size("data/large.gz") == len(LARGE_CONTENT)
+
+    view = resources.read_view("data/large.gz")
+    assert view.readonly
+    assert view == LARGE_CONTENT
+    view.release()
+
+    assert resources.read_view("pkg_a.txt") == b"pkg_a"
+
+    # an opened (and mapped) archive is not part of the pickled state
+    restored = pickle.loads(pickle.dumps(resources))
+    assert restored.read_bytes("data/large.gz") == LARGE_CONTENT
+
+
+def test_project_resources_from_folder(tmp_path):
+
+    folder = tmp_path / "resources"
+    (folder / "templates").mkdir(parents=True)
+    (folder / "templates" / "a.j2").write_text("a")
+    (folder / "b.txt").write_text("b")
+
+    resources = ProjectResources(ResourceIndex.from_folder(str(folder)))
+    assert resources.list() == ["b.txt", "templates"]
+    assert resources.read_text("templates/a.j2") == "a"
+    assert resources.get_hash("b.txt") == ResourceIndex.from_folder(
+        str(folder)
+    ).get_hash("b.txt")
+    with pytest.raises(FileNotFoundError):
+        resources.list("missing")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.scanner` module."""
+
+import json
+from collections import namedtuple
+
+from frkl.project_meta import scanner
+from frkl.project_meta.scanner import scan_environments, scan_site_packages
+
+
+def create_environment(base, name, version, editable=False):
+
+    site_packages = base / "lib" / "python3.8" / "site-packages"
+    site_packages.mkdir(parents=True)
+
+    main_module = name.replace("-", "_")
+    dist_info = site_packages / f"{main_module}-{version}.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    )
+    (dist_info / "entry_points.txt").write_text(
+        f"[console_scripts]\n{name} = {main_module}.cli:cli\n"
+    )
+
+    if editable:
+        src = base / "src"
+        (site_packages / f"__editable__.{main_module}.pth").write_text(
+            f"{src}\nimport this_would_be_executed\n"
+        )
+    else:
+        src = site_packages
+
+    pkg = src / main_module
+    (pkg / "_frkl").mkdir(parents=True)
+    # nothing of the scanned environment must ever be imported
+    (pkg / "__init__.py").write_text("raise Exception('imported')\n")
+    (pkg / "_frkl" / "__init__.py").write_text(
+        "import os\n"
+        "from typing import Any, Dict\n\n"
+        "build_properties: Dict[str, Any] = {'resources': ['resources']}\n"
+        "dynamic = os.urandom(4)\n"
+    )
+    (pkg / "_frkl" / "_frkl.json").write_text(
+        json.dumps({"project": {"project_name": name, "exe_name": name}})
+    )
+
+
+def test_scan_environments(tmp_path):
+
+    create_environment(tmp_path / "env_a", "scan-app", "1.0.0")
+    create_environment(tmp_path / "env_b", "scan-lib", "2.0.0", editable=True)
+
+    results = scan_environments(
+        [str(tmp_path / "env_a"), str(tmp_path / "env_b"), str(tmp_path / "missing")],
+        max_workers=2,
+    )
+
+    assert [r["path"] for r in results] == [
+        str(tmp_path / "env_a"),
+        str(tmp_path / "env_b"),
+        str(tmp_path / "missing"),
+    ]
+    assert results[2]["error"] is not None
+
+    app = results[0]["projects"]["scan_app"]
+    assert app["error"] is None
+    assert app["version"] == "1.0.0"
+    assert app["metadata"]["project"]["project_slug"] == "scan_app"
+    assert app["metadata"]["build_properties"] == {"resources": ["resources"]}
+    assert app["unresolved"] == ["dynamic"]
+    assert app["runtime_details"]["entry_point"] == {
+        "name": "scan-app",
+        "module": "scan_app.cli",
+        "attr": "cli",
+    }
+
+    lib = results[1]["projects"]["scan_lib"]
+    assert lib["package_folder"] == str(tmp_path / "env_b" / "src" / "scan_lib")
+    assert lib["version"] == "2.0.0"
+
+
+# like 'importlib.metadata.EntryPoint' on Python 3.8, without 'module'/'attr' properties
+EntryPoint38 = namedtuple("EntryPoint38", ["name", "value", "group"])
+
+
+class Distribution38(object):
+    def __init__(self, dist):
+
+        self.metadata = dist.metadata
+        self.version = dist.version
+        self.entry_points = [
+            EntryPoint38(ep.name, ep.value, ep.group) for ep in dist.entry_points
+        ]
+
+
+def test_scan_site_packages_without_module_attr(tmp_path, monkeypatch):
+
+    create_environment(tmp_path / "env", "scan-app", "1.0.0")
+
+    distributions = scanner.distributions
+    monkeypatch.setattr(
+        scanner,
+        "distributions",
+        lambda **kwargs: [Distribution38(d) for d in distributions(**kwargs)],
+    )
+
+    result = scan_site_packages(str(tmp_path / "env"))
+    assert result["projects"]["scan_app"]["runtime_details"]["entry_point"] == {
+        "name": "scan-app",
+        "module": "scan_app.cli",
+        "attr": "cli",
+    }
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.serialization` module."""
+
+import io
+import json
+import pickle
+
+import pytest
+from frkl.project_meta import serialization
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.serialization import (
+    dump_json,
+    dumps_metadata,
+    loads_metadata,
+    to_json,
+)
+
+
+DATA = {
+    "b": [("src/a", "pkg"), ("src/b", "pkg")],
+    "a": {"nested": {"x": 1, "y": [1.5, None, True]}, "empty": {}, "list": []},
+    "hidden_imports": {"c", "a", "b"},
+    "name": "Zürich ✓",
+}
+EXPECTED = dict(DATA, hidden_imports=["a", "b", "c"])
+
+
+@pytest.mark.parametrize("backend", ["json", serialization.JSON_BACKEND])
+@pytest.mark.parametrize("stream_threshold", [0, 1000])
+def test_dump_json(monkeypatch, backend, stream_threshold):
+
+    if backend == "json":
+        monkeypatch.setattr(serialization, "_dumps", serialization._dumps_json)
+    monkeypatch.setattr(serialization, "STREAM_THRESHOLD", stream_threshold)
+
+    expected = json.dumps(
+        EXPECTED, sort_keys=True, indent=2, separators=(",", ": "), ensure_ascii=False
+    )
+
+    assert to_json(DATA) == expected
+
+    buf = io.StringIO()
+    dump_json(DATA, buf)
+    assert buf.getvalue() == expected
+
+    buf = io.StringIO()
+    dump_json(DATA, buf, indent=False)
+    assert buf.getvalue() == to_json(DATA, indent=False)
+    assert json.loads(buf.getvalue()) == json.loads(expected)
+
+
+def test_dump_json_compact_streams(monkeypatch):
+
+    monkeypatch.setattr(serialization, "STREAM_THRESHOLD", 0)
+
+    writes = []
+
+    class Writer(object):
+        def write(self, data):
+            writes.append(data)
+
+    dump_json(DATA, Writer(), indent=False)
+    assert "".join(writes) == to_json(DATA, indent=False)
+    assert max(len(w) for w in writes) < len(to_json(DATA["a"], indent=False))
+
+
+def test_dumps_metadata():
+
+    md = ProjectMetadata("frkl.project_meta")
+    data = dumps_metadata(md)
+
+    # e.g. the buffer of a shared memory block
+    buffer = bytearray(len(data) + 16)
+    buffer[: len(data)] = data
+    restored = loads_metadata(memoryview(buffer)[: len(data)])
+
+    for attr in [
+        "_metadata",
+        "_version",
+        "_runtime_details",
+        "_other_metadata_projects",
+    ]:
+        assert getattr(restored, attr) is not None
+    assert restored.to_dict() == md.to_dict()
+
+    with pytest.raises(Exception):
+        loads_metadata(b"XXXX" + data[4:])
+    with pytest.raises(Exception):
+        version = bytes([serialization.BINARY_FORMAT_VERSION + 1])
+        loads_metadata(data[:4] + version + data[5:])
+
+
+def test_pickle_metadata():
+
+    md = ProjectMetadata("frkl.project_meta")
+    md.set_global("key", "value")
+    with md._globals.scope({"key": "scoped", "other": "scoped"}):
+        restored = pickle.loads(pickle.dumps(md))
+
+    # pickling doesn't resolve (or discover) anything
+    assert md._other_metadata_projects is None
+    assert restored._other_metadata_projects is None
+    assert restored.get_global("key") == "value"
+    assert restored.get_global("other") is None
+
+    restored.set_global("new", "value")
+    assert md.get_global("new") is None
+    assert restored.to_dict() == md.to_dict()
+
+    # resolved, lazily created objects are pickled as well
+    resources = md.get_resources()
+    resolver = md.get_defaults_resolver()
+    restored = pickle.loads(pickle.dumps(md))
+    assert restored.get_resources().list() == resources.list()
+    assert (
+        restored.get_defaults_resolver().find_by_suffix("RESOURCES_FOLDER")
+        == resolver.find_by_suffix("RESOURCES_FOLDER")
+    )
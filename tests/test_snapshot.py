@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.snapshot` module."""
+
+import json
+
+from frkl.project_meta import snapshot
+from frkl.project_meta.core import ProjectMetadata
+
+
+def test_snapshot_roundtrip(tmp_path, monkeypatch):
+
+    snapshot_file = tmp_path / "snapshot.json"
+    monkeypatch.setattr(snapshot, "get_snapshot_path", lambda m: str(snapshot_file))
+
+    snapshot.write_snapshot("frkl.project_meta")
+    loaded = snapshot.load_snapshot("frkl.project_meta")
+
+    assert loaded is not None
+    md = ProjectMetadata("frkl.project_meta")
+    assert md._metadata == loaded["metadata"]
+    assert md.version == loaded["version"]
+
+    data = json.loads(snapshot_file.read_text())
+    data["distribution"]["record_hash"] = "outdated"
+    snapshot_file.write_text(json.dumps(data))
+
+    assert snapshot.load_snapshot("frkl.project_meta") is None
+    assert ProjectMetadata("frkl.project_meta")._metadata is None
+
+
+def test_snapshot_sources_changed(tmp_path, monkeypatch):
+
+    module_folder = tmp_path / "module"
+    (module_folder / "_frkl").mkdir(parents=True)
+    frkl_json = module_folder / "_frkl" / "_frkl.json"
+    frkl_json.write_text("{}")
+
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(snapshot, "get_module_folder", lambda m: str(module_folder))
+
+    snapshot_file = snapshot.write_snapshot("frkl.project_meta")
+    assert snapshot_file.startswith(str(tmp_path / "cache"))
+    assert snapshot.load_snapshot("frkl.project_meta") is not None
+
+    frkl_json.write_text('{"project_name": "changed"}')
+    assert snapshot.load_snapshot("frkl.project_meta") is None
+
+    frkl_json.write_text("{}")
+    assert snapshot.load_snapshot("frkl.project_meta") is not None
+    (module_folder / "version.txt").write_text("1.0.0")
+    assert snapshot.load_snapshot("frkl.project_meta") is None
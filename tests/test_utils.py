@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.utils` module."""
+
+from collections import namedtuple
+
+from frkl.project_meta import utils
+from frkl.project_meta.utils import (
+    DiscoveryPolicy,
+    discover_installed_modules,
+    get_entry_points_index,
+    normalize_name,
+    parse_entry_point_value,
+    reset_distributions_index,
+)
+
+
+try:
+    import importlib_metadata as metadata_module  # type: ignore
+except Exception:
+    import importlib.metadata as metadata_module  # type: ignore
+
+
+def test_normalize_name():
+
+    assert normalize_name("Ruamel.YAML") == "ruamel-yaml"
+    assert normalize_name("typing__extensions") == "typing-extensions"
+
+
+def test_discovery_policy():
+
+    policy = DiscoveryPolicy(deny=["ruamel.yaml", "types-*", "pytest-*-plugin"])
+
+    assert policy.explain("ruamel-yaml") == "deny: ruamel.yaml"
+    assert policy.explain("types_requests") == "deny: types-*"
+    assert policy.explain("pytest-cov-plugin") == "deny: pytest-*-plugin"
+    assert policy.is_allowed("frkl.project-meta")
+
+    policy = DiscoveryPolicy.from_config({"allow": ["frkl.*"], "deny": ["frkl-x"]})
+    assert policy.is_allowed("frkl.project_meta")
+    assert policy.explain("frkl-x") == "deny: frkl-x"
+    assert policy.explain("asyncclick") == "deny: asyncclick"
+    assert policy.explain("iniconfig") == "not in allow list"
+
+
+def test_discover_installed_modules():
+
+    excluded = {}
+    modules = discover_installed_modules(
+        only_modules=["frkl.project-meta"], excluded=excluded
+    )
+
+    assert [m.__name__ for m in modules] == ["frkl.project_meta"]
+    assert excluded["iniconfig"] == "not in allow list"
+    assert excluded["jinja2"] == "deny: jinja2"
+
+
+def test_parse_entry_point_value():
+
+    assert parse_entry_point_value("pkg.cli:cli") == ("pkg.cli", "cli")
+    assert parse_entry_point_value("pkg.cli : app.main [extra]") == (
+        "pkg.cli",
+        "app.main",
+    )
+    assert parse_entry_point_value("pkg.plugin") == ("pkg.plugin", None)
+
+
+# like 'importlib.metadata.EntryPoint' on Python 3.8, without 'module'/'attr' properties
+EntryPoint38 = namedtuple("EntryPoint38", ["name", "value", "group"])
+
+
+class Distribution38(object):
+
+    metadata = {"Name": "Old-Style"}
+    version = "1.0.0"
+    entry_points = [EntryPoint38("old-style", "old_style.cli:cli", "console_scripts")]
+
+
+def test_entry_points_index_without_module_attr(monkeypatch):
+
+    monkeypatch.setattr(metadata_module, "distributions", lambda: [Distribution38()])
+    monkeypatch.setattr(utils, "_entry_points_index", None)
+    monkeypatch.setattr(utils, "_distribution_versions", None)
+
+    try:
+        assert get_entry_points_index()["console_scripts"] == [
+            {
+                "name": "old-style",
+                "value": "old_style.cli:cli",
+                "module": "old_style.cli",
+                "attr": "cli",
+            }
+        ]
+    finally:
+        reset_distributions_index()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.versions` module."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from frkl.project_meta import utils, versions
+from frkl.project_meta.core import ProjectMetadata
+from frkl.project_meta.versions import get_git_head, resolve_version
+
+
+try:
+    from importlib_metadata import version as dist_version  # type: ignore
+except Exception:
+    from importlib.metadata import version as dist_version  # type: ignore
+
+
+HEAD = "1a179d5f9efd95fa09a7f5585a6584904e17a2e4"
+
+
+@pytest.fixture
+def git_checkout(tmp_path, monkeypatch):
+
+    repo = tmp_path / "repo"
+    (repo / ".git" / "refs" / "heads").mkdir(parents=True)
+    (repo / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (repo / ".git" / "refs" / "heads" / "main").write_text(HEAD + "\n")
+
+    pkg = repo / "src" / "versioned_project"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("raise Exception('must not be imported')\n")
+
+    cache_file = tmp_path / "cache" / "git_versions.json"
+    monkeypatch.setattr(versions, "GIT_VERSIONS_CACHE_FILE", str(cache_file))
+    monkeypatch.syspath_prepend(str(repo / "src"))
+
+    yield repo
+    sys.modules.pop("versioned_project", None)
+
+
+def test_resolve_version_from_distribution():
+
+    assert resolve_version("frkl.project_meta") == dist_version("frkl.project-meta")
+
+
+def test_resolve_version_from_git_cache(git_checkout):
+
+    assert get_git_head(str(git_checkout)) == HEAD
+
+    cache_file = Path(versions.GIT_VERSIONS_CACHE_FILE)
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_text(
+        json.dumps({str(git_checkout): {"head": HEAD, "version": "1.2.3"}})
+    )
+
+    assert resolve_version("versioned_project") == "1.2.3"
+
+    version_file = git_checkout / "src" / "versioned_project" / "version.txt"
+    version_file.write_text("2.0.0\n")
+    assert resolve_version("versioned_project") == "2.0.0"
+    assert "versioned_project" not in sys.modules.keys()
+
+
+def test_project_version_independent_of_access_order(tmp_path, monkeypatch):
+
+    pkg = tmp_path / "order_project"
+    (pkg / "_frkl").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("def get_version():\n    return 'imported'\n")
+    (pkg / "_frkl" / "__init__.py").write_text("")
+    (pkg / "_frkl" / "_frkl.json").write_text(
+        json.dumps({"project": {"project_name": "order-dist"}})
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(utils, "_entry_points_index", {})
+    monkeypatch.setattr(utils, "_distribution_versions", {"order-dist": "2.0.0"})
+
+    try:
+        assert ProjectMetadata("order_project").version == "2.0.0"
+        md = ProjectMetadata("order_project")
+        assert md.project_name == "order-dist"
+        assert md.version == "2.0.0"
+    finally:
+        for name in list(sys.modules.keys()):
+            if name.startswith("order_project"):
+                sys.modules.pop(name)
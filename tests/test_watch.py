@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.watch` module."""
+
+import json
+import os
+import sys
+
+import pytest
+from frkl.project_meta import core, watch
+from frkl.project_meta.watch import ProjectWatcher
+
+
+FRKL_JSON = {
+    "project": {
+        "project_name": "watched-project",
+        "exe_name": None,
+        "project_main_module": "watched_project",
+    }
+}
+
+
+@pytest.fixture
+def watched_project(tmp_path, monkeypatch):
+
+    pkg = tmp_path / "src" / "watched_project"
+    (pkg / "_frkl").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("def get_version():\n    return '1.0.0'\n")
+    (pkg / "_frkl" / "__init__.py").write_text("build_properties = {}\n")
+    (pkg / "_frkl" / "_frkl.json").write_text(json.dumps(FRKL_JSON))
+    (pkg / "defaults.py").write_text("WATCHED_PROJECT_RESOURCES_FOLDER = 'x'\n")
+
+    monkeypatch.syspath_prepend(str(tmp_path / "src"))
+    yield pkg
+    for name in list(sys.modules.keys()):
+        if name.startswith("watched_project"):
+            sys.modules.pop(name)
+
+
+def touch(path, content):
+
+    stat = os.stat(path)
+    path.write_text(content)
+    # make sure the change is detected, even on filesystems with coarse timestamps
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def count_calls(monkeypatch, module, name, func):
+
+    calls = []
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, wrapper)
+    return calls
+
+
+def test_project_watcher(tmp_path, watched_project, monkeypatch):
+
+    discoveries = count_calls(
+        monkeypatch, core, "discover_installed_modules", lambda **kwargs: set()
+    )
+    lookups = count_calls(monkeypatch, watch, "distribution", watch.distribution)
+
+    md_file = tmp_path / "out" / "project.json"
+    watcher = ProjectWatcher("watched_project", metadata_file=str(md_file))
+    md = watcher.project_metadata
+
+    # not installed, so the version is read from 'version.txt'
+    version_paths = watcher.get_watch_paths()["version"]
+    assert version_paths[0] == str(watched_project / "version.txt")
+
+    watcher.check_changes()
+    assert watcher.update() == [str(md_file)]
+    assert json.loads(md_file.read_text())["version"] == "1.0.0"
+
+    assert watcher.check_changes() == set()
+    assert watcher.update([]) == []
+    # watched paths are only computed again after the metadata changed
+    assert len(lookups) == 2
+
+    touch(watched_project / "defaults.py", "WATCHED_PROJECT_RESOURCES_FOLDER = 'y'\n")
+    assert watcher.check_changes() == {"defaults"}
+    # defaults are not part of the metadata file, so nothing needs to be written
+    assert watcher.update({"defaults"}) == []
+    assert md.get_resources_folder() == "y"
+
+    frkl_json = dict(FRKL_JSON, extra_key="extra_value")
+    touch(watched_project / "_frkl" / "_frkl.json", json.dumps(frkl_json))
+    assert watcher.check_changes() == {"metadata"}
+    assert watcher.update({"metadata"}) == [str(md_file)]
+    assert json.loads(md_file.read_text())["metadata"]["extra_key"] == "extra_value"
+
+    assert watcher.check_changes() == set()
+    assert len(lookups) == 3
+
+    # discovery of other projects was not triggered again
+    assert len(discoveries) == 1
+
+
+def test_project_watcher_pyinstaller_config(tmp_path):
+
+    md_file = tmp_path / "project.json"
+    config_path = tmp_path / "pyinstaller"
+    watcher = ProjectWatcher(
+        "frkl.project_meta",
+        metadata_file=str(md_file),
+        pyinstaller_config_path=str(config_path),
+        build_mode="onedir",
+    )
+
+    written = watcher.update()
+    for file_name in ["app.json", "pyinstaller_args.json", "pyinstaller_build.json"]:
+        assert str(config_path / file_name) in written
+    build_options = json.loads((config_path / "pyinstaller_build.json").read_text())
+    assert build_options["build_mode"] == "onedir"
+    analysis_args = json.loads((config_path / "pyinstaller_args.json").read_text())
+    assert analysis_args["scripts"][0].startswith(str(config_path))
+
+    # only the build time would change, nothing is written
+    assert watcher.update(["metadata"]) == []
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.workspace` module."""
+
+import json
+import sys
+
+import pytest
+from frkl.project_meta.workspace import (
+    WorkspaceProject,
+    generate_workspace,
+    load_workspace_file,
+)
+
+
+@pytest.fixture
+def workspace_file(tmp_path, monkeypatch):
+
+    for name in ["ws_project_a", "ws_project_b"]:
+        pkg = tmp_path / name / "src" / name
+        (pkg / "_frkl").mkdir(parents=True)
+        (pkg / "__init__.py").write_text("def get_version():\n    return '0.1.0'\n")
+        (pkg / "_frkl" / "__init__.py").write_text("build_properties = {}\n")
+        (pkg / "_frkl" / "_frkl.json").write_text(
+            json.dumps({"project": {"project_name": name.replace("_", "-")}})
+        )
+        monkeypatch.syspath_prepend(str(tmp_path / name / "src"))
+
+    ws_file = tmp_path / "workspace.json"
+    ws_file.write_text(
+        json.dumps(
+            {
+                "projects": [
+                    {"main_module": "ws_project_a", "path": "ws_project_a"},
+                    {"main_module": "ws_project_b", "path": "ws_project_b"},
+                ]
+            }
+        )
+    )
+
+    yield ws_file
+    for name in list(sys.modules.keys()):
+        if name.startswith("ws_project_"):
+            sys.modules.pop(name)
+
+
+def test_generate_workspace(tmp_path, workspace_file):
+
+    projects = load_workspace_file(str(workspace_file))
+    assert [p.path for p in projects] == [
+        str(tmp_path / "ws_project_a"),
+        str(tmp_path / "ws_project_b"),
+    ]
+
+    result = generate_workspace(projects, max_workers=2)
+
+    assert [p["main_module"] for p in result["projects"]] == [
+        "ws_project_a",
+        "ws_project_b",
+    ]
+    for p in result["projects"]:
+        assert p["error"] is None
+        md_file = tmp_path / p["main_module"] / ".frkl" / "project.json"
+        md = json.loads(md_file.read_text())
+        assert md["main_module"] == p["main_module"]
+        assert md["version"] == "0.1.0"
+        assert p["main_module"] not in md["other_frkl_project_versions"].keys()
+
+    # nothing changed, so nothing is written the second time
+    result = generate_workspace(projects, max_workers=2)
+    assert all(not p["written"] for p in result["projects"])
+
+
+def test_generate_workspace_pyinstaller(tmp_path):
+
+    project = WorkspaceProject("frkl.project_meta", path=str(tmp_path))
+    result = generate_workspace([project], pyinstaller=True, max_workers=1)
+
+    assert result["projects"][0]["error"] is None
+    config_path = tmp_path / ".frkl" / "pyinstaller"
+    for file_name in ["app.json", "pyinstaller_args.json", "pyinstaller_build.json"]:
+        assert (config_path / file_name).is_file()
+    assert sorted(f.name for f in tmp_path.iterdir()) == [".frkl"]
+
+    result = generate_workspace([project], pyinstaller=True, max_workers=1)
+    assert result["projects"][0]["written"] == []
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `frkl.project_meta.zipapp` module."""
+
+import json
+import os
+import py_compile
+import subprocess
+import sys
+import zipfile
+from types import SimpleNamespace
+
+from frkl.project_meta import zipapp
+from frkl.project_meta.zipapp import build_zipapp
+
+
+def test_build_zipapp(tmp_path):
+
+    target = tmp_path / "frkl-project.pyz"
+    result = build_zipapp(
+        main_module="frkl.project_meta", target=str(target), extras=["cli"]
+    )
+
+    assert result["target"] == str(target)
+    assert os.access(str(target), os.X_OK)
+
+    with zipfile.ZipFile(str(target)) as zf:
+        names = zf.namelist()
+    assert "__main__.py" in names
+    assert "frkl/project_meta/core.pyc" in names
+    assert "frkl/project_meta/core.py" not in names
+    assert "frkl.project_meta/app.json" in names
+    assert "frkl.project_meta/resources_index.json" in names
+
+    # isolated, and without site-packages: everything has to come from the archive
+    output = subprocess.check_output(
+        [sys.executable, "-I", "-S", str(target), "runtime-info", "frkl.project_meta"],
+        cwd=str(tmp_path),
+    )
+    runtime_details = json.loads(output)
+    assert runtime_details["app_type"] == "zipapp"
+    assert runtime_details["build_info"]["build_mode"] == "zipapp"
+    assert runtime_details["entry_point"]["name"] == "frkl-project"
+
+
+def test_zipapp_timestamp_pycs(tmp_path, monkeypatch):
+
+    # like 'py_compile' on Python < 3.7, without support for hash-based pycs
+    monkeypatch.setattr(
+        zipapp,
+        "py_compile",
+        SimpleNamespace(
+            compile=py_compile.compile, PyCompileError=py_compile.PyCompileError
+        ),
+    )
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+
+    target = tmp_path / "frkl-project.pyz"
+    build_zipapp(main_module="frkl.project_meta", target=str(target), extras=["cli"])
+
+    with zipfile.ZipFile(str(target)) as zf:
+        flags = int.from_bytes(zf.read("frkl/project_meta/core.pyc")[4:8], "little")
+    assert flags == 0
+
+    output = subprocess.check_output(
+        [sys.executable, "-I", "-S", str(target), "runtime-info", "frkl.project_meta"],
+        cwd=str(tmp_path),
+    )
+    assert json.loads(output)["app_type"] == "zipapp"